@@ -0,0 +1,11 @@
+"""
+性能基准
+
+    python -m benchmarks                         运行全部基准，结果以 JSON 输出到标准输出
+    python -m benchmarks --output new.json --compare old.json
+                                                 保存结果，并与之前的结果对比
+    python -m benchmarks.generate --events 1000  生成合成的 ass 文本
+
+合成脚本由固定的随机种子生成，相同参数在任何机器上得到相同的文本，不同版本的结果可以直接对比。
+event_memory、tag_memory、text_dispatch 为针对单项优化的独立基准。
+"""
@@ -0,0 +1,84 @@
+"""
+事件存储的内存基准
+
+对比列式存储 Events 与每个事件一个对象、一个属性字典的旧布局，
+在相同的事件行上分别统计解析后常驻的内存与耗时。
+
+用法：
+    python -m benchmarks.event_memory [事件数量]
+"""
+import sys
+import time
+import tracemalloc
+
+from easy_ass import Events, EventFormat, EventTypes, AssTime, EVENT_ATTR_DEF, LAZY_EVENT_ATTRS
+
+FORMAT_LINE = 'Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text'
+STYLES = ('Default', 'Sign', 'Karaoke', 'Note')
+
+
+def make_lines(count: int):
+    for index in range(count):
+        start = index * 1.37
+        yield ('Dialogue: {},{},{},{},,0,0,0,,{{\\pos(640,{})}}line number {}'.format(
+            index % 3, AssTime(start).dump(), AssTime(start + 2.5).dump(),
+            STYLES[index % len(STYLES)], index % 720, index))
+
+
+class LegacyEventItem:
+    """ 旧布局：每个事件一个对象、一个属性字典，时间为 AssTime 对象 """
+
+    def __init__(self):
+        self.event_attrs = dict.fromkeys(EVENT_ATTR_DEF)
+        self.event_type = EventTypes.dialogue
+
+
+def parse_legacy(lines, event_format: EventFormat) -> list:
+    events = []
+    attrs = event_format.event_attrs
+    for line in lines:
+        item = LegacyEventItem()
+        values = line.partition(':')[2].split(',', len(attrs) - 1)
+        for attr, value in zip(attrs, values):
+            item.event_attrs[attr] = value if attr in LAZY_EVENT_ATTRS else EVENT_ATTR_DEF[attr](value)
+        events.append(item)
+    return events
+
+
+def parse_columnar(lines) -> Events:
+    events = Events()
+    events.parse(FORMAT_LINE)
+    for line in lines:
+        events.parse(line)
+    return events
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    begin = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - begin
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main(count: int = 100000):
+    lines = list(make_lines(count))
+    event_format = EventFormat()
+    event_format.parse(FORMAT_LINE)
+
+    legacy, legacy_mem, legacy_time = measure(parse_legacy, lines, event_format)
+    del legacy
+    columnar, columnar_mem, columnar_time = measure(parse_columnar, lines)
+    assert len(columnar) == count
+
+    print(f'{count} events')
+    print(f'dict per event:  {legacy_mem / 2 ** 20:8.1f} MiB ({legacy_mem / count:6.0f} B/event) '
+          f'{legacy_time:6.2f} s')
+    print(f'columnar store:  {columnar_mem / 2 ** 20:8.1f} MiB ({columnar_mem / count:6.0f} B/event) '
+          f'{columnar_time:6.2f} s ({legacy_mem / columnar_mem:.1f}x smaller)')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,145 @@
+"""
+确定性的合成 ass 脚本生成器
+
+用法：
+    python -m benchmarks.generate [--events N] [--tags N] [--styles N] [--line-length N] [--seed N]
+"""
+import argparse
+import random
+import sys
+
+from easy_ass import AssTime
+
+STYLE_FORMAT = ('Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, '
+                'BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, '
+                'BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding')
+EVENT_FORMAT = 'Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text'
+FONTS = ('Arial', 'Microsoft YaHei', 'Source Han Sans', 'Times New Roman')
+WORDS = ('the', 'quick', 'brown', 'fox', 'jumps', 'over', 'lazy', 'dog', 'subtitle', 'karaoke',
+         '字幕', '测试', '你好', '世界', 'ありがとう', 'さようなら')
+# 覆写代码模板，参数由随机数填充，均为 Text 能够解析的代码
+TAGS = (
+    lambda r: 'pos({},{})'.format(r.randrange(1920), r.randrange(1080)),
+    lambda r: 'move({},{},{},{},{},{})'.format(r.randrange(1920), r.randrange(1080),
+                                               r.randrange(1920), r.randrange(1080),
+                                               r.randrange(500), r.randrange(500, 3000)),
+    lambda r: 'fad({},{})'.format(r.randrange(500), r.randrange(500)),
+    lambda r: 'fs{}'.format(r.randrange(10, 80)),
+    lambda r: 'bord{}'.format(r.randrange(5)),
+    lambda r: 'shad{}'.format(r.randrange(5)),
+    lambda r: 'c&H{:06X}&'.format(r.randrange(1 << 24)),
+    lambda r: '3c&H{:06X}&'.format(r.randrange(1 << 24)),
+    lambda r: 'alpha&H{:02X}&'.format(r.randrange(256)),
+    lambda r: 'an{}'.format(r.randrange(1, 10)),
+    lambda r: 'frz{}'.format(r.randrange(-180, 180)),
+    lambda r: 'fscx{}'.format(r.randrange(50, 200)),
+    lambda r: 'fscy{}'.format(r.randrange(50, 200)),
+    lambda r: 'b{}'.format(r.randrange(2)),
+    lambda r: 'i{}'.format(r.randrange(2)),
+    lambda r: 'org({},{})'.format(r.randrange(1920), r.randrange(1080)),
+)
+
+
+def style_line(index: int, rng: random.Random) -> str:
+    colors = ','.join('&H{:08X}'.format(rng.randrange(1 << 32)) for _ in range(4))
+    return 'Style: Style{},{},{},{},{},0,0,0,100,100,0,0,1,{},{},{},10,10,10,1'.format(
+        index, FONTS[index % len(FONTS)], rng.randrange(20, 80), colors,
+        -1 if rng.random() < 0.3 else 0, rng.randrange(4), rng.randrange(3), rng.randrange(1, 10))
+
+
+def event_text(rng: random.Random, tags: float, line_length: int) -> str:
+    """ 生成一行文本，平均 tags 个覆写代码，分成若干个花括号块穿插在约 line_length 个字符的文本中 """
+    words = []
+    length = 0
+    while length < line_length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    if rng.random() < 0.2:  # 部分行带有换行
+        words.insert(rng.randrange(len(words) + 1), '\\N')
+    tag_count = int(tags) + (rng.random() < tags - int(tags))
+    blocks = [[] for _ in range(min(tag_count, 3))]
+    for index in range(tag_count):
+        blocks[index % len(blocks)].append('\\' + rng.choice(TAGS)(rng))
+    count = len(blocks) or 1
+    size = -(-len(words) // count)
+    parts = [' '.join(words[index * size:(index + 1) * size]) for index in range(count)]
+    return ''.join('{' + ''.join(block) + '}' + part for block, part in zip(blocks, parts)) \
+        if blocks else parts[0]
+
+
+def karaoke_text(syllables: int, rng: random.Random) -> str:
+    """ 生成逐字特效风格的一行，每个音节前一个花括号块，带有位置、颜色、边框等多个覆写代码 """
+    parts = []
+    for _ in range(syllables):
+        tags = ''.join('\\' + rng.choice(TAGS)(rng) for _ in range(4))
+        parts.append('{{{}}}{}'.format(tags, rng.choice(WORDS)))
+    return ''.join(parts)
+
+
+def drawing_path(commands: int, rng: random.Random) -> str:
+    """ 生成约 commands 条指令的绘图路径，直线与贝塞尔曲线混合，坐标带有小数 """
+    parts = ['m {} {}'.format(rng.randrange(1920), rng.randrange(1080))]
+    for _ in range(commands):
+        if rng.random() < 0.7:
+            parts.append('l {} {}'.format(round(rng.uniform(0, 1920), 2), round(rng.uniform(0, 1080), 2)))
+        else:
+            parts.append('b ' + ' '.join(str(rng.randrange(1920)) for _ in range(6)))
+    return ' '.join(parts)
+
+
+def generate(events: int = 1000, tags: float = 3.0, styles: int = 8,
+             line_length: int = 40, seed: int = 0) -> str:
+    """
+    生成合成的 ass 脚本
+
+    参数：
+        events: 事件数量
+        tags: 每个事件的平均覆写代码数量
+        styles: 样式数量
+        line_length: 每个事件文本部分的大约字符数
+        seed: 随机种子，参数相同时生成的文本相同
+    返回值：
+        ass 文本
+    """
+    rng = random.Random(seed)
+    lines = [
+        '[Script Info]',
+        'Title: benchmark {}'.format(seed),
+        'ScriptType: v4.00+',
+        'PlayResX: 1920',
+        'PlayResY: 1080',
+        'ScaledBorderAndShadow: yes',
+        '',
+        '[V4+ Styles]',
+        STYLE_FORMAT,
+    ]
+    lines += [style_line(index, rng) for index in range(styles)]
+    lines += ['', '[Events]', EVENT_FORMAT]
+    start = 0
+    for _ in range(events):
+        start += rng.randrange(2000)
+        end = start + rng.randrange(500, 6000)
+        lines.append('Dialogue: {},{},{},Style{},{},0,0,0,,{}'.format(
+            rng.randrange(3), AssTime.dump_ms(start), AssTime.dump_ms(end), rng.randrange(styles),
+            rng.choice(('', '', 'Alice', 'Bob')), event_text(rng, tags, line_length)))
+    return '\n'.join(lines) + '\n'
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--events', type=int, default=1000, help='事件数量')
+    parser.add_argument('--tags', type=float, default=3.0, help='每个事件的平均覆写代码数量')
+    parser.add_argument('--styles', type=int, default=8, help='样式数量')
+    parser.add_argument('--line-length', type=int, default=40, help='每个事件文本的大约字符数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.generate', description='生成合成的 ass 脚本')
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    sys.stdout.write(generate(args.events, args.tags, args.styles, args.line_length, args.seed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+"""
+解析、输出与 Text 等操作的基准
+
+每项基准在合成脚本上重复运行若干次，记录每次的耗时，结果以 JSON 输出。
+
+用法：
+    python -m benchmarks [--events N] [--tags N] [--styles N] [--line-length N] [--seed N]
+                         [--repeat N] [--only NAME,...] [--output FILE] [--compare FILE]
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable
+
+from easy_ass import Ass, AssColor, AssTime, StyleFormat, StyleItem
+from easy_ass.events import transform
+from easy_ass.events.text import Text, DrawingPath
+
+from .generate import generate, drawing_path, karaoke_text, add_arguments
+
+# 基准名: 准备函数，参数为合成脚本的文本，返回 (需要计时的函数, 一次调用包含的操作数)
+BENCHMARKS: dict[str, Callable[[str], tuple[Callable[[], object], int]]] = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _parsed(script: str) -> Ass:
+    ass = Ass()
+    ass.parse(script)
+    return ass
+
+
+def _event_texts(script: str) -> list[str]:
+    return [line.split(',', 9)[9] for line in script.splitlines() if line.startswith('Dialogue:')]
+
+
+@benchmark
+def ass_parse(script: str):
+    return lambda: Ass().parse(script), script.count('\n')
+
+
+@benchmark
+def ass_dump(script: str):
+    ass = _parsed(script)
+    return ass.dump, script.count('\n')
+
+
+@benchmark
+def ass_dump_parsed_text(script: str):
+    """ 全部 Text 已经解析为对象时的输出 """
+    ass = _parsed(script)
+    for event in ass.events:
+        event.Text
+    return ass.dump, script.count('\n')
+
+
+@benchmark
+def text_parse(script: str):
+    texts = _event_texts(script)
+    return lambda: [Text(text) for text in texts], len(texts)
+
+
+@benchmark
+def text_dump(script: str):
+    texts = [Text(text) for text in _event_texts(script)]
+    return lambda: [text.dump() for text in texts], len(texts)
+
+
+@benchmark
+def text_dump_karaoke(script: str):
+    """ 输出覆写代码密集的逐字特效文本 """
+    rng = random.Random(0)
+    texts = [Text(karaoke_text(30, rng)) for _ in range(200)]
+    return lambda: [text.dump() for text in texts], len(texts)
+
+
+@benchmark
+def time_parse(script: str):
+    times = [value for line in script.splitlines() if line.startswith('Dialogue:')
+             for value in line.split(',', 3)[1:3]]
+    return lambda: [AssTime(value) for value in times], len(times)
+
+
+@benchmark
+def time_dump(script: str):
+    times = [AssTime(value) for line in script.splitlines() if line.startswith('Dialogue:')
+             for value in line.split(',', 3)[1:3]]
+    return lambda: [value.dump() for value in times], len(times)
+
+
+@benchmark
+def color_parse(script: str):
+    colors = ['&H{:08X}'.format((index * 2654435761) & 0xFFFFFFFF) for index in range(10000)]
+    return lambda: [AssColor(value) for value in colors], len(colors)
+
+
+@benchmark
+def color_dump(script: str):
+    colors = [AssColor((index * 2654435761) & 0xFFFFFFFF) for index in range(10000)]
+    return lambda: [value.dump() for value in colors], len(colors)
+
+
+@benchmark
+def style_parse(script: str):
+    lines = script.splitlines()
+    style_format = StyleFormat()
+    style_format.parse(next(line for line in lines if line.startswith('Format: Name')))
+    style_lines = [line for line in lines if line.startswith('Style:')]
+    style_lines = (style_lines * (1000 // max(len(style_lines), 1) + 1))[:1000]
+
+    def run():
+        for line in style_lines:
+            StyleItem().parse(line, style_format)
+    return run, len(style_lines)
+
+
+@benchmark
+def effective_state(script: str):
+    """ 计算全部事件逐段的渲染状态，Text 已经解析 """
+    ass = _parsed(script)
+    events = list(ass.events)
+    for event in events:
+        event.Text
+
+    def run():
+        for event in events:
+            for _ in ass.iter_effective(event):
+                pass
+    return run, len(events)
+
+
+@benchmark
+def drawing_parse(script: str):
+    path = drawing_path(20000, random.Random(0))
+    return lambda: DrawingPath(path), 20000
+
+
+@benchmark
+def drawing_dump(script: str):
+    path = DrawingPath(drawing_path(20000, random.Random(0)))
+    return path.dump, 20000
+
+
+@benchmark
+def drawing_transform(script: str):
+    path = DrawingPath(drawing_path(20000, random.Random(0)))
+    matrix = transform.rotate(1, (960, 540))
+    return lambda: path.transform(matrix, precision=None), len(path.coords) // 2
+
+
+@benchmark
+def tags_transform(script: str):
+    """ 变换全部事件中的 pos、move 等坐标，Text 已经解析 """
+    ass = _parsed(script)
+    matrix = transform.rotate(1, (960, 540))
+    ass.events.transform(matrix)
+    return lambda: ass.events.transform(matrix), len(ass.events)
+
+
+def _rescale_run(ass: Ass) -> Callable[[], None]:
+    # 每次调用在两个分辨率之间切换，避免数值不断变大
+    sizes = [(1280, 720), (1920, 1080)]
+
+    def run():
+        ass.rescale(*sizes[0])
+        sizes.reverse()
+    return run
+
+
+@benchmark
+def ass_rescale(script: str):
+    """ 缩放整个脚本的分辨率，Text 未解析，在原文上改写 """
+    ass = _parsed(script)
+    ass.script_info.PlayResX, ass.script_info.PlayResY = 1920, 1080
+    ass.script_info.ScaledBorderAndShadow = 'Yes'
+    return _rescale_run(ass), len(ass.events)
+
+
+@benchmark
+def ass_rescale_parsed_text(script: str):
+    """ 全部 Text 已经解析为对象时的分辨率缩放 """
+    ass = _parsed(script)
+    ass.script_info.PlayResX, ass.script_info.PlayResY = 1920, 1080
+    ass.script_info.ScaledBorderAndShadow = 'Yes'
+    for event in ass.events:
+        event.Text
+    return _rescale_run(ass), len(ass.events)
+
+
+def run_benchmark(setup: Callable, script: str, repeat: int) -> dict:
+    func, ops = setup(script)
+    func()  # 预热
+    runs = []
+    gc_enabled = gc.isenabled()
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            begin = time.perf_counter()
+            func()
+            runs.append(time.perf_counter() - begin)
+        finally:
+            if gc_enabled:
+                gc.enable()
+    best = min(runs)
+    return {
+        'ops': ops,
+        'runs': runs,
+        'best': best,
+        'median': statistics.median(runs),
+        'best_ns_per_op': best / ops * 1e9 if ops else None,
+    }
+
+
+def run(names: list[str] | None = None, repeat: int = 5, **script_params) -> dict:
+    """
+    运行基准
+
+    参数：
+        names: 需要运行的基准名称，默认全部
+        repeat: 每项基准的计时次数
+        script_params: 传给 generate 的合成脚本参数
+    返回值：
+        可以直接序列化为 JSON 的结果
+    """
+    script = generate(**script_params)
+    results = {}
+    for name in names or BENCHMARKS:
+        results[name] = run_benchmark(BENCHMARKS[name], script, repeat)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'params': dict(script_params, repeat=repeat, script_bytes=len(script.encode())),
+        'results': results,
+    }
+
+
+def compare(old: dict, new: dict) -> list[str]:
+    """ 逐项对比两次结果的最好耗时，返回可读的表格行 """
+    lines = ['{:<24}{:>12}{:>12}{:>9}'.format('benchmark', 'old (ms)', 'new (ms)', 'speedup')]
+    for name, result in new['results'].items():
+        if name not in old['results']:
+            continue
+        old_best, new_best = old['results'][name]['best'], result['best']
+        lines.append('{:<24}{:>12.2f}{:>12.2f}{:>8.2f}x'.format(
+            name, old_best * 1e3, new_best * 1e3, old_best / new_best))
+    return lines
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='运行基准并输出 JSON 结果')
+    add_arguments(parser)
+    parser.add_argument('--repeat', type=int, default=5, help='每项基准的计时次数')
+    parser.add_argument('--only', default='', help='逗号分隔的基准名称，可选：' + ','.join(BENCHMARKS))
+    parser.add_argument('--output', help='结果写入的文件，默认输出到标准输出')
+    parser.add_argument('--compare', help='与之前保存的结果对比，表格输出到标准错误')
+    args = parser.parse_args(argv)
+
+    names = [name for name in args.only.split(',') if name]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error('unknown benchmark: ' + ', '.join(unknown))
+    result = run(names, args.repeat, events=args.events, tags=args.tags, styles=args.styles,
+                 line_length=args.line_length, seed=args.seed)
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fp:
+            fp.write(output + '\n')
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as fp:
+            old = json.load(fp)
+        print('\n'.join(compare(old, result)), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+覆写代码对象的内存与构造基准
+
+解析覆写代码密集的逐字特效文本，统计解析后常驻的内存（平均到每个覆写代码对象），
+以及分别用原始字符串、位置参数、关键字参数构造覆写代码的耗时。
+同样的覆写代码也用每个对象一个实例字典、一个参数字典的旧布局构造一遍作为对比。
+
+用法：
+    python -m benchmarks.tag_memory [行数]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from easy_ass.events.text import Text, Str, Pos, Move, FontSize, Color
+
+from .generate import karaoke_text
+
+
+class LegacyTag:
+    """ 旧布局：实例字典中保存参数字典，构造时逐个参数查找转换函数，与改为 __slots__ 之前的 TextBase 一致 """
+    _prefix = ''
+    _with_bracket = True
+    _arg_mapper: dict = ...
+
+    def __init__(self, *args, **kwargs):
+        self._arg_values = dict.fromkeys(self._arg_mapper) if self._arg_mapper is not ... else {}
+        if 'raw_str' in kwargs:
+            self.parse(kwargs['raw_str'])
+        elif self._arg_mapper is not ...:
+            if len(args) > len(self._arg_mapper):
+                raise TypeError('`{}()` takes at most {} arguments. '.
+                                format(self.__class__.__name__, len(self._arg_mapper)))
+            args = {name: value for name, value in zip(self._arg_mapper, args)}
+            args.update(kwargs)
+            self._handle_args(args)
+
+    def _handle_args(self, args: dict) -> None:
+        for arg_name, arg_value in args.items():
+            if arg_name not in self._arg_mapper:
+                raise TypeError(arg_name)
+            if arg_value is None:
+                continue
+            self._arg_values[arg_name] = self._arg_mapper[arg_name][1](arg_value)
+        for arg_name, arg_info in self._arg_mapper.items():
+            if self._arg_values.get(arg_name) is None and not arg_info[0]:
+                raise TypeError('In `{}()`, `{}` must be specified. '.format(self.__class__.__name__, arg_name))
+
+    def parse(self, ass_str: str) -> None:
+        if self._arg_mapper is ...:
+            return
+        arg_values = ass_str[len(self._prefix):].strip('() ').split(',')
+        self._handle_args({name: value for name, value in zip(self._arg_mapper, arg_values)})
+
+
+_legacy_types: dict[type, type] = {}
+
+
+def legacy_type(tag_type: type) -> type:
+    """ 与 tag_type 前缀、参数定义相同的旧布局类型 """
+    legacy = _legacy_types.get(tag_type)
+    if legacy is None:
+        legacy = _legacy_types[tag_type] = type('Legacy' + tag_type.__name__, (LegacyTag,), {
+            '_prefix': tag_type._prefix,
+            '_with_bracket': tag_type._with_bracket,
+            '_arg_mapper': tag_type._arg_mapper,
+        })
+    return legacy
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    begin = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - begin
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def best_time(func, number: int, repeat: int = 5) -> float:
+    """ 多次计时取最好结果，返回单次调用的纳秒数 """
+    best = float('inf')
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - begin)
+    return best / number * 1e9
+
+
+def build_tags(codes: list, legacy: bool) -> list:
+    """ 用原始字符串构造全部覆写代码，codes 为 (类型, 原始字符串) """
+    if legacy:
+        return [legacy_type(tag_type)(raw_str=code) for tag_type, code in codes]
+    return [tag_type(raw_str=code) for tag_type, code in codes]
+
+
+def main(count: int = 500):
+    rng = random.Random(0)
+    lines = [karaoke_text(30, rng) for _ in range(count)]
+    texts, memory, elapsed = measure(lambda: [Text(line) for line in lines])
+    codes = [(type(item), item.dump()) for text in texts for item in text if not isinstance(item, Str)]
+    tags = len(codes)
+    del texts
+    for tag_type, _ in codes:  # 类型的创建不计入内存
+        legacy_type(tag_type)
+    _, slotted_memory, slotted_time = measure(build_tags, codes, False)
+    _, legacy_memory, legacy_time = measure(build_tags, codes, True)
+
+    print(f'{count} lines, {tags} tags')
+    print(f'parsed:      {memory / 2 ** 20:8.1f} MiB ({memory / tags:6.0f} B/tag incl. text) {elapsed:6.2f} s')
+    print(f'dict per tag:{legacy_memory / 2 ** 20:8.1f} MiB ({legacy_memory / tags:6.0f} B/tag) '
+          f'{legacy_time:6.2f} s')
+    print(f'slotted:     {slotted_memory / 2 ** 20:8.1f} MiB ({slotted_memory / tags:6.0f} B/tag) '
+          f'{slotted_time:6.2f} s ({legacy_memory / slotted_memory:.1f}x smaller)')
+    cases = (
+        ('raw_str', Move, dict(raw_str='move(1,2,3,4,0,100)'), ()),
+        ('positional', Move, {}, (1, 2, 3, 4, 0, 100)),
+        ('keyword', Pos, dict(x=1, y=2), ()),
+        ('one arg', FontSize, dict(raw_str='fs40'), ()),
+        ('color', Color, dict(raw_str='c&H00FF00&'), ()),
+    )
+    print(f'{"":<13}{"dict per tag":>12}{"slotted":>10}')
+    for name, tag_type, kwargs, args in cases:
+        legacy = legacy_type(tag_type)
+        legacy_ns = best_time(lambda: legacy(*args, **kwargs), 20000)
+        slotted_ns = best_time(lambda: tag_type(*args, **kwargs), 20000)
+        print(f'{name + ":":<13}{legacy_ns:9.0f} ns{slotted_ns:7.0f} ns ({legacy_ns / slotted_ns:.1f}x faster)')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
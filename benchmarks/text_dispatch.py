@@ -0,0 +1,47 @@
+"""
+覆写代码前缀识别的微基准
+
+对比逐个 startswith 线性查找与预编译前缀正则两种方式，
+并给出在覆写代码密集的行上 Text.parse 的整体耗时。
+
+用法：
+    python -m benchmarks.text_dispatch
+"""
+import timeit
+
+from easy_ass.events.text import Text, _codes_mapper, _match_code_prefix
+
+TAG_HEAVY_LINE = (
+    r'{\an7\pos(960,540)\fscx120\fscy120\frz15\bord3\shad2\c&H66CCFF&\3c&H000000&'
+    r'\alpha&H20&\fad(200,300)}Lorem{\fs40\xbord1\ybord2\fsp2\fax0.1\i1}ipsum'
+    r'{\1a&H00&\4c&H202020&\fn Arial\q2\b1\u1\s0}dolor{\move(1,2,3,4,100,200)\org(5,6)}sit'
+)
+CODES = [code for part in TAG_HEAVY_LINE.split('{')[1:]
+         for code in part.split('}')[0].split('\\') if code]
+
+
+def linear_lookup(code: str):
+    for code_name, proc_type in _codes_mapper.items():
+        if code.startswith(code_name):
+            return proc_type
+    raise TypeError(code)
+
+
+def regex_lookup(code: str):
+    return _codes_mapper[_match_code_prefix(code).group()]
+
+
+def main(number: int = 20000):
+    assert all(linear_lookup(code) is regex_lookup(code) for code in CODES)
+    linear = timeit.timeit(lambda: [linear_lookup(code) for code in CODES], number=number)
+    regex = timeit.timeit(lambda: [regex_lookup(code) for code in CODES], number=number)
+    parse = timeit.timeit(lambda: Text(TAG_HEAVY_LINE), number=number // 10)
+    print(f'{len(CODES)} codes/line, {len(_codes_mapper)} registered prefixes')
+    print(f'linear startswith lookup: {linear / number * 1e6:8.2f} us/line')
+    print(f'prefix regex lookup:      {regex / number * 1e6:8.2f} us/line '
+          f'({linear / regex:.1f}x)')
+    print(f'Text.parse:               {parse / (number // 10) * 1e6:8.2f} us/line')
+
+
+if __name__ == '__main__':
+    main()
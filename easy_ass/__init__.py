@@ -1,6 +1,9 @@
 from .scriptinfo import *
 from .styles import *
 from .events import *
-from .errors import Errors
+from .errors import Errors, ErrorRecord, AssParseError
 from .ass_types import AssColor, AssTime
+from .raw import RawSection
 from .easy_ass import Ass
+from . import batch
+from . import instrument
@@ -1,6 +1,3 @@
-import re
-
-
 class AssColor:
     def __init__(self, value: int | str):
         """
@@ -81,38 +78,162 @@ class AssColor:
         """
         return self.__color_value
 
+    def __reduce__(self):
+        return AssColor, (self.__color_value,)
+
 
 class AssTime:
-    _match_time = re.compile(r'(?P<h>\d+):(?P<m>\d+):(?P<s>\d+).(?P<ms>\d+)')
+    __slots__ = ('__milliseconds',)
 
     def __init__(self, value: int | float | str):
-        self.__time_value = 0
+        """
+        ASS 时间类型，内部以整数毫秒保存
+
+        参数：
+            value: 时间值
+                - 当传入数字时，表示秒
+                - 当传入字符串时，按照 H:MM:SS.cc 的格式解析
+        用法：
+            start = AssTime('0:00:01.50')
+            print(start.milliseconds)  # 1500
+            print(start + 2.5)  # 00:00:04.00
+            print(AssTime(1.5) == start)  # True
+        """
         if isinstance(value, str):
-            self.parse(value)
+            self.__milliseconds = self.parse_ms(value)
+        elif isinstance(value, AssTime):
+            self.__milliseconds = value.__milliseconds
         else:
-            self.__time_value = value
+            self.__milliseconds = round(value * 1000)
+
+    @classmethod
+    def from_ms(cls, milliseconds: int) -> 'AssTime':
+        """
+        通过整数毫秒创建时间对象
+        """
+        time = cls.__new__(cls)
+        time.__milliseconds = milliseconds
+        return time
+
+    @staticmethod
+    def parse_ms(value: str) -> int:
+        """
+        将 H:MM:SS.cc 格式的字符串转换为整数毫秒，小数部分按位数解析，`.5`、`.50`、`.500` 均为 500 毫秒。
+        开头的负号作用于整个时间，与 dump_ms 的输出一致
+
+        参数：
+            value: 时间字符串
+        返回值：
+            整数毫秒
+        """
+        try:
+            text = value.lstrip()
+            sign = 1
+            if text[:1] == '-':
+                sign, text = -1, text[1:]
+            if text[-3:-2] == '.' and text[-6:-5] == ':' and text[-9:-8] == ':':  # 标准格式直接按位置切片
+                return sign * (((int(text[:-9]) * 60 + int(text[-8:-6])) * 60
+                                + int(text[-5:-3])) * 1000 + int(text[-2:]) * 10)
+            hour_end = text.index(':')
+            minute_end = text.index(':', hour_end + 1)
+            dot = text.find('.', minute_end + 1)
+            if dot < 0:
+                second, fraction = int(text[minute_end + 1:]), 0
+            else:
+                second = int(text[minute_end + 1:dot])
+                fraction = text[dot + 1:].strip()
+                fraction = int(fraction[:3].ljust(3, '0')) if fraction else 0
+            return sign * (((int(text[:hour_end]) * 60 + int(text[hour_end + 1:minute_end])) * 60
+                            + second) * 1000 + fraction)
+        except ValueError:
+            raise ValueError(f'Could not parse `{value}` as ass time. ') from None
+
+    @staticmethod
+    def dump_ms(milliseconds: int) -> str:
+        """
+        将整数毫秒转换为 H:MM:SS.cc 格式的字符串，毫秒四舍五入到厘秒
+        """
+        sign = ''
+        if milliseconds < 0:
+            sign, milliseconds = '-', -milliseconds
+        centi_second = (milliseconds + 5) // 10
+        second, centi_second = divmod(centi_second, 100)
+        minute, second = divmod(second, 60)
+        hour, minute = divmod(minute, 60)
+        return f'{sign}{hour:0>2d}:{minute:0>2d}:{second:0>2d}.{centi_second:0>2d}'
 
     def parse(self, value: str):
-        match = self._match_time.match(value)
-        if match is None:
-            raise Exception(f'Could not parse `{value}` as ass time. ')
-        time_path = match.groupdict()
-        self.__time_value =                 \
-            int(time_path['h']) * 3600 +    \
-            int(time_path['m']) * 60 +      \
-            int(time_path['s']) +           \
-            int(time_path['ms']) / 1000
+        self.__milliseconds = self.parse_ms(value)
 
     def dump(self):
-        hour = int(self.__time_value // 3600)
-        minute = int(self.__time_value // 60 % 60)
-        second = int(self.__time_value % 60)
-        milli_second = int(self.__time_value * 1000 % 1000)
+        return self.dump_ms(self.__milliseconds)
 
-        return f'{hour:0>2d}:{minute:0>2d}:{second:0>2d}.{milli_second:0>2d}'
+    @property
+    def milliseconds(self) -> int:
+        return self.__milliseconds
 
     def __str__(self):
         return self.dump()
 
+    def __repr__(self):
+        return f'AssTime({self.dump()!r})'
+
     def __float__(self):
-        return self.__time_value
+        return self.__milliseconds / 1000
+
+    def __hash__(self):
+        return hash(self.__milliseconds)
+
+    def __eq__(self, other):
+        if not isinstance(other, AssTime):
+            return NotImplemented
+        return self.__milliseconds == other.__milliseconds
+
+    def __lt__(self, other):
+        if not isinstance(other, AssTime):
+            return NotImplemented
+        return self.__milliseconds < other.__milliseconds
+
+    def __le__(self, other):
+        if not isinstance(other, AssTime):
+            return NotImplemented
+        return self.__milliseconds <= other.__milliseconds
+
+    def __gt__(self, other):
+        if not isinstance(other, AssTime):
+            return NotImplemented
+        return self.__milliseconds > other.__milliseconds
+
+    def __ge__(self, other):
+        if not isinstance(other, AssTime):
+            return NotImplemented
+        return self.__milliseconds >= other.__milliseconds
+
+    def __add__(self, other):
+        """ 与另一个时间或者秒数相加 """
+        if isinstance(other, AssTime):
+            return AssTime.from_ms(self.__milliseconds + other.__milliseconds)
+        if isinstance(other, (int, float)):
+            return AssTime.from_ms(self.__milliseconds + round(other * 1000))
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        """ 减去另一个时间或者秒数 """
+        if isinstance(other, AssTime):
+            return AssTime.from_ms(self.__milliseconds - other.__milliseconds)
+        if isinstance(other, (int, float)):
+            return AssTime.from_ms(self.__milliseconds - round(other * 1000))
+        return NotImplemented
+
+    def __mul__(self, other):
+        """ 按倍数缩放 """
+        if isinstance(other, (int, float)):
+            return AssTime.from_ms(round(self.__milliseconds * other))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __reduce__(self):
+        return AssTime.from_ms, (self.__milliseconds,)
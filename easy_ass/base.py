@@ -2,24 +2,36 @@ class AssAttr:
     _range: tuple = ...
     _attr_type: type = ...
     _default = None
+    _values: dict = {}  # 合法值查找表，字符串类型的 key 为小写
+    _range_bounds: tuple = (None, None)
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        定义子类时预先生成合法值查找表与范围边界，构造时只需一次字典查找
+        """
+        super().__init_subclass__(**kwargs)
+        values = [value for name, value in vars(cls).items() if not name.startswith('_')]
+        if cls._attr_type == str:  # 忽略大小写比较字符串
+            cls._values = {value.lower(): value for value in values if isinstance(value, str)}
+        else:
+            cls._values = {value: value for value in values}
+        if cls._range is not ...:
+            cls._range_bounds = tuple(None if bound is ... else bound for bound in cls._range)
 
     def __new__(cls, value):
         if cls._attr_type is not ...:
             value = cls._attr_type(value)
-        if cls._attr_type == str:
-            value = value.lower()
-            for cmp_value in vars(cls).values():  # 忽略大小写比较字符串
-                if isinstance(cmp_value, str) and cmp_value.lower() == value:
-                    return cmp_value
-
-        if value in vars(cls).values():
-            return value
-        if cls._range is not ... and \
-                (cls._range[0] is ... or cls._range[0] <= value) and \
-                (cls._range[1] is ... or cls._range[1] >= value):
+        attr_value = cls._values.get(value.lower() if cls._attr_type == str else value, _MISSING)
+        if attr_value is not _MISSING:
+            return attr_value
 
+        low, high = cls._range_bounds
+        if cls._range is not ... and (low is None or low <= value) and (high is None or high >= value):
             return value
 
         if cls._default is not None:
             return cls._default
         raise KeyError('Could not parse `{}` as {}'.format(value, cls.__name__))
+
+
+_MISSING = object()
@@ -0,0 +1,122 @@
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterable, NamedTuple
+
+from .easy_ass import Ass
+from .errors import Errors
+
+
+class BatchResult(NamedTuple):
+    """
+    单个文件的处理结果
+
+    属性：
+        path: 输入文件路径
+        errors: 解析与输出过程中产生的错误
+        value: 处理函数的返回值
+        output_path: 输出文件路径，未输出时为 None
+        exception: 处理失败时的异常信息，成功时为 None
+    """
+    path: str
+    errors: Errors
+    value: Any = None
+    output_path: str | None = None
+    exception: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.exception is None
+
+
+def _output_path(path: str, output: str | Callable[[str], str] | None) -> str | None:
+    if output is None:
+        return None
+    if callable(output):
+        return output(path)
+    return os.path.join(output, os.path.basename(path))
+
+
+def process_file(path: str,
+                 fn: Callable[[Ass], Any] | None = None,
+                 output: str | Callable[[str], str] | None = None,
+                 encoding: str = 'utf-8-sig',
+                 output_encoding: str = 'utf-8',
+                 max_errors: int | None = None) -> BatchResult:
+    """
+    解析、处理并输出单个文件，异常不会抛出而是记录在结果中
+
+    参数：
+        path: 输入文件路径
+        fn: 处理函数，参数为解析后的 Ass 对象，返回值记录在结果的 value 中
+        output: 输出位置，可以是目录或者由输入路径得到输出路径的函数，为 None 时不输出
+        encoding: 输入文件编码
+        output_encoding: 输出文件编码
+        max_errors: 解析错误数量达到该值后停止解析该文件
+    返回值：
+        处理结果
+    """
+    errors = Errors()
+    output_path = None
+    try:
+        ass = Ass()
+        errors += ass.load(path, encoding=encoding, max_errors=max_errors)
+        value = fn(ass) if fn is not None else None
+        output_path = _output_path(path, output)
+        if output_path is not None:
+            errors += ass.save(output_path, encoding=output_encoding)
+        return BatchResult(path, errors, value, output_path)
+    except Exception:
+        return BatchResult(path, errors, None, output_path, traceback.format_exc())
+
+
+def process(paths: Iterable[str],
+            fn: Callable[[Ass], Any] | None = None,
+            workers: int | None = None,
+            output: str | Callable[[str], str] | None = None,
+            encoding: str = 'utf-8-sig',
+            output_encoding: str = 'utf-8',
+            chunksize: int = 1,
+            max_errors: int | None = None) -> list[BatchResult]:
+    """
+    使用进程池批量处理多个文件
+
+    每个文件在子进程中解析、调用 fn 处理，再按需输出，单个文件失败不会影响其他文件。
+    fn 与 output 需要能被 pickle，即定义在模块顶层的函数；fn 的返回值也会被 pickle 传回，
+    可以直接返回 Ass、EventItem、StyleItem、Text 等对象。
+
+    参数：
+        paths: 输入文件路径
+        fn: 处理函数，参数为解析后的 Ass 对象
+        workers: 进程数，默认为 CPU 核数，为 1 时在当前进程中依次处理
+        output: 输出位置，可以是目录或者由输入路径得到输出路径的函数，为 None 时不输出
+        encoding: 输入文件编码
+        output_encoding: 输出文件编码
+        chunksize: 每次分配给子进程的文件数，文件很多且很小时可以调大
+        max_errors: 解析错误数量达到该值后停止解析该文件，避免损坏的文件产生大量错误
+    返回值：
+        与 paths 顺序一致的处理结果
+    用法：
+        def retime(ass):
+            ass.events.shift(1.5)
+
+        results = batch.process(paths, retime, workers=8, output='out')
+        for result in results:
+            if not result.ok:
+                print(result.path, result.exception)
+    """
+    worker = partial(process_file, fn=fn, output=output, encoding=encoding,
+                     output_encoding=output_encoding, max_errors=max_errors)
+    paths = list(paths)
+    if workers == 1 or len(paths) <= 1:
+        return [worker(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(worker, paths, chunksize=chunksize))
+
+
+__all__ = (
+    'BatchResult',
+    'process',
+    'process_file',
+)
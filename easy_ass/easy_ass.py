@@ -1,28 +1,274 @@
+from typing import Iterable, Iterator, TextIO
+
 from .scriptinfo import *
 from .events import *
 from .styles import *
-from .errors import Errors
+from .errors import Errors, AssParseError
+from .mapped import MappedSections
+from .raw import RawSection
+
+_SECTION_NAMES = ('script_info', 'styles', 'events')
 
 
 class Ass:
     def __init__(self):
-        self.script_info: ScriptInfo = ScriptInfo()
-        self.styles: Styles = Styles()
-        self.events: Events = Events()
+        self._script_info: ScriptInfo = ScriptInfo()
+        self._styles: Styles = Styles()
+        self._events: Events = Events()
+        self._raw_sections: list[RawSection] = []  # 无法识别的部分，原样输出
+
+        self._parser_status: ScriptInfo | Styles | Events | RawSection = self._script_info
+        self._mapped: MappedSections | None = None  # Ass.open 映射的文件，全部部分解析后释放
+        self._pending_sections: set[str] = set()  # 尚未解析的部分
+        self.load_errors: Errors = Errors()  # Ass.open 产生的错误，包括之后按需解析部分时产生的错误
+        self._load_limits: tuple[int | None, bool] = (None, False)  # Ass.open 的 max_errors 与 strict
+        self._load_stopped: bool = False  # 错误数量达到上限，不再解析剩余的部分
+
+    @classmethod
+    def open(cls, path: str, mmap: bool = True, encoding: str = 'utf-8-sig',
+             max_errors: int | None = None, strict: bool = False, validate: bool = True) -> 'Ass':
+        """
+        打开一个 ass 文件
+
+        使用内存映射时只会扫描各部分的标题，各部分在第一次访问时才解析，
+        如只读取 ass.script_info.Title 时不会解析 Styles 和 Events。
+        解析产生的错误记录在 load_errors 中，错误数量的限制同样作用于之后按需进行的解析。
+
+        参数：
+            path: 文件路径
+            mmap: 是否使用内存映射按需解析，为 False 时立即流式解析整个文件
+            encoding: 文件编码，默认兼容带 BOM 的 utf-8
+            max_errors: 见 parse_stream
+            strict: 见 parse_stream
+            validate: 见 parse_stream
+        返回值：
+            Ass 对象
+        """
+        ass = cls()
+        ass._load_limits = (max_errors, strict)
+        ass._set_trusted(not validate)
+        if mmap:
+            try:
+                ass._mapped = MappedSections(path, encoding)
+            except ValueError:  # 空文件无法映射，只用 \r 换行的文件不能按 \n 查找标题，都改为流式解析
+                pass
+            else:
+                ass._pending_sections = {'script_info', 'styles', 'events', 'raw'}
+                return ass
+        ass.load_errors += ass.load(path, encoding, max_errors, strict, validate)
+        return ass
+
+    @property
+    def script_info(self) -> ScriptInfo:
+        if self._mapped is not None:
+            self._load_section('script_info')
+        return self._script_info
+
+    @script_info.setter
+    def script_info(self, value: ScriptInfo):
+        self._pending_sections.discard('script_info')
+        self._script_info = value
+
+    @property
+    def styles(self) -> Styles:
+        if self._mapped is not None:
+            self._load_section('styles')
+        return self._styles
+
+    @styles.setter
+    def styles(self, value: Styles):
+        self._pending_sections.discard('styles')
+        self._styles = value
+
+    @property
+    def events(self) -> Events:
+        if self._mapped is not None:
+            self._load_section('events')
+        return self._events
 
-        self._parser_status: ScriptInfo | Styles | Events = self.script_info
+    @events.setter
+    def events(self, value: Events):
+        self._pending_sections.discard('events')
+        self._events = value
 
-    def parse(self, ass_str: str) -> Errors:
+    @property
+    def raw_sections(self) -> list[RawSection]:
+        """ 无法识别的部分，如 [Fonts]、[Graphics]，按原样保存并在输出时写回 """
+        if self._mapped is not None:
+            self._load_section('raw')
+        return self._raw_sections
+
+    @raw_sections.setter
+    def raw_sections(self, value: list[RawSection]):
+        self._pending_sections.discard('raw')
+        self._raw_sections = value
+
+    def _load_section(self, name: str) -> None:
+        if name not in self._pending_sections:
+            return
+        mapped = self._mapped
+        # 向后扫描，直到该部分的第一段结束
+        while not mapped.done and (mapped.ranges[name] == [] or mapped.current_section == name):
+            self._parse_mapped_range(mapped.scan())
+        self._pending_sections.discard(name)
+        for start, end in mapped.ranges[name]:
+            self._parse_mapped_range((name, start, end))
+        if self._pending_sections - {'raw'}:
+            return
+        if 'raw' in self._pending_sections:  # 未知部分不单独保留映射，随最后一个已知部分一起解析
+            self._load_section('raw')
+            return
+        while not mapped.done:  # 全部部分都已访问，解析剩余的重复部分后释放映射
+            self._parse_mapped_range(mapped.scan())
+        if mapped.current_section == 'raw':
+            self._parser_status = self._raw_sections[-1]
+        else:
+            self._parser_status = getattr(self, '_' + mapped.current_section)
+        mapped.close()
+        self._mapped = None
+
+    def _parse_mapped_range(self, section_range: tuple[str, int, int] | None) -> None:
+        if section_range is None:
+            return
+        name, start, end = section_range
+        if name in self._pending_sections:  # 尚未访问的部分等到访问时再解析
+            return
+        mapped = self._mapped
+        lines = mapped.iter_lines(start, end)
+        if name == 'raw':  # 第一行为标题行
+            section = RawSection(next(lines).lstrip('\ufeff').strip(), mapped.raw_after[start])
+            self._raw_sections.append(section)
+        else:
+            section = getattr(self, '_' + name)
+        if self._load_stopped:
+            return
+        for index, ass_str in enumerate(lines, name == 'raw'):
+            ass_str = ass_str.lstrip()
+            if (ass_str or name == 'raw') and not ass_str.startswith('['):  # 未知部分保留空行
+                line_err = section.parse(ass_str)
+                if line_err and _add_errors(self.load_errors, line_err, mapped.line_number(start) + index,
+                                            *self._load_limits):
+                    self._load_stopped = True
+                    return
+
+    def parse(self, ass_str: str, max_errors: int | None = None, strict: bool = False,
+              validate: bool = True) -> Errors:
+        """ 解析 ass 文本，参数见 parse_stream """
+        return self.parse_stream(ass_str.split('\n'), max_errors, strict, validate)
+
+    def parse_stream(self, ass_lines: Iterable[str], max_errors: int | None = None,
+                     strict: bool = False, validate: bool = True) -> Errors:
+        """
+        逐行解析 ass 文本，每次只持有一行
+
+        参数：
+            ass_lines: 可迭代的行，可以是文本模式打开的文件对象，也可以是字符串列表等
+            max_errors: 错误数量达到该值后停止解析，并追加一条 too_many_errors 警告
+            strict: 为 True 时遇到第一个错误即抛出 AssParseError
+            validate: 为 False 时为信任模式，样式与事件只切分出类型并保存原始文本，
+                      第一次读写时才转换各字段，未修改的行按原样输出。
+                      适用于来源可靠的文件，字段中的错误不会在解析时报告，可以之后调用 validate 检查
+        返回值：
+            解析过程中产生的错误，记录了所在的行号
+        """
         err: Errors = Errors()
-        ass_str_lines = ass_str.split('\n')
-        for ass_str_line in ass_str_lines:
-            err += self.parse_line(ass_str_line)
+        self._set_trusted(not validate)
+        ass_lines = iter(ass_lines)
+        line = 1
+        for ass_str_line in ass_lines:  # 首行去除 BOM
+            line_err = self.parse_line(ass_str_line.lstrip('\ufeff').rstrip('\r\n'))
+            if line_err and _add_errors(err, line_err, line, max_errors, strict):
+                return err
+            break
+        for line, ass_str_line in enumerate(ass_lines, 2):
+            line_err = self.parse_line(ass_str_line.rstrip('\r\n'))
+            if line_err and _add_errors(err, line_err, line, max_errors, strict):
+                return err
+        return err
+
+    def load(self, path: str, encoding: str = 'utf-8-sig', max_errors: int | None = None,
+             strict: bool = False, validate: bool = True) -> Errors:
+        """
+        从文件中流式读取并解析 ass
+
+        参数：
+            path: 文件路径
+            encoding: 文件编码，默认兼容带 BOM 的 utf-8
+            max_errors: 见 parse_stream
+            strict: 见 parse_stream
+            validate: 见 parse_stream
+        返回值：
+            解析过程中产生的错误
+        """
+        with open(path, 'r', encoding=encoding, newline='') as fp:
+            return self.parse_stream(fp, max_errors, strict, validate)
+
+    def style_of(self, event: EventItem) -> StyleItem | None:
+        """
+        查找事件使用的样式，规则见 Styles.resolve
+
+        返回值：
+            样式，没有任何样式时返回 None
+        """
+        return self.styles.resolve(event.Style)
+
+    def iter_effective(self, event: EventItem) -> Iterator[tuple[Str | DrawingPath, EffectiveState]]:
+        """
+        逐段输出事件文本及其实际渲染状态，样式按 style_of 查找，规则见 easy_ass.events.render.iter_effective
+        """
+        styles = self.styles
+        return iter_effective(event.Text, styles.resolve(event.Style), styles)
+
+    def rescale(self, new_x: int, new_y: int) -> None:
+        """
+        将脚本缩放到新的分辨率，样式与事件各遍历一次，最后修改 PlayResX、PlayResY
+
+        未设置的分辨率按渲染器的规则推算：都未设置时为 384x288，只设置一个时按 4:3（1280x1024 例外）。
+        ScaledBorderAndShadow 为 Yes 时边框与阴影一起缩放，未设置时视为 No
+
+        参数：
+            new_x: 新的 PlayResX
+            new_y: 新的 PlayResY
+        """
+        script_info = self.script_info
+        old_x, old_y = script_info.PlayResX, script_info.PlayResY
+        if not old_x and not old_y:
+            old_x, old_y = 384, 288
+        elif not old_x:
+            old_x = 1280 if old_y == 1024 else old_y * 4 / 3
+        elif not old_y:
+            old_y = 1024 if old_x == 1280 else old_x * 3 / 4
+        sx, sy = new_x / old_x, new_y / old_y
+        scale_borders = script_info.ScaledBorderAndShadow == ScaledBorderAndShadow.yes
+        self.styles.rescale(sx, sy, scale_borders)
+        self.events.rescale(sx, sy, scale_borders)
+        script_info.PlayResX, script_info.PlayResY = new_x, new_y
+
+    def validate(self) -> Errors:
+        """
+        转换并检查信任模式下尚未转换的样式与事件，以及尚未解析的事件文本，见 Events.validate
+
+        返回值：
+            转换中产生的错误，错误的 row 字段为样式或事件的下标，section 字段为 styles 或 events
+        """
+        err = Errors()
+        for name in ('styles', 'events'):
+            section_err = getattr(self, name).validate()
+            for record in section_err:
+                record.fields['section'] = name
+            err += section_err
         return err
 
+    def _set_trusted(self, trusted: bool) -> None:
+        # 直接设置内部的对象，不会触发按需解析
+        self._styles.trusted = self._events.trusted = trusted
+
     def parse_line(self, ass_str: str) -> Errors:
         err: Errors = Errors()
         ass_str = ass_str.lstrip()
-        if len(ass_str) == 0:  # 空行
+        if len(ass_str) == 0:  # 空行，只有未知部分保留
+            if isinstance(self._parser_status, RawSection):
+                err += self._parser_status.parse(ass_str)
             return err
         if ass_str.startswith('['):
             ass_str_lower = ass_str.lower()
@@ -32,14 +278,119 @@ class Ass:
                 self._parser_status = self.styles
             elif ass_str_lower.startswith(SCRIPT_INFO_PART_TITLE.lower(), 1):
                 self._parser_status = self.script_info
+            else:  # 未知部分，之后的行原样保存
+                raw_section = RawSection(ass_str.rstrip(), self._section_name(self._parser_status))
+                self.raw_sections.append(raw_section)
+                self._parser_status = raw_section
         else:
             err += self._parser_status.parse(ass_str)
         return err
 
-    def dump(self):
-        script_info_lines, script_info_errs = self.script_info.dump()
-        styles_lines, styles_errs = self.styles.dump()
-        events_lines, events_errs = self.events.dump()
-        lines = script_info_lines + [''] + styles_lines + [''] + events_lines
-        errors = script_info_errs + styles_errs + events_errs
+    def _section_name(self, section: ScriptInfo | Styles | Events | RawSection) -> str:
+        """ 已知部分的名称，未知部分返回其之前的已知部分的名称 """
+        if isinstance(section, RawSection):
+            return section.after
+        return next(name for name in _SECTION_NAMES if getattr(self, '_' + name) is section)
+
+    def __reduce__(self):
+        sections = (self.script_info, self.styles, self.events) + tuple(self.raw_sections)
+        parser_index = [section is self._parser_status for section in sections].index(True)
+        return self._restore, sections[:3] + (parser_index, self.load_errors, sections[3:])
+
+    @classmethod
+    def _restore(cls, script_info: ScriptInfo, styles: Styles, events: Events,
+                 parser_index: int, load_errors: Errors,
+                 raw_sections: tuple[RawSection, ...] = ()) -> 'Ass':
+        ass = cls()
+        ass.script_info, ass.styles, ass.events = script_info, styles, events
+        ass.raw_sections = list(raw_sections)
+        ass._parser_status = (script_info, styles, events, *raw_sections)[parser_index]
+        ass.load_errors = load_errors
+        return ass
+
+    def dump(self) -> (list[str], Errors):
+        errors = Errors()
+        lines = list(self.iter_dump(errors))
         return lines, errors
+
+    def iter_dump(self, errors: Errors | None = None) -> Iterator[str]:
+        """
+        逐行输出 ass 文本，不会生成中间的行列表
+
+        参数：
+            errors: 输出过程中产生的错误追加到这里
+        返回值：
+            行的迭代器，行尾不含换行
+        """
+        if errors is None:
+            errors = Errors()
+        for index, name in enumerate(_SECTION_NAMES):
+            if index:
+                yield ''
+            yield from getattr(self, name).iter_dump(errors)
+            for raw_section in self.raw_sections:  # 未知部分紧跟在原先位于其前的部分之后
+                if raw_section.after == name:
+                    yield ''
+                    yield from raw_section.iter_dump(errors)
+
+    def dump_to(self, fp: TextIO, buffer_size: int = 1 << 16) -> Errors:
+        """
+        将 ass 文本分块写入文件对象，内存占用不随脚本大小增长
+
+        写入的内容与 '\\n'.join(self.dump()[0]) 一致
+
+        参数：
+            fp: 文本模式打开的文件对象，或者其他有 write 方法的对象
+            buffer_size: 每次写入的大约字符数
+        返回值：
+            输出过程中产生的错误
+        """
+        errors = Errors()
+        buffer: list[str] = []
+        buffered = 0
+        separator = ''  # 块与块之间的换行
+        for line in self.iter_dump(errors):
+            buffer.append(line)
+            buffered += len(line) + 1
+            if buffered >= buffer_size:
+                fp.write(separator + '\n'.join(buffer))
+                separator = '\n'
+                buffer.clear()
+                buffered = 0
+        if buffer:
+            fp.write(separator + '\n'.join(buffer))
+        return errors
+
+    def save(self, path: str, encoding: str = 'utf-8', buffer_size: int = 1 << 16) -> Errors:
+        """
+        将 ass 文本写入文件
+
+        参数：
+            path: 文件路径
+            encoding: 文件编码
+            buffer_size: 每次写入的大约字符数
+        返回值：
+            输出过程中产生的错误
+        """
+        with open(path, 'w', encoding=encoding, newline='\n') as fp:
+            return self.dump_to(fp, buffer_size)
+
+
+def _add_errors(errors: Errors, line_errors: Errors, line: int,
+                max_errors: int | None, strict: bool) -> bool:
+    """
+    记录一行的错误
+
+    返回值：
+        是否需要停止解析
+    """
+    line_errors.set_line(line)
+    if strict:
+        for record in line_errors:
+            if record['level'] == 'error':
+                raise AssParseError(record)
+    errors += line_errors
+    if max_errors is not None and len(errors) >= max_errors:
+        errors.warn('Stopped after {count} errors. ', 'too_many_errors', count=len(errors))
+        return True
+    return False
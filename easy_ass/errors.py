@@ -1,19 +1,120 @@
+from collections.abc import Mapping
+
+
+class ErrorRecord(Mapping):
+    """
+    一条错误
+
+    只保存错误代码、消息模板与相关的值，读取 message 时才格式化消息。
+    可以像字典一样读取 e['level']、e['message']、e['code']、e['line'] 以及 field、value 等字段
+
+    属性：
+        level: error / warn
+        code: 错误代码，如 bad_value、field_count，直接传入消息时为 None
+        line: 所在的行号，从 1 开始，未知时为 None
+        fields: 格式化消息用到的值
+    """
+    __slots__ = ('level', 'code', 'line', 'fields', '_template', '_message')
+
+    def __init__(self, level: str, template: str, code: str | None = None,
+                 line: int | None = None, **fields):
+        self.level = level
+        self.code = code
+        self.line = line
+        self.fields = fields
+        self._template = template
+        self._message = None if fields else template
+
+    @property
+    def message(self) -> str:
+        if self._message is None:
+            self._message = self._template.format(**self.fields)
+        return self._message
+
+    def __getitem__(self, key: str):
+        if key == 'level':
+            return self.level
+        if key == 'message':
+            return self.message
+        if key == 'code':
+            return self.code
+        if key == 'line':
+            return self.line
+        return self.fields[key]
+
+    def __iter__(self):
+        yield from ('level', 'message', 'code', 'line')
+        yield from self.fields
+
+    def __len__(self) -> int:
+        return 4 + len(self.fields)
+
+    def __str__(self) -> str:
+        if self.line is None:
+            return '{}: {}'.format(self.level, self.message)
+        return 'line {}: {}: {}'.format(self.line, self.level, self.message)
+
+    def __repr__(self) -> str:
+        return '{}({!r}, {!r}, line={!r})'.format(self.__class__.__name__, self.level, self.code, self.line)
+
+    def __reduce__(self):
+        return self._restore, (self.level, self.code, self.line, self.message)
+
+    @classmethod
+    def _restore(cls, level: str, code: str | None, line: int | None, message: str) -> 'ErrorRecord':
+        # 字段中可能有无法 pickle 的值，只传递格式化后的消息
+        return cls(level, message, code, line)
+
+
+class AssParseError(ValueError):
+    """
+    严格模式下遇到第一个错误时抛出
+
+    属性：
+        record: 对应的错误
+    """
+
+    def __init__(self, record: ErrorRecord):
+        super().__init__(str(record))
+        self.record = record
+
+
 class Errors(list):
     """
     错误列表
+
+    元素为 ErrorRecord。消息可以带有 {field} 等占位符，由关键字参数提供对应的值，读取时才会格式化：
+        err.error('Could not parse `{value}` as `{field}`. ', code='bad_value', field=name, value=raw)
+    不带关键字参数时消息按原样保存
     """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-    def error(self, message: str):
-        self.append({'level': 'error', 'message': message})
+    def error(self, message: str, code: str | None = None, **fields):
+        self.append(ErrorRecord('error', message, code, **_compact(fields)))
         return self
 
-    def warn(self, message: str):
-        self.append({'level': 'warn', 'message': message})
+    def warn(self, message: str, code: str | None = None, **fields):
+        self.append(ErrorRecord('warn', message, code, **_compact(fields)))
         return self
 
+    def set_line(self, line: int) -> None:
+        """ 为尚未记录行号的错误填入行号 """
+        for record in self:
+            if isinstance(record, ErrorRecord) and record.line is None:
+                record.line = line
+
+
+def _compact(fields: dict) -> dict:
+    # 异常对象保存的 traceback 会引用整个调用栈，只保留异常本身
+    for key, value in fields.items():
+        if isinstance(value, BaseException):
+            fields[key] = value.with_traceback(None)
+    return fields
+
 
 __all__ = (
     'Errors',
+    'ErrorRecord',
+    'AssParseError',
 )
@@ -1,2 +1,5 @@
+from .interval import *
+from .store import *
 from .events import *
 from .text import *
+from .render import *
@@ -0,0 +1,176 @@
+"""
+绘图指令的解析与输出
+
+绘图路径保存为三个紧凑的数组，不为每个点创建对象：
+    ops: 每条指令的操作码，为 COMMANDS 中的下标
+    counts: 每条指令带有的点数
+    coords: 全部点的坐标，按 x0, y0, x1, y1, ... 依次排列
+
+指令：
+    m 移动并开始新的图形 / n 移动但不闭合当前图形 / l 直线 / b 三次贝塞尔曲线，每 3 个点一段 /
+    s 三次 B 样条，至少 3 个点 / p 延长 B 样条 / c 闭合 B 样条，不带点
+
+仿射变换矩阵为 (a, b, c, d, e, f)，即 x' = a*x + b*y + c，y' = d*x + e*y + f
+"""
+import re
+from array import array
+from typing import Sequence
+
+try:
+    import numpy
+except ImportError:  # 未安装 numpy 时使用纯 python 实现
+    numpy = None
+
+COMMANDS = 'mnlbspc'
+_OPCODES = {command: opcode for opcode, command in enumerate(COMMANDS)}
+_OP_B = _OPCODES['b']
+_OP_S = _OPCODES['s']
+_OP_C = _OPCODES['c']
+
+# 一条指令及其后直到下一条指令之前的内容，无法识别的字母与渲染器一样忽略
+_match_commands = re.compile(r'([{}])([^{}]*)'.format(COMMANDS, COMMANDS)).findall
+_match_numbers = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?').findall
+_match_int_suffix = re.compile(r'\.0(?= |$)')
+_match_path_chars = re.compile(r'[{}\d\s.eE+-]*'.format(COMMANDS)).fullmatch
+
+
+def is_path(path_str: str) -> bool:
+    """
+    字符串是否只由指令字母、数字与空白组成
+
+    绘图模式下不满足的文本不是绘图指令，如 {\\p1} 之后忘记关闭绘图模式的普通文本，应按原样保留
+    """
+    return _match_path_chars(path_str) is not None
+
+
+def parse_path(path_str: str) -> tuple[array, array, array]:
+    """
+    解析绘图指令
+
+    不完整的部分与渲染器一样丢弃：多余的单个坐标、b 不足 3 个点的部分、少于 3 个点的 s 以及没有点的指令。
+    第一条指令之前的数字同样忽略
+
+    参数：
+        path_str: 绘图指令，如 `m 0 0 l 100 0 100 100`
+    返回值：
+        (ops, counts, coords)
+    """
+    ops = array('B')
+    counts = array('I')
+    coords = array('d')
+    for command, args_str in _match_commands(path_str):
+        opcode = _OPCODES[command]
+        if opcode == _OP_C:
+            ops.append(opcode)
+            counts.append(0)
+            continue
+        numbers = _match_numbers(args_str)
+        count = len(numbers) // 2
+        if opcode == _OP_B:
+            count -= count % 3
+        if count == 0 or opcode == _OP_S and count < 3:
+            continue
+        coords.extend(map(float, numbers[:count * 2]))
+        ops.append(opcode)
+        counts.append(count)
+    return ops, counts, coords
+
+
+def _format_numbers(values) -> list[str]:
+    """ 将坐标转为字符串，整数不带小数部分 """
+    if not values:
+        return []
+    return _match_int_suffix.sub('', ' '.join(map(repr, values))).split(' ')
+
+
+def dump_path(ops: array, counts: array, coords: array) -> str:
+    """
+    输出为紧凑的绘图指令，同一条指令的多个点共用一个指令字母
+
+    参数：
+        ops, counts, coords: 见 parse_path
+    返回值：
+        绘图指令字符串
+    """
+    numbers = _format_numbers(coords)
+    parts = []
+    offset = 0
+    for opcode, count in zip(ops, counts):
+        parts.append(COMMANDS[opcode])
+        if count:
+            end = offset + count * 2
+            parts.append(' '.join(numbers[offset:end]))
+            offset = end
+    return ' '.join(parts)
+
+
+def path_bbox(coords: array) -> tuple[float, float, float, float] | None:
+    """
+    全部点的外接矩形，曲线的控制点也计算在内，因此结果可能比实际的图形略大
+
+    返回值：
+        (min_x, min_y, max_x, max_y)，没有点时返回 None
+    """
+    if not coords:
+        return None
+    xs, ys = coords[0::2], coords[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def apply_affine(coords: array, matrices: Sequence[float] | Sequence[Sequence[float]],
+                 counts: Sequence[int] | None = None, precision: int | None = None) -> None:
+    """
+    原地对整个坐标数组进行仿射变换，安装了 numpy 时一次处理全部坐标
+
+    参数：
+        coords: 按 x0, y0, x1, y1, ... 排列的坐标数组
+        matrices: 一个变换矩阵；指定 counts 时为每一段各自的矩阵
+        counts: 每一段的点数，依次对应 matrices 中的矩阵，总和应等于点数
+        precision: 结果保留的小数位数，None 表示不取整
+    """
+    if not coords:
+        return
+    if counts is None:
+        matrices, counts = (matrices,), (len(coords) // 2,)
+    if numpy is not None:
+        values = numpy.frombuffer(coords, dtype=numpy.float64)
+        if len(matrices) == 1:
+            a, b, c, d, e, f = matrices[0]
+        else:  # 每个点展开对应的矩阵
+            a, b, c, d, e, f = numpy.repeat(numpy.asarray(matrices, dtype=numpy.float64),
+                                            numpy.asarray(counts, dtype=numpy.intp), axis=0).T
+        xs = values[0::2].copy()
+        ys = values[1::2]
+        values[0::2] = a * xs + b * ys + c
+        values[1::2] = d * xs + e * ys + f
+        if precision is not None:
+            numpy.round(values, precision, out=values)
+        del values, xs, ys  # 释放对 array 缓冲区的引用
+        return
+    start = 0
+    for matrix, count in zip(matrices, counts):
+        a, b, c, d, e, f = matrix
+        end = start + count * 2
+        xs, ys = coords[start:end:2], coords[start + 1:end:2]
+        if b == 0 and d == 0:  # 只有缩放与平移时两个方向分别计算
+            new_xs = array('d', [a * x + c for x in xs])
+            new_ys = array('d', [e * y + f for y in ys])
+        else:
+            new_xs = array('d', [a * x + b * y + c for x, y in zip(xs, ys)])
+            new_ys = array('d', [d * x + e * y + f for x, y in zip(xs, ys)])
+        if precision is not None:
+            new_xs = array('d', [round(x, precision) for x in new_xs])
+            new_ys = array('d', [round(y, precision) for y in new_ys])
+        coords[start:end:2] = new_xs
+        coords[start + 1:end:2] = new_ys
+        start = end
+
+
+__all__ = (
+    'COMMANDS',
+    'parse_path',
+    'is_path',
+    'dump_path',
+    'path_bbox',
+    'apply_affine',
+)
@@ -1,63 +1,510 @@
+from array import array
+from collections.abc import MutableMapping, MutableSequence
 from enum import Enum
+import numbers
+from typing import Callable, Iterable, Iterator, Sequence
+
 from .text import Text
+from .store import EventStore, EVENT_COLUMNS, COLUMN_CONVERTERS, check_text
+from .retime import map_column, retime_text
+from .transform import transform_tags
+from .rescale import rescale_text, rescale_column
 
 from easy_ass.ass_types import AssTime
 from easy_ass.errors import Errors
+from easy_ass.raw import place_raw_lines
+from easy_ass.styles import Styles, StyleItem
+
+
+class Events(MutableSequence):
+    """
+    事件列表
+
+    数据按列保存在 EventStore 中，用法与 list 一致，取出的 EventItem 是指向其中一行的视图
 
+    与 list 的区别：
+     - 不是 list 的子类，需要 list 时使用 list(events)
+     - 一个事件只能属于一个 Events，切片、相加以及 copy 得到的是复制了这些事件的新 Events
+     - 相等比较的是事件的类型与各属性值
+    """
 
-class Events(list):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+    def __init__(self, events: Iterable['EventItem'] = ()):
+        self._store: EventStore = EventStore()
         self.event_format: EventFormat = ...
+        self.raw_lines: list[str] = []  # 注释与无法识别的行，原样输出
+        self._raw_positions: list[int] = []  # 各原样行之后第一个事件的下标，-1 表示在 Format 行之前
+        self.trusted: bool = False  # 信任模式，解析时不转换各字段，第一次读写时才转换
+        self.extend(events)
 
     def parse(self, ass_str: str) -> Errors:
         err = Errors()
-        ass_line = ass_str.split(':', 1)
-        if len(ass_line) != 2:
-            return err.error(f'Fail to parse `{ass_str}` as Styles. ')
-        title = ass_line[0].strip()
+        if ass_str.startswith(';'):  # 注释
+            self._add_raw_line(ass_str)
+            return err
+        title, sep, values_str = ass_str.partition(':')
+        if not sep:
+            return err.error('Fail to parse `{value}` as Events. ', 'bad_line', value=ass_str)
+        title = title.strip()
         if title == FORMAT_LINE_TITLE:
             self.event_format = EventFormat()
             err += self.event_format.parse(ass_str)
-        elif title == str(EventTypes.dialogue.value):
+        elif title in _EVENT_TYPES_MAPPER:  # Dialogue 以及 Comment 等其他类型的事件
             if self.event_format is ...:
-                return err.error(f'`Format` line is missing. ')
-            style_item = EventItem()
-            err += style_item.parse(ass_str, self.event_format)
-            self.append(style_item)
+                return err.error('`Format` line is missing. ', 'missing_format')
+            if self.trusted:
+                self._store.append_raw(_EVENT_TYPES_MAPPER[title], values_str, self.event_format)
+                return err
+            event_values = {}
+            err += self.event_format.parse_row(values_str, event_values)
+            check_text(event_values.get('Text'), err)  # Text 延迟解析，覆写代码在这里先检查一遍
+            self._store.append_row(_EVENT_TYPES_MAPPER[title], event_values)
+        else:
+            self._add_raw_line(ass_str)
         return err
 
+    def _add_raw_line(self, ass_str: str) -> None:
+        self.raw_lines.append(ass_str)
+        self._raw_positions.append(len(self._store) if self.event_format is not ... else -1)
+
     def dump(self) -> (list[str], Errors):
         errors: Errors = Errors()
-        dump_lines: list[str] = [
-            '[{}]'.format(EVENTS_PART_TITLE)
-        ]
+        dump_lines: list[str] = list(self.iter_dump(errors))
+        return dump_lines, errors
+
+    def iter_dump(self, errors: Errors) -> Iterator[str]:
+        """
+        逐行输出，错误追加到 errors 中
+        """
+        yield '[{}]'.format(EVENTS_PART_TITLE)
+        store = self._store
+        raw_head, raw_groups = place_raw_lines(self.raw_lines, self._raw_positions, len(store))
+        yield from raw_head
         format_line, format_err = self.event_format.dump()  # format 行
-        dump_lines += format_line
+        yield from format_line
         errors += format_err
 
-        for item in self:  # item 行
-            item_line, item_error = item.dump(self.event_format)
-            dump_lines += item_line
-            errors += item_error
-        return dump_lines, errors
+        event_attrs = self.event_format.event_attrs
+        key = self.event_format.compiled()
+        start = 0
+        for position, raw_lines in raw_groups + [(len(store), ())]:
+            for row in range(start, position):  # item 行，直接按列输出，不创建视图
+                yield store.dump_line(row, event_attrs, errors, key)
+            yield from raw_lines  # 原样行写回原来的位置
+            start = position
+
+    @property
+    def cache_lines(self) -> bool:
+        """
+        是否缓存每行输出的文本
+
+        开启后再次输出时只有修改过的行需要重新生成，适合反复修改、输出的场景；
+        缓存会占用与输出文本相当的内存，一次性的处理不需要开启
+        """
+        return self._store.cache_lines
+
+    @cache_lines.setter
+    def cache_lines(self, value: bool):
+        store = self._store
+        store.cache_lines = value
+        if not value:  # 关闭时释放缓存
+            store.lines = [None] * len(store)
+            store._lines_key = None
+
+    def validate(self) -> Errors:
+        """
+        转换并检查信任模式下尚未转换的全部事件，同时检查尚未解析的 Text 中的覆写代码及其参数
+
+        加载时只检查覆写代码能否识别，参数的错误在首次访问 Text 时才会以 AssParseError 抛出，
+        需要提前发现时调用本方法
+
+        返回值：
+            转换中产生的错误，错误的 row 字段为事件的下标
+        """
+        return self._store.validate()
+
+    def dirty_rows(self) -> list[int]:
+        """
+        列出上次 mark_clean 之后修改过的事件的下标
+
+        新加入的事件、写入过属性的事件、Text 内容或其中覆写代码参数修改过的事件都记为已修改，
+        解析得到的事件为未修改。删除的事件不会出现在结果中
+        """
+        return self._store.dirty_rows()
+
+    def mark_clean(self) -> None:
+        """ 将全部事件记为未修改，如保存之后调用 """
+        self._store.mark_clean()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __getitem__(self, index: int | slice):
+        if isinstance(index, slice):
+            return self._copy_rows(range(len(self._store))[index])
+        return self._store.view(self._store._normalize_index(index), EventItem)
+
+    def __setitem__(self, index: int | slice, value):
+        if isinstance(index, slice):
+            rows = range(len(self._store))[index]
+            value = list(value)
+            if index.step is None or index.step == 1:  # 普通切片赋值，长度可以不同
+                del self[index]
+                for offset, event_item in enumerate(value):
+                    self.insert(rows.start + offset, event_item)
+                return
+            if len(value) != len(rows):
+                raise ValueError(f'attempt to assign sequence of size {len(value)} '
+                                 f'to extended slice of size {len(rows)}')
+            for row, event_item in zip(rows, value):
+                self[row] = event_item
+            return
+        row = self._store._normalize_index(index)
+        event_item = self._check_item(value)
+        source_store, source_row = event_item._store, event_item._row
+        if source_store is self._store and source_row == row:
+            return
+        self._store.detach_view(row)  # 被替换的事件保留原来的数据
+        values = source_store.row_values(source_row)
+        self._store.event_types[row] = source_store.event_types[source_row]
+        self._store.mark_dirty(row)
+        for name in COLUMN_CONVERTERS:
+            self._store.set(row, name, values.get(name))
+        self._adopt(event_item, row)
+
+    def __delitem__(self, index: int | slice):
+        self._store.delete_rows(index)
+
+    def __iter__(self):
+        store = self._store
+        for row in range(len(store)):
+            yield store.view(row, EventItem)
+
+    def __contains__(self, value) -> bool:
+        return isinstance(value, EventItem) and value._store is self._store
+
+    def __repr__(self) -> str:
+        return '{}({!r})'.format(self.__class__.__name__, list(self))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Events):
+            other_rows = [(other._store, row) for row in range(len(other._store))]
+        elif isinstance(other, list) and all(isinstance(item, EventItem) for item in other):
+            other_rows = [(item._store, item._row) for item in other]
+        else:
+            return NotImplemented
+        store = self._store
+        if len(store) != len(other_rows):
+            return False
+        return all(store.row_key(row) == other_store.row_key(other_row)
+                   for row, (other_store, other_row) in enumerate(other_rows))
+
+    def __add__(self, other: Iterable['EventItem']) -> 'Events':
+        events = self.copy()
+        events.extend(other)
+        return events
+
+    def __radd__(self, other: Iterable['EventItem']) -> 'Events':
+        events = self._copy_rows(())
+        events.extend(other)
+        events.extend(self)
+        return events
+
+    def copy(self) -> 'Events':
+        """ 复制全部事件，得到的 Events 使用相同的 Format """
+        return self._copy_rows(range(len(self._store)))
+
+    def _copy_rows(self, rows: Iterable[int]) -> 'Events':
+        events = Events()
+        events.event_format = self.event_format
+        store, target = self._store, events._store
+        for row in rows:
+            target.append_row(store.event_types[row], store.row_values(row), dirty=True)
+        return events
+
+    def insert(self, index: int, value: 'EventItem') -> None:
+        event_item = self._check_item(value)
+        source_store = event_item._store
+        row = self._store.insert_row(index, source_store.event_types[event_item._row],
+                                     source_store.row_values(event_item._row), dirty=True)
+        self._adopt(event_item, row)
+
+    def append(self, value: 'EventItem') -> None:
+        event_item = self._check_item(value)
+        source_store = event_item._store
+        row = self._store.append_row(source_store.event_types[event_item._row],
+                                     source_store.row_values(event_item._row), dirty=True)
+        self._adopt(event_item, row)
+
+    def extend(self, values: Iterable['EventItem']) -> None:
+        if values is self:
+            values = list(values)
+        for value in values:
+            self.append(value)
+
+    def index(self, value, start: int = 0, stop: int | None = None) -> int:
+        if value in self and value._row in range(len(self._store))[start:stop]:
+            return value._row
+        raise ValueError(f'{value!r} is not in events')
+
+    def count(self, value) -> int:
+        return 1 if value in self else 0
+
+    def remove(self, value) -> None:
+        del self[self.index(value)]
+
+    def clear(self) -> None:
+        del self[:]
+
+    def reverse(self) -> None:
+        self._store.reorder(list(range(len(self._store) - 1, -1, -1)))
+
+    def sort(self, *, key=None, reverse: bool = False) -> None:
+        views = list(self)  # 排序期间保持视图存活，排序后它们仍指向原来的事件
+        if key is None:
+            order = sorted(range(len(views)), key=views.__getitem__, reverse=reverse)
+        else:
+            order = sorted(range(len(views)), key=lambda row: key(views[row]), reverse=reverse)
+        self._store.reorder(order)
+
+    def active_at(self, time: AssTime | int | float | str) -> list['EventItem']:
+        """
+        查找在某一时刻显示的事件，即 Start <= time < End
+
+        参数：
+            time: 时间，数字表示秒
+        返回值：
+            事件列表，按在 Events 中的顺序排列
+        """
+        time = COLUMN_CONVERTERS['Start'](time)
+        return self._overlapping(time, time + 1)
+
+    def overlapping(self, start: AssTime | int | float | str,
+                    end: AssTime | int | float | str) -> list['EventItem']:
+        """
+        查找与时间段 [start, end) 有重叠的事件
+
+        参数：
+            start: 开始时间，数字表示秒
+            end: 结束时间，数字表示秒
+        返回值：
+            事件列表，按在 Events 中的顺序排列
+        """
+        return self._overlapping(COLUMN_CONVERTERS['Start'](start), COLUMN_CONVERTERS['End'](end))
+
+    def _overlapping(self, start: int, end: int) -> list['EventItem']:
+        store = self._store
+        rows = store.overlapping(start, end)
+        rows.sort()
+        return [store.view(row, EventItem) for row in rows]
+
+    def group_by_style(self, styles: Styles) -> dict[StyleItem | None, list['EventItem']]:
+        """
+        按照使用的样式给事件分组
+
+        每个不同的样式名只查找一次，规则与 Styles.resolve 相同，
+        因此名称大小写不同或者找不到样式而回退到 Default 的事件会归入对应的样式
+
+        参数：
+            styles: 查找样式的样式列表，如 ass.styles
+        返回值：
+            {样式: 事件列表}，事件按在 Events 中的顺序排列；styles 为空时全部事件归入 None
+        """
+        store = self._store
+        store.ensure_converted()
+        rows_by_name: dict[str | None, list[int]] = {}
+        for row, name in enumerate(store.columns['Style']):  # 样式名已被驻留，不同的值很少
+            rows = rows_by_name.get(name)
+            if rows is None:
+                rows = rows_by_name[name] = []
+            rows.append(row)
+        rows_by_style: dict = {}
+        for name, rows in rows_by_name.items():
+            rows_by_style.setdefault(styles.resolve(name), []).extend(rows)
+        groups = {}
+        for style_item, rows in rows_by_style.items():
+            rows.sort()
+            groups[style_item] = [store.view(row, EventItem) for row in rows]
+        return groups
+
+    def shift(self, delta: AssTime | int | float | str) -> None:
+        """
+        整体平移全部事件的时间
+
+        参数：
+            delta: 平移量，数字表示秒，可以为负数，平移后小于 0 的时间取 0
+        """
+        delta = COLUMN_CONVERTERS['Start'](delta)
+        # 相对于事件开始的覆写代码时间不受平移影响
+        self._retime(lambda time: time + delta, lambda times: times + delta, retime_tags=False)
+
+    def scale(self, factor: float, anchor: AssTime | int | float | str = 0) -> None:
+        """
+        以 anchor 为基准缩放全部事件的时间，Move、Fade、FadeEx 中的时间也一起缩放
+
+        参数：
+            factor: 缩放倍数
+            anchor: 基准时间，数字表示秒
+        """
+        anchor = COLUMN_CONVERTERS['Start'](anchor)
+        self._retime(lambda time: anchor + (time - anchor) * factor,
+                     lambda times: anchor + (times - anchor) * factor)
+
+    def map_time(self, time_fn: Callable, vectorized: bool = False) -> None:
+        """
+        用任意函数转换全部事件的时间，Move、Fade、FadeEx 中的时间按转换后的绝对时间重新计算
+
+        参数：
+            time_fn: 时间转换函数，参数与返回值均为毫秒
+            vectorized: 为 True 时 time_fn 也能直接处理 numpy 数组，安装了 numpy 时会整列调用
+        """
+        self._retime(time_fn, time_fn if vectorized else None)
+
+    def convert_framerate(self, from_fps: float, to_fps: float) -> None:
+        """
+        转换帧率，如 23.976 转为 25 时全部时间变为原来的 23.976/25
+
+        参数：
+            from_fps: 原帧率
+            to_fps: 目标帧率
+        """
+        self.scale(from_fps / to_fps)
+
+    def transform(self, matrix: Sequence[float] | Sequence[Sequence[float]],
+                  shapes: bool = False, precision: int | None = 3) -> None:
+        """
+        对全部事件中 Pos、Move、Org、Clip 的坐标进行仿射变换，矩阵见 easy_ass.events.transform
+
+        尚未解析的文本中没有这些覆写代码时不会被解析
+
+        参数：
+            matrix: 全部事件共用的矩阵，或者与事件一一对应的矩阵列表
+            shapes: 是否同时变换绘图模式下的图形，见 transform_tags
+            precision: 结果保留的小数位数，None 表示不取整
+        """
+        store = self._store
+        store.ensure_converted()
+        per_event = not (len(matrix) > 0 and isinstance(matrix[0], numbers.Real))  # 兼容 numpy 数组
+        if per_event and len(matrix) != len(store):
+            raise ValueError('Expect {} matrices, got {}. '.format(len(store), len(matrix)))
+        markers = _SHAPE_MARKERS if shapes else _POSITION_MARKERS
+        rows = [row for row, text in enumerate(store.columns['Text'])
+                if text is not None and (type(text) is not str or any(marker in text for marker in markers))]
+        texts = [store.get(row, 'Text') for row in rows]  # 首次访问时解析
+        transform_tags(texts, [matrix[row] for row in rows] if per_event else matrix, shapes, precision)
+
+    def rescale(self, sx: float, sy: float, scale_borders: bool = True) -> None:
+        """
+        按分辨率之比缩放全部事件的边距以及文本中的坐标、字号、边框等，规则见 easy_ass.events.rescale
+
+        尚未解析的文本直接在原文上改写，不会被解析
+
+        参数：
+            sx: 横向比例
+            sy: 纵向比例
+            scale_borders: 是否缩放边框与阴影，即 ScaledBorderAndShadow 是否为 Yes
+        """
+        store = self._store
+        store.ensure_converted()
+        for name, factor in (('MarginL', sx), ('MarginR', sx), ('MarginV', sy)):
+            rescale_column(store.columns[name], EVENT_COLUMNS[name][1], factor)
+        texts = store.columns['Text']
+        for row, text in enumerate(texts):
+            if text is not None:
+                texts[row] = rescale_text(text, sx, sy, scale_borders)
+        store.mark_dirty()
+
+    def _retime(self, time_fn: Callable, vector_fn: Callable | None, retime_tags: bool = True) -> None:
+        store = self._store
+        store.ensure_converted()
+        starts, ends = store.columns['Start'], store.columns['End']
+        old_starts, old_ends = array(starts.typecode, starts), array(ends.typecode, ends)
+        map_column(starts, EVENT_COLUMNS['Start'][1], time_fn, vector_fn)
+        map_column(ends, EVENT_COLUMNS['End'][1], time_fn, vector_fn)
+        store.invalidate_times()
+        store.mark_dirty()
+        if not retime_tags:
+            return
+        null = EVENT_COLUMNS['Start'][1]
+        texts = store.columns['Text']
+        for row, text in enumerate(texts):
+            if text is None or old_starts[row] == null or old_ends[row] == null:
+                continue
+            texts[row] = retime_text(text, old_starts[row], old_ends[row], time_fn)
+
+    @staticmethod
+    def _check_item(value) -> 'EventItem':
+        if not isinstance(value, EventItem):
+            raise TypeError(f'Events only accepts `EventItem`, not `{type(value).__name__}`. ')
+        return value
+
+    def _adopt(self, event_item: 'EventItem', row: int) -> None:
+        # 独立的 EventItem 加入列表后直接成为该行的视图，与 list 保存引用的行为一致
+        if event_item._store.standalone:
+            self._store.bind(event_item, row)
 
 
 class EventFormat:
     def __init__(self):
         self.event_attrs: list[str] = []
+        self._row_converters: tuple[tuple[str, type], ...] | None = None
 
     def parse(self, ass_str: str) -> Errors:
         err = Errors()
         ass_line = ass_str.split(':', 1)
         if len(ass_line) != 2 or ass_line[0].strip() != FORMAT_LINE_TITLE:
-            return err.error(f'Fail to parse `{ass_str}` as event format. ')
+            return err.error('Fail to parse `{value}` as event format. ', 'bad_line', value=ass_str)
         style_attrs = ass_line[1].split(',')
         for event_attr in style_attrs:
             event_attr = event_attr.strip()
             if event_attr not in EVENT_ATTR_DEF:
-                return err.error(f'Unknown event attribute `{event_attr}`. ')
+                return err.error('Unknown event attribute `{field}`. ', 'unknown_field', field=event_attr)
             self.event_attrs.append(event_attr)
+        self.compile()
+        return err
+
+    def __getstate__(self):
+        return {'event_attrs': self.event_attrs, '_row_converters': None}  # 行解析器在使用时重新生成
+
+    def compile(self) -> None:
+        """
+        按照当前的列顺序生成行解析器
+
+        Format 行确定后列顺序不再变化，预先生成 (属性名, 转换函数) 元组，
+        每行数据只需切割一次，再按顺序依次转换。直接修改 event_attrs 后需重新调用
+        """
+        self._row_converters = tuple((event_attr, COLUMN_CONVERTERS[event_attr])
+                                     for event_attr in self.event_attrs)
+
+    def compiled(self) -> tuple[tuple[str, type], ...]:
+        """ 返回当前的行解析器，尚未生成时先生成；重新 compile 后得到新的对象，可用于判断 Format 是否变化 """
+        if self._row_converters is None:
+            self.compile()
+        return self._row_converters
+
+    def parse_row(self, values_str: str, event_attrs: dict) -> Errors:
+        """
+        解析一行事件的属性值部分，即 `Dialogue:` 之后的内容
+
+        参数：
+            values_str: 逗号分隔的属性值
+            event_attrs: 解析结果写入的字典，值为 EventStore 中的列值
+        返回值：
+            解析过程中产生的错误
+        """
+        err = Errors()
+        if self._row_converters is None:
+            self.compile()
+        row_converters = self._row_converters
+        event_values = values_str.split(',', len(row_converters) - 1)
+        if len(event_values) < len(row_converters):
+            return err.error('`Events` line does not match `Format` line! ', 'field_count', value=values_str)
+        event_attr, event_value = None, None
+        try:
+            for (event_attr, converter), event_value in zip(row_converters, event_values):
+                event_attrs[event_attr] = converter(event_value)
+        except Exception as exception:
+            return err.error('Could not parse `{value}` as `{field}`. Exception: {exception}. ',
+                             'bad_value', field=event_attr, value=event_value, exception=exception)
         return err
 
     def dump(self) -> (list[str], Errors):
@@ -66,61 +513,142 @@ class EventFormat:
 
 
 class EventItem:
+    """
+    事件
+
+    指向 EventStore 中一行的视图，单独创建时拥有只有一行的独立存储，加入 Events 后成为其中一行的视图
+    """
+    __slots__ = ('_store', '_row', '__weakref__')
+
     def __init__(self, **kwargs):
-        self.event_attrs = {attr_name: None for attr_name in EVENT_ATTR_DEF.keys()}
-        self.event_type: EventTypes = ...
+        store = EventStore(standalone=True)
+        store.bind(self, store.append_row(..., {}))
         for key, value in kwargs.items():  # 支持构造时传初始值
-            if key in self.event_attrs:
-                self.event_attrs[key] = value
+            if key in LAZY_EVENT_ATTRS and type(value) is str:
+                store.set(self._row, key, value)
+            elif key in EVENT_ATTR_DEF:
+                setattr(self, key, value)
 
     def parse(self, ass_str: str, event_format: EventFormat) -> Errors:
         err = Errors()
-        ass_line = ass_str.split(':', 1)
-        if len(ass_line) != 2:
-            return err.error(f'Fail to parse `{ass_str}` as style values. ')
+        event_type, sep, values_str = ass_str.partition(':')
+        if not sep:
+            return err.error('Fail to parse `{value}` as event values. ', 'bad_line', value=ass_str)
         # 解析类型
-        event_type = ass_line[0].strip()
-        if EventTypes(event_type) not in EventTypes:
-            return err.error(f'Unknown event type `{event_type}`. ')
-        self.event_type = EventTypes(event_type)
+        event_type = event_type.strip()
+        if event_type not in _EVENT_TYPES_MAPPER:
+            return err.error('Unknown event type `{value}`. ', 'unknown_event_type', value=event_type)
+        self.event_type = _EVENT_TYPES_MAPPER[event_type]
 
         # 解析属性
-        event_values = ass_line[1].split(',', len(event_format.event_attrs) - 1)
-        if len(event_values) < len(event_format.event_attrs):
-            return err.error(f'`Styles` line does not match `Format` line! ')
-        for index, style_attr in enumerate(event_format.event_attrs):
-            try:
-                self.event_attrs[style_attr] = \
-                    EVENT_ATTR_DEF[style_attr](event_values[index])
-            except Exception as exception:
-                return err.error(f'Could not parse `{event_values[index]}` '
-                                 f'as `{style_attr}`. Exception: {exception}. ')
+        event_values = {}
+        err += event_format.parse_row(values_str, event_values)
+        for key, value in event_values.items():
+            self._store.set(self._row, key, value)
         return err
 
-    def dump(self, style_format: EventFormat) -> (list[str], Errors):
+    def dump(self, event_format: EventFormat) -> (list[str], Errors):
         err = Errors()
-        style_values = []
-        for style_attr in style_format.event_attrs:
-            if self.event_attrs[style_attr] is None:
-                err.error(f'Style `{style_attr}` not specified. ')
-            else:
-                style_values.append(str(self.event_attrs[style_attr]))
-
-        events_line = self.event_type.value + ':' + ','.join(style_values)
+        events_line = self._store.dump_line(self._row, event_format.event_attrs, err,
+                                            event_format.compiled())
         return [events_line], err
 
+    @property
+    def event_type(self) -> 'EventTypes':
+        return self._store.event_types[self._row]
+
+    @event_type.setter
+    def event_type(self, value: 'EventTypes'):
+        self._store.event_types[self._row] = value
+        self._store.mark_dirty(self._row)
+
+    @property
+    def event_attrs(self) -> '_EventAttrs':
+        """ 全部属性的视图，写入等同于设置对应的属性 """
+        return _EventAttrs(self)
+
+    def __reduce__(self):
+        # 只传递这一行的列值，不会带上整个 EventStore
+        return self._restore, (self.event_type, self._store.row_values(self._row))
+
+    @classmethod
+    def _restore(cls, event_type: 'EventTypes', row_values: dict) -> 'EventItem':
+        store = EventStore(standalone=True)
+        event_item = cls.__new__(cls)
+        store.bind(event_item, store.append_row(event_type, row_values))
+        return event_item
+
     def __getattr__(self, attribute):
-        if attribute in self.event_attrs:
-            return self.event_attrs[attribute]
+        if attribute in EVENT_ATTR_DEF:
+            value = self._store.get(self._row, attribute)
+            if attribute in _TIME_ATTRS and value is not None:  # 原地修改时间时写回事件
+                value = _EventTime.bind(value.milliseconds, self, attribute)
+            return value
         raise AttributeError(attribute)
 
     def __setattr__(self, key, value):
-        if key in self.__dict__.get('event_attrs', {}):
-            self.__dict__['event_attrs'][key] = EVENT_ATTR_DEF[key](value)
+        if key in EVENT_ATTR_DEF:
+            if value is not None:
+                if key in LAZY_EVENT_ATTRS:
+                    value = EVENT_ATTR_DEF[key](value)
+                value = COLUMN_CONVERTERS[key](value)
+            self._store.set(self._row, key, value)
         else:
             super().__setattr__(key, value)
 
 
+class _EventTime(AssTime):
+    """
+    从事件读取的 Start、End
+
+    时间按列保存在 EventStore 中，每次读取都会创建新的对象，调用 parse 原地修改时把新值写回事件
+    """
+    __slots__ = ('_event', '_attribute')
+
+    @classmethod
+    def bind(cls, milliseconds: int, event: 'EventItem', attribute: str) -> '_EventTime':
+        time = cls.from_ms(milliseconds)
+        time._event = event
+        time._attribute = attribute
+        return time
+
+    def parse(self, value: str):
+        super().parse(value)
+        setattr(self._event, self._attribute, self)
+
+
+class _EventAttrs(MutableMapping):
+    """
+    EventItem.event_attrs 返回的属性视图
+
+    读写直接作用于事件所在的行，属性固定，不能增删
+    """
+    __slots__ = ('_event',)
+
+    def __init__(self, event: EventItem):
+        self._event = event
+
+    def __getitem__(self, key: str):
+        if key not in EVENT_ATTR_DEF:
+            raise KeyError(key)
+        store, row = self._event._store, self._event._row
+        return store.get_raw(row, key) if key in LAZY_EVENT_ATTRS else store.get(row, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in EVENT_ATTR_DEF:
+            raise KeyError(key)
+        setattr(self._event, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError('Could not delete event attribute `{}`. '.format(key))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(EVENT_ATTR_DEF)
+
+    def __len__(self) -> int:
+        return len(EVENT_ATTR_DEF)
+
+
 class EventTypes(Enum):
     dialogue = 'Dialogue'
     comment = 'Comment'
@@ -130,7 +658,10 @@ class EventTypes(Enum):
     command = 'Command'
 
 
+_EVENT_TYPES_MAPPER: dict[str, EventTypes] = {event_type.value: event_type for event_type in EventTypes}
 EVENTS_PART_TITLE = 'Events'
+_POSITION_MARKERS = ('\\pos', '\\move', '\\org', 'clip')  # 未解析的文本包含这些内容时才需要变换
+_SHAPE_MARKERS = _POSITION_MARKERS + ('\\p',)
 FORMAT_LINE_TITLE = 'Format'
 EVENT_ATTR_DEF = {
     'Marked': int,  # 是否已标识
@@ -145,6 +676,9 @@ EVENT_ATTR_DEF = {
     'Effect': str,  # 过渡效果 (暂不做特殊支持
     'Text': Text,  # 文本
 }
+_TIME_ATTRS = frozenset({'Start', 'End'})
+# 延迟解析的属性，解析时只保存原始字符串，首次访问时才转换；未访问过则原样输出
+LAZY_EVENT_ATTRS = frozenset({'Text'})
 
 __all__ = (
     'Events',
@@ -154,4 +688,5 @@ __all__ = (
     'EVENTS_PART_TITLE',
     'FORMAT_LINE_TITLE',
     'EVENT_ATTR_DEF',
+    'LAZY_EVENT_ATTRS',
 )
@@ -0,0 +1,90 @@
+from array import array
+
+
+class IntervalIndex:
+    """
+    区间索引
+
+    按开始时间排序的数组上的隐式平衡二叉树（每个节点额外记录子树中最大的结束时间），
+    查询与 [start, end) 相交的区间耗时 O(log n + k)。
+    区间均为左闭右开，单位与传入的数组一致。
+    """
+
+    def __init__(self, starts: array, ends: array, rows=None):
+        """
+        参数：
+            starts: 各区间的开始
+            ends: 各区间的结束
+            rows: 参与索引的行号，默认为全部
+        """
+        if rows is None:
+            rows = range(len(starts))
+        order = sorted(rows, key=starts.__getitem__)
+        self.rows: array = array('q', order)
+        self.starts: array = array('q', [starts[row] for row in order])
+        self.ends: array = array('q', [ends[row] for row in order])
+        self.max_ends: array = array('q', self.ends)
+        self.max_level: int = self._build()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _build(self) -> int:
+        ends, max_ends = self.ends, self.max_ends
+        length = len(ends)
+        if length == 0:
+            return -1
+        last_index = (length - 1) & ~1  # 最后一个叶子节点
+        last = ends[last_index]
+        level = 1
+        while 1 << level <= length:
+            half = 1 << (level - 1)
+            for index in range((half << 1) - 1, length, half << 2):
+                left = max_ends[index - half]
+                right = max_ends[index + half] if index + half < length else last
+                max_ends[index] = max(ends[index], left, right)
+            last_index = last_index - half if (last_index >> level) & 1 else last_index + half
+            if last_index < length and max_ends[last_index] > last:
+                last = max_ends[last_index]
+            level += 1
+        return level - 1
+
+    def overlapping(self, start: int, end: int) -> list[int]:
+        """
+        查找与 [start, end) 相交的区间
+
+        返回值：
+            行号列表，按开始时间排序
+        """
+        starts, ends, max_ends = self.starts, self.ends, self.max_ends
+        length = len(starts)
+        hits = []
+        if self.max_level < 0:
+            return hits
+        stack = [((1 << self.max_level) - 1, self.max_level, False)]
+        while stack:
+            index, level, visited = stack.pop()
+            if level <= 3:  # 子树较小时直接线性扫描
+                first = index >> level << level
+                last = min(first + (1 << (level + 1)) - 1, length)
+                for leaf in range(first, last):
+                    if starts[leaf] >= end:
+                        break
+                    if ends[leaf] > start:
+                        hits.append(leaf)
+            elif not visited:
+                stack.append((index, level, True))
+                left = index - (1 << (level - 1))
+                if left >= length or max_ends[left] > start:  # 左子树中可能存在相交的区间
+                    stack.append((left, level - 1, False))
+            elif index < length and starts[index] < end:
+                if ends[index] > start:
+                    hits.append(index)
+                stack.append((index + (1 << (level - 1)), level - 1, False))
+        rows = self.rows
+        return [rows[hit] for hit in hits]
+
+
+__all__ = (
+    'IntervalIndex',
+)
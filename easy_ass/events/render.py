@@ -0,0 +1,280 @@
+"""
+逐段计算文本的实际渲染状态
+
+以事件样式的属性为基础，按顺序应用 Text 中的覆写代码，得到每一段文本实际使用的字体、颜色等，
+可用于检查最小字号、颜色对比度等规则。
+
+状态对象只读且写时复制：两段文本之间没有覆写代码时共用同一个对象，
+每个样式的基础状态缓存在 StyleItem 中，样式修改后失效，大量事件反复计算时不会重复构造。
+
+用法：
+    for text, state in ass.iter_effective(ass.events[0]):
+        print(text, state.Fontsize, state.PrimaryColour)
+"""
+from typing import Callable, Iterator
+
+from .text import (
+    TextBase, Text, Str, DrawingPath, Bold, Italic, Underline, Delete, Border, BorderX, BorderY, Shadow, ShadowX, ShadowY,
+    FontName, FontSize, FontSizeInc, FontSizeDec, ScaleX, ScaleY, Space, Rotate, RotateZ, RotateX, RotateY,
+    AngleX, AngleY, Encoding, Color, PrimaryColor, SecondaryColor, OutlineColor, BackColor, Alpha,
+    PrimaryAlpha, SecondaryAlpha, OutlineAlpha, BackAlpha, Align, AlignEx, ChangeStyle, Draw, DrawBegin, DrawEnd,
+)
+from easy_ass.ass_types import AssColor
+from easy_ass.styles import Styles, StyleItem
+
+# 直接取自样式的属性
+_STYLE_FIELDS = ('Fontname', 'Fontsize', 'PrimaryColour', 'SecondaryColour', 'OutlineColour', 'BackColour',
+                 'Bold', 'Italic', 'Underline', 'StrikeOut', 'ScaleX', 'ScaleY', 'Spacing', 'Angle',
+                 'BorderStyle', 'Alignment', 'Encoding')
+_COLOR_FIELDS = ('PrimaryColour', 'SecondaryColour', 'OutlineColour', 'BackColour')
+
+
+class EffectiveState:
+    """
+    一段文本的实际渲染状态
+
+    属性与样式同名，另外有：
+        RotationX / RotationY: frx、fry 的旋转角度，Angle 为沿 Z 轴的旋转
+        ShearX / ShearY: fax、fay 的倾斜因数
+        OutlineX / OutlineY: 两个方向的边框宽度，初始为样式的 Outline
+        ShadowX / ShadowY: 两个方向的阴影深度，初始为样式的 Shadow
+        Drawing: 绘图等级，0 表示普通文本
+    颜色为带透明度的 AssColor，透明度位于最高字节；Bold 等开关与样式一致，-1 为开启，0 为关闭。
+    样式中未指定的属性为 None。
+
+    状态只读，需要修改时使用 replace 得到新的对象
+    """
+    __slots__ = ('_values',)
+
+    def __init__(self, values: dict):
+        object.__setattr__(self, '_values', values)
+
+    def __getattr__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __setattr__(self, key, value):
+        raise AttributeError('`EffectiveState` is read-only, use `replace()` instead. ')
+
+    def replace(self, **changes) -> 'EffectiveState':
+        """ 返回修改了部分属性的新状态 """
+        for key in changes:
+            if key not in self._values:
+                raise AttributeError(key)
+        return EffectiveState(dict(self._values, **changes))
+
+    def to_dict(self) -> dict:
+        return dict(self._values)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, EffectiveState):
+            return NotImplemented
+        return self is other or self._values == other._values
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return '{}({})'.format(self.__class__.__name__,
+                               ', '.join('{}={!r}'.format(key, str(value) if isinstance(value, AssColor) else value)
+                                         for key, value in self._values.items()))
+
+    def __reduce__(self):
+        return EffectiveState, (self._values,)
+
+
+def base_state(style: StyleItem | None) -> EffectiveState:
+    """
+    样式对应的初始状态，缓存在样式中，样式修改后重新生成
+
+    参数：
+        style: 样式，为 None 时全部属性为 None
+    """
+    if style is None:
+        return _EMPTY_STATE
+    state = style._state
+    if state is None:
+        style_attrs = style.style_attrs
+        values = {name: style_attrs[name] for name in _STYLE_FIELDS}
+        values.update(RotationX=0.0, RotationY=0.0, ShearX=0.0, ShearY=0.0,
+                      OutlineX=style_attrs['Outline'], OutlineY=style_attrs['Outline'],
+                      ShadowX=style_attrs['Shadow'], ShadowY=style_attrs['Shadow'], Drawing=0)
+        state = style.__dict__['_state'] = EffectiveState(values)
+    return state
+
+
+def iter_effective(text: Text | str, style: StyleItem | None,
+                   styles: Styles | None = None) -> Iterator[tuple[Str | DrawingPath, EffectiveState]]:
+    """
+    按顺序应用覆写代码，逐段输出文本及其实际渲染状态
+
+    与 libass 一致，Alignment 以第一个 an / a 为准，ChangeStyle 不改变 Alignment 与 Drawing；
+    pos、move、clip 等作用于整行的代码不属于逐段的状态，不在此计算
+
+    参数：
+        text: 事件的 Text，也可以是 ass 文本
+        style: 事件的样式，如 ass.style_of(event)
+        styles: ChangeStyle 按名称查找样式使用的样式列表，找不到时回到事件的样式
+    返回值：
+        (文本, 状态) 的迭代器，绘图模式下的文本为 DrawingPath；没有覆写代码分隔的相邻文本共用同一个状态对象
+    """
+    if not isinstance(text, Text):
+        text = Text(text)
+    base = base_state(style)
+    state = base
+    values = None  # 尚未生成状态对象的修改
+    aligned = False
+    for item in text:
+        item_type = type(item)
+        if item_type is Str or item_type is DrawingPath:
+            if values is not None:
+                state = EffectiveState(values)
+                values = None
+            yield item, state
+            continue
+        if item_type is ChangeStyle:
+            current = state._values if values is None else values
+            reset = base
+            if item.name and styles is not None:
+                reset = base_state(styles.find(item.name) or style)
+            values = dict(reset._values, Alignment=current['Alignment'], Drawing=current['Drawing'])
+            continue
+        if item_type is Align or item_type is AlignEx:
+            if aligned:
+                continue
+            aligned = True
+        apply = _APPLIERS.get(item_type)
+        if apply is None:
+            continue
+        if values is None:
+            values = dict(state._values)
+        apply(values, item, base._values)
+
+
+def _switch(value: int) -> int:
+    """ 开关代码的 1 转为与样式一致的 -1，其余值保留，如 Bold 的字重 """
+    return -1 if value == 1 else value
+
+
+def _set(field: str, arg: str, convert: Callable = None) -> Callable:
+    def apply(values: dict, item: TextBase, base: dict) -> None:
+        value = getattr(item, arg)
+        if value is not None:
+            values[field] = value if convert is None else convert(value)
+    return apply
+
+
+def _set_both(field_x: str, field_y: str, arg: str) -> Callable:
+    def apply(values: dict, item: TextBase, base: dict) -> None:
+        value = getattr(item, arg)
+        if value is not None:
+            values[field_x] = values[field_y] = value
+    return apply
+
+
+def _font_size(factor: int) -> Callable:
+    def apply(values: dict, item: FontSize, base: dict) -> None:
+        size = item.size
+        if size is None:
+            return
+        if factor == 0:  # 0 或负数表示恢复样式的大小
+            values['Fontsize'] = size if size > 0 else base['Fontsize']
+        elif values['Fontsize'] is not None:
+            values['Fontsize'] = values['Fontsize'] * (1 + factor * size / 10)
+    return apply
+
+
+def _color(fields: tuple[str, ...]) -> Callable:
+    def apply(values: dict, item: Color, base: dict) -> None:
+        for field in fields:
+            color = item.color if item.color is not None else base[field]  # 不带参数时恢复样式的颜色
+            if color is None:
+                continue
+            alpha = int(values[field]) & 0xFF000000 if values[field] is not None else 0
+            values[field] = AssColor(alpha | int(color) & 0x00FFFFFF)
+    return apply
+
+
+def _alpha(fields: tuple[str, ...]) -> Callable:
+    def apply(values: dict, item: Alpha, base: dict) -> None:
+        alpha = None
+        if item.alpha is not None:
+            try:
+                alpha = (int(item.alpha.strip('&Hh'), 16) & 0xFF) << 24
+            except ValueError:  # 无法识别的透明度与渲染器一样忽略
+                return
+        for field in fields:
+            if values[field] is None:
+                continue
+            if alpha is None:  # 不带参数时恢复样式的透明度
+                alpha_value = int(base[field]) & 0xFF000000 if base[field] is not None else 0
+            else:
+                alpha_value = alpha
+            values[field] = AssColor(alpha_value | int(values[field]) & 0x00FFFFFF)
+    return apply
+
+
+def _align(values: dict, item: Align, base: dict) -> None:
+    side = item.side
+    if type(item) is AlignEx:  # 旧式对齐 1-3 底部，5-7 顶部，9-11 中部，转为小键盘布局
+        column, row = side & 3, side >> 2
+        side = column + (0, 6, 3)[row] if column and row < 3 else None
+    values['Alignment'] = side if side is not None and 1 <= side <= 9 else base['Alignment']
+
+
+def _draw(values: dict, item: Draw | DrawBegin | DrawEnd, base: dict) -> None:
+    values['Drawing'] = item.level
+
+
+_APPLIERS: dict[type, Callable[[dict, TextBase, dict], None]] = {
+    Bold: _set('Bold', 'enable', _switch),
+    Italic: _set('Italic', 'enable', _switch),
+    Underline: _set('Underline', 'enable', _switch),
+    Delete: _set('StrikeOut', 'enable', _switch),
+    Border: _set_both('OutlineX', 'OutlineY', 'width'),
+    BorderX: _set('OutlineX', 'width'),
+    BorderY: _set('OutlineY', 'width'),
+    Shadow: _set_both('ShadowX', 'ShadowY', 'depth'),
+    ShadowX: _set('ShadowX', 'depth'),
+    ShadowY: _set('ShadowY', 'depth'),
+    FontName: _set('Fontname', 'name'),
+    FontSize: _font_size(0),
+    FontSizeInc: _font_size(1),
+    FontSizeDec: _font_size(-1),
+    ScaleX: _set('ScaleX', 'ratio'),
+    ScaleY: _set('ScaleY', 'ratio'),
+    Space: _set('Spacing', 'size'),
+    Rotate: _set('Angle', 'angle'),
+    RotateZ: _set('Angle', 'angle'),
+    RotateX: _set('RotationX', 'angle'),
+    RotateY: _set('RotationY', 'angle'),
+    AngleX: _set('ShearX', 'factor'),
+    AngleY: _set('ShearY', 'factor'),
+    Encoding: _set('Encoding', 'encoding'),
+    Color: _color(('PrimaryColour',)),
+    PrimaryColor: _color(('PrimaryColour',)),
+    SecondaryColor: _color(('SecondaryColour',)),
+    OutlineColor: _color(('OutlineColour',)),
+    BackColor: _color(('BackColour',)),
+    Alpha: _alpha(_COLOR_FIELDS),
+    PrimaryAlpha: _alpha(('PrimaryColour',)),
+    SecondaryAlpha: _alpha(('SecondaryColour',)),
+    OutlineAlpha: _alpha(('OutlineColour',)),
+    BackAlpha: _alpha(('BackColour',)),
+    Align: _align,
+    AlignEx: _align,
+    Draw: _draw,
+    DrawBegin: _draw,
+    DrawEnd: _draw,
+}
+
+_EMPTY_STATE = EffectiveState(dict.fromkeys(_STYLE_FIELDS + ('RotationX', 'RotationY', 'ShearX', 'ShearY',
+                                                             'OutlineX', 'OutlineY', 'ShadowX', 'ShadowY'),
+                                            None) | {'Drawing': 0})
+
+__all__ = (
+    'EffectiveState',
+    'base_state',
+    'iter_effective',
+)
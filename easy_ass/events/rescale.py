@@ -0,0 +1,189 @@
+"""
+分辨率缩放时改写文本中与尺寸相关的覆写代码
+
+sx、sy 为新旧 PlayResX、PlayResY 之比。坐标（Pos、Move、Org、Clip、绘图）按两个方向分别缩放，
+字号按 sy 缩放，横向的间距、xbord、xshad 按 sx 缩放，两个方向比例不同时 fscx 乘以 sx/sy 以保持字形。
+bord、shad 等只在 ScaledBorderAndShadow 为 Yes 时缩放，为 No 时它们以视频像素为单位，与 PlayRes 无关。
+
+未解析的字符串直接在原文上改写，不会被解析为 Text，与 retime_text 一致。
+"""
+import re
+from array import array
+
+from .drawing import parse_path, dump_path, apply_affine, is_path
+from .text import (
+    Text, DrawingPath, Pos, Org, Move, Clip, InverseClip, FontSize, Border, BorderX, BorderY,
+    Shadow, ShadowX, ShadowY, Space, ScaleX,
+)
+
+_match_code_part = re.compile(r'{[^}]*}')
+_match_sized_code = re.compile(
+    r'\\(i?clip|pos|move|org)\s*\(([^)]*)\)'
+    r'|\\(fscx|fsp|fs(?![-+])|xbord|ybord|bord|xshad|yshad|shad|p)(-?(?:\d+\.?\d*|\.\d+))')
+
+# 代码名: (方向, 是否为边框或阴影, 是否取整)，方向 x 按 sx、y 按 sy、ar 按 sx/sy 缩放
+_SIZED_CODES = {
+    'fs': ('y', False, True),
+    'fsp': ('x', False, True),
+    'fscx': ('ar', False, False),
+    'bord': ('y', True, False),
+    'xbord': ('x', True, False),
+    'ybord': ('y', True, False),
+    'shad': ('y', True, False),
+    'xshad': ('x', True, False),
+    'yshad': ('y', True, False),
+}
+# Text 中对应的类型: (代码名, 参数名)
+_SIZED_TYPES = {
+    FontSize: ('fs', 'size'),
+    Space: ('fsp', 'size'),
+    ScaleX: ('fscx', 'ratio'),
+    Border: ('bord', 'width'),
+    BorderX: ('xbord', 'width'),
+    BorderY: ('ybord', 'width'),
+    Shadow: ('shad', 'depth'),
+    ShadowX: ('xshad', 'depth'),
+    ShadowY: ('yshad', 'depth'),
+}
+
+
+def _round_number(value: float, integer: bool = False) -> int | float:
+    """ 缩放结果保留 3 位小数，整数值转为 int；integer 为 True 时四舍五入为整数 """
+    if integer:
+        return int(value + 0.5) if value >= 0 else -int(-value + 0.5)
+    value = round(float(value), 3)
+    return int(value) if value.is_integer() else value
+
+
+def rescale_text(text: str | Text, sx: float, sy: float, scale_borders: bool) -> str | Text:
+    """
+    按分辨率之比改写文本中的坐标与尺寸
+
+    参数：
+        text: 原始字符串或者 Text 对象
+        sx: 横向比例
+        sy: 纵向比例
+        scale_borders: 是否缩放边框与阴影，即 ScaledBorderAndShadow 是否为 Yes
+    返回值：
+        改写后的文本，Text 对象会被原地修改
+    """
+    factors = {'x': sx, 'y': sy, 'ar': sx / sy}
+    if isinstance(text, Text):
+        _rescale_text_object(text, sx, sy, scale_borders, factors)
+        return text
+    if '{' not in text:
+        return text
+
+    drawing = False
+
+    def rescale_code(match: re.Match) -> str:
+        nonlocal drawing
+        name = match.group(1)
+        if name is not None:
+            args = match.group(2).split(',')
+            try:
+                return '\\{}({})'.format(name, ','.join(_rescale_args(name, args, sx, sy)))
+            except ValueError:  # 无法识别的参数保持原样
+                return match.group()
+        name, value = match.group(3), match.group(4)
+        if name == 'p':
+            drawing = float(value) > 0
+            return match.group()
+        direction, is_border, integer = _SIZED_CODES[name]
+        if is_border and not scale_borders or factors[direction] == 1:
+            return match.group()
+        return '\\{}{}'.format(name, _round_number(float(value) * factors[direction], integer))
+
+    parts = []
+    curr_pos = 0
+    for match in _match_code_part.finditer(text):
+        if match.start() != curr_pos:
+            segment = text[curr_pos:match.start()]
+            parts.append(_rescale_path(segment, sx, sy) if drawing else segment)
+        parts.append(_match_sized_code.sub(rescale_code, match.group()))
+        curr_pos = match.end()
+    if curr_pos != len(text):
+        segment = text[curr_pos:]
+        parts.append(_rescale_path(segment, sx, sy) if drawing else segment)
+    return ''.join(parts)
+
+
+def _rescale_args(name: str, args: list[str], sx: float, sy: float) -> list[str]:
+    if name in ('pos', 'org'):
+        if len(args) != 2:
+            raise ValueError(name)
+        return [str(_round_number(float(args[0]) * sx)), str(_round_number(float(args[1]) * sy))]
+    if name == 'move':
+        if len(args) not in (4, 6):
+            raise ValueError(name)
+        return _rescale_points(args[:4], sx, sy) + args[4:]
+    if len(args) == 4:  # 矩形 clip
+        return _rescale_points(args, sx, sy)
+    if len(args) == 2:  # 带绘图等级的矢量 clip，只有缩放时与等级无关
+        return [args[0], _rescale_path(args[1], sx, sy)]
+    return [_rescale_path(','.join(args), sx, sy)]
+
+
+def _rescale_points(args: list[str], sx: float, sy: float) -> list[str]:
+    return [str(_round_number(float(value) * (sx if index % 2 == 0 else sy))) for index, value in enumerate(args)]
+
+
+def _rescale_path(path_str: str, sx: float, sy: float) -> str:
+    if not is_path(path_str):  # 绘图模式下的普通文本保持原样，与 Text 的解析一致
+        return path_str
+    ops, counts, coords = parse_path(path_str)
+    if not ops:
+        return path_str
+    apply_affine(coords, (sx, 0.0, 0.0, 0.0, sy, 0.0), precision=3)
+    return dump_path(ops, counts, coords)
+
+
+def _rescale_text_object(text: Text, sx: float, sy: float, scale_borders: bool, factors: dict) -> None:
+    matrix = (sx, 0.0, 0.0, 0.0, sy, 0.0)
+    changed = False
+    for item in text:
+        item_type = type(item)
+        if item_type is DrawingPath:
+            apply_affine(item.coords, matrix, precision=3)
+            changed = True
+            continue
+        sized = _SIZED_TYPES.get(item_type)
+        if sized is not None:
+            name, arg = sized
+            direction, is_border, integer = _SIZED_CODES[name]
+            value = getattr(item, arg)
+            if value is None or is_border and not scale_borders or factors[direction] == 1:
+                continue
+            item._set_args(**{arg: _round_number(value * factors[direction], integer)})
+            changed = True
+            continue
+        if item_type is Pos or item_type is Org:
+            item._set_args(x=_round_number(item.x * sx), y=_round_number(item.y * sy))
+        elif item_type is Move:  # x1, x2 为开始位置，y1, y2 为结束位置
+            item._set_args(x1=_round_number(item.x1 * sx), x2=_round_number(item.x2 * sy),
+                           y1=_round_number(item.y1 * sx), y2=_round_number(item.y2 * sy))
+        elif item_type is Clip or item_type is InverseClip:
+            if item.path is not None:
+                apply_affine(item.path.coords, matrix, precision=3)
+            elif item.x1 is not None:
+                item._set_args(x1=_round_number(item.x1 * sx), y1=_round_number(item.y1 * sy),
+                               x2=_round_number(item.x2 * sx), y2=_round_number(item.y2 * sy))
+        else:
+            continue
+        changed = True
+    if changed:
+        text._touch()
+
+
+def rescale_column(column: array, null: int, factor: float) -> None:
+    """ 原地缩放一整列整数，如事件的边距，空值与 0 保持不变，结果四舍五入 """
+    if factor == 1:
+        return
+    column[:] = array(column.typecode, [value if value == null else _round_number(value * factor, True)
+                                        for value in column])
+
+
+__all__ = (
+    'rescale_text',
+    'rescale_column',
+)
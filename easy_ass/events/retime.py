@@ -0,0 +1,93 @@
+import re
+from array import array
+from typing import Callable
+
+from .text import Text, Move, Fade, FadeEx
+
+try:
+    import numpy
+except ImportError:  # 未安装 numpy 时使用纯 python 实现
+    numpy = None
+
+_match_code_part = re.compile(r'{[^}]*}')
+_match_timed_code = re.compile(r'\\(move|fade?)\s*\(([^)]*)\)')
+
+
+def map_column(column: array, null: int,
+               time_fn: Callable[[int], int],
+               vector_fn: Callable | None = None) -> None:
+    """
+    原地转换一整列时间，空值保持不变，结果小于 0 时取 0
+
+    参数：
+        column: 整数毫秒时间列
+        null: 表示空值的数
+        time_fn: 对单个时间的转换
+        vector_fn: 对整个 numpy 数组的转换，安装了 numpy 时优先使用
+    """
+    if numpy is not None and vector_fn is not None:
+        values = numpy.frombuffer(column, dtype=numpy.int64)
+        mask = values != null
+        values[mask] = numpy.maximum(numpy.rint(vector_fn(values[mask])), 0)
+        del values, mask  # 释放对 array 缓冲区的引用
+        return
+    column[:] = array(column.typecode, [value if value == null else max(round(time_fn(value)), 0)
+                                        for value in column])
+
+
+def retime_text(text: str | Text, start: int, end: int,
+                time_fn: Callable[[int], int]) -> str | Text:
+    """
+    改写文本中与事件时间相关的覆写代码：Move 的 t1/t2、Fade 和 FadeEx 的时间
+
+    这些时间都是相对于事件开始（Fade 的 t2 相对于结束）的毫秒数，
+    会按照绝对时间经过 time_fn 转换后重新计算。未解析的字符串直接在原文上改写，不会被解析。
+
+    参数：
+        text: 原始字符串或者 Text 对象
+        start: 事件转换前的开始时间，毫秒
+        end: 事件转换前的结束时间，毫秒
+        time_fn: 对绝对时间的转换
+    返回值：
+        改写后的文本，Text 对象会被原地修改
+    """
+    new_start = time_fn(start)
+
+    def from_start(value: int) -> int:
+        return round(time_fn(start + value) - new_start)
+
+    def to_end(value: int) -> int:
+        return round(time_fn(end) - time_fn(end - value))
+
+    if isinstance(text, Text):
+        for item in text:
+            if isinstance(item, Move):
+                if item.t1 is not None and item.t2 is not None:
+                    item.t1, item.t2 = from_start(item.t1), from_start(item.t2)
+            elif isinstance(item, FadeEx):
+                item.t1, item.t2, item.t3, item.t4 = \
+                    (from_start(value) for value in (item.t1, item.t2, item.t3, item.t4))
+            elif isinstance(item, Fade):
+                item.t1, item.t2 = from_start(item.t1), to_end(item.t2)
+        return text
+
+    if '\\move' not in text and '\\fad' not in text:
+        return text
+
+    def retime_code(match: re.Match) -> str:
+        name, args = match.group(1), match.group(2).split(',')
+        try:
+            if name == 'move' and len(args) == 6:
+                args[4:6] = (str(from_start(int(value))) for value in args[4:6])
+            elif name.startswith('fad') and len(args) == 2:
+                args = [str(from_start(int(args[0]))), str(to_end(int(args[1])))]
+            elif name == 'fade' and len(args) == 7:
+                args[3:7] = (str(from_start(int(value))) for value in args[3:7])
+            else:
+                return match.group()
+        except ValueError:  # 无法识别的参数保持原样
+            return match.group()
+        return '\\{}({})'.format(name, ','.join(args))
+
+    return _match_code_part.sub(lambda part: _match_timed_code.sub(retime_code, part.group()), text)
+
@@ -0,0 +1,493 @@
+import math
+import sys
+import weakref
+from array import array
+
+from .text import Text
+from .interval import IntervalIndex
+from easy_ass.ass_types import AssTime
+from easy_ass.errors import Errors, AssParseError
+
+
+def _int_in(value) -> int:
+    return int(value)
+
+
+def _time_in(value) -> int:
+    """ 将时间转为整数毫秒，数字表示秒 """
+    if isinstance(value, str):
+        return AssTime.parse_ms(value)
+    if isinstance(value, AssTime):
+        return value.milliseconds
+    return round(value * 1000)
+
+
+def _str_in(value) -> str:
+    return sys.intern(str(value))
+
+
+def _text_in(value):
+    return value
+
+
+def check_text(value, err: Errors, full: bool = False) -> Errors:
+    """
+    检查尚未解析的 Text，错误记入 err
+
+    默认只检查覆写代码能否识别，解析本身留到首次访问时；
+    full 为 True 时完整解析一遍（不保留结果），参数无法转换的代码同样报告
+    """
+    if type(value) is str and '{' in value:
+        code = Text.find_unknown_code(value)
+        if code is not None:
+            err.error('Unknown override code `{value}`. ', 'unknown_code', field='Text', value=code)
+        elif full:
+            try:
+                Text(value)
+            except (TypeError, ValueError) as exception:
+                _text_error(err, value, exception)
+    return err
+
+
+def _text_error(err: Errors, value: str, exception: Exception) -> Errors:
+    return err.error('Could not parse `{value}` as `{field}`. Exception: {exception}. ',
+                     'bad_value', field='Text', value=value, exception=exception)
+
+
+_NULL_INT = -2 ** 31  # 整数列中表示未指定的值
+_NULL_TIME = -2 ** 63  # 时间列中表示未指定的值
+
+# 列定义 属性名: (数组类型码 / None 表示使用 list, 空值, 写入转换, 读出转换)
+EVENT_COLUMNS = {
+    'Marked': ('i', _NULL_INT, _int_in, None),
+    'Layer': ('i', _NULL_INT, _int_in, None),
+    'Start': ('q', _NULL_TIME, _time_in, AssTime.from_ms),
+    'End': ('q', _NULL_TIME, _time_in, AssTime.from_ms),
+    'Style': (None, None, _str_in, None),  # 字符串列会被驻留，相同的样式名只保存一份
+    'Name': (None, None, _str_in, None),
+    'MarginL': ('i', _NULL_INT, _int_in, None),
+    'MarginR': ('i', _NULL_INT, _int_in, None),
+    'MarginV': ('i', _NULL_INT, _int_in, None),
+    'Effect': (None, None, _str_in, None),
+    'Text': (None, None, _text_in, None),  # 原始字符串或者 Text 对象
+}
+_TIME_COLUMNS = frozenset({'Start', 'End'})
+_COLUMN_DUMPERS = {'Start': AssTime.dump_ms, 'End': AssTime.dump_ms}  # 其余列直接使用 str
+COLUMN_CONVERTERS = {name: column_def[2] for name, column_def in EVENT_COLUMNS.items()}
+
+
+class EventStore:
+    """
+    列式事件存储
+
+    每个属性一列，整数和时间（整数毫秒）保存在 array 中，样式名等字符串驻留后保存在 list 中，
+    Text 保存原始字符串或者解析后的 Text 对象。EventItem 只是指向其中一行的视图。
+
+    同一行同一时刻最多只有一个存活的视图对象，插入、删除、排序时会同步修正视图的行号，
+    被删除行的视图会把数据复制到自己独立的存储中，之后仍然可以继续使用。
+
+    每行记录上次标记为未修改时 Text 的版本号，写入属性后记为 -1，以此列出修改过的行。
+    开启 cache_lines 后会缓存每行输出的文本，再次输出时未修改的行直接复用。
+
+    信任模式解析的行只保存 Format 之后的原始文本，各列为空值，第一次读写该行时才转换，
+    未转换的行按原样输出。
+    """
+
+    def __init__(self, standalone: bool = False):
+        self.standalone = standalone  # 是否为单个 EventItem 独占的存储
+        self.columns: dict[str, array | list] = {
+            name: array(type_code) if type_code is not None else []
+            for name, (type_code, _, _, _) in EVENT_COLUMNS.items()
+        }
+        self.event_types: list = []
+        self.clean_versions: array = array('q')  # 未修改时 Text 的版本号，-1 表示已修改
+        self.lines: list[tuple[str, int] | None] = []  # 缓存的 (输出行, Text 版本号)
+        self.cache_lines: bool = False
+        self._lines_key = None  # 缓存对应的 Format 行解析器，Format 变化后缓存失效
+        self.raw_rows: list[str | None] = []  # 尚未转换的行的原始文本
+        self._raw_count: int = 0
+        self._raw_format = None  # 转换原始文本使用的 EventFormat
+        self._views = weakref.WeakValueDictionary()  # 行号: 存活的视图
+        self._interval_index: IntervalIndex | None = None  # 时间区间索引，结构变化后置空，用到时重建
+        self._unindexed: set[int] = set()  # 建立索引之后追加或者修改过时间的行，查询时逐个检查
+
+    def __len__(self) -> int:
+        return len(self.event_types)
+
+    def append_row(self, event_type, values: dict, dirty: bool = False) -> int:
+        """
+        追加一行，values 中为已经转换为列类型的值，未给出的属性填入空值
+
+        参数：
+            dirty: 是否记为已修改，解析得到的行为未修改
+        返回值：
+            新行的行号
+        """
+        self._unindex(len(self))
+        self.event_types.append(event_type)
+        self.clean_versions.append(-1 if dirty else 0)
+        self.lines.append(None)
+        self.raw_rows.append(None)
+        for name, column in self.columns.items():
+            column.append(values.get(name, EVENT_COLUMNS[name][1]))
+        return len(self.event_types) - 1
+
+    def append_raw(self, event_type, values_str: str, event_format) -> int:
+        """
+        追加一行未转换的原始文本，即 `Dialogue:` 之后的内容
+
+        参数：
+            event_format: 之后用于转换的 EventFormat，与之前未转换的行不同时先转换之前的行
+        返回值：
+            新行的行号
+        """
+        if event_format is not self._raw_format:
+            self.ensure_converted()
+            self._raw_format = event_format
+        row = self.append_row(event_type, {})
+        self.raw_rows[row] = values_str
+        self._raw_count += 1
+        return row
+
+    def insert_row(self, index: int, event_type, values: dict, dirty: bool = False) -> int:
+        """
+        在 index 处插入一行，其后各行的行号加一
+
+        参数：
+            dirty: 是否记为已修改
+        返回值：
+            新行的行号
+        """
+        index = self._normalize_index(index, insert=True)
+        self.invalidate_times()
+        self._shift_views(index, 1)
+        self.event_types.insert(index, event_type)
+        self.clean_versions.insert(index, -1 if dirty else 0)
+        self.lines.insert(index, None)
+        self.raw_rows.insert(index, None)
+        for name, column in self.columns.items():
+            column.insert(index, values.get(name, EVENT_COLUMNS[name][1]))
+        return index
+
+    def delete_rows(self, index: int | slice) -> None:
+        """ 删除一行或者一个切片范围内的行 """
+        self.invalidate_times()
+        if not isinstance(index, slice):
+            row = self._normalize_index(index)
+            self.detach_view(row)
+            del self.event_types[row]
+            del self.clean_versions[row]
+            del self.lines[row]
+            self._raw_count -= self.raw_rows.pop(row) is not None
+            for column in self.columns.values():
+                del column[row]
+            self._shift_views(row + 1, -1)
+            return
+        deleted = set(range(len(self))[index])
+        for row in deleted:  # 被删除行的视图脱离本存储
+            self.detach_view(row)
+        kept = [row for row in range(len(self)) if row not in deleted]
+        del self.event_types[index]
+        del self.clean_versions[index]
+        del self.lines[index]
+        del self.raw_rows[index]
+        self._raw_count = len(self.raw_rows) - self.raw_rows.count(None)
+        for column in self.columns.values():
+            del column[index]
+        self._remap_views({old: new for new, old in enumerate(kept)})
+
+    def reorder(self, order: list[int]) -> None:
+        """ 按照 order 重新排列各行，新的第 i 行为原来的第 order[i] 行 """
+        self.invalidate_times()
+        self.event_types = [self.event_types[row] for row in order]
+        self.clean_versions = array('q', [self.clean_versions[row] for row in order])
+        self.lines = [self.lines[row] for row in order]
+        self.raw_rows = [self.raw_rows[row] for row in order]
+        for name, column in self.columns.items():
+            values = [column[row] for row in order]
+            self.columns[name] = array(column.typecode, values) if isinstance(column, array) else values
+        self._remap_views({old: new for new, old in enumerate(order)})
+
+    def row_values(self, row: int) -> dict:
+        """ 返回一行的原始列值，不包含空值 """
+        self.ensure_converted(row)
+        return {name: column[row] for name, column in self.columns.items()
+                if column[row] != EVENT_COLUMNS[name][1]}
+
+    def row_key(self, row: int) -> tuple:
+        """ 一行的类型与列值，用于比较两行内容是否相同，Text 统一为输出的字符串 """
+        values = self.row_values(row)
+        text = values.get('Text')
+        if isinstance(text, Text):
+            values['Text'] = text.dump()
+        return self.event_types[row], values
+
+    def get(self, row: int, name: str):
+        """ 读取一个属性，并转换为对外的类型 """
+        if self._raw_count and self.raw_rows[row] is not None:
+            self.ensure_converted(row)
+        column = self.columns[name]
+        value = column[row]
+        _, null, _, converter = EVENT_COLUMNS[name]
+        if value == null:
+            return None
+        if converter is not None:
+            return converter(value)
+        if name == 'Text' and type(value) is str:  # 首次访问时才解析覆写代码
+            try:
+                value = Text(value)
+            except (TypeError, ValueError) as exception:
+                err = _text_error(Errors(), value, exception)
+                err[0].fields['row'] = row
+                raise AssParseError(err[0]) from None
+            column[row] = value
+        return value
+
+    def get_raw(self, row: int, name: str):
+        """ 读取一个属性的列值，未解析的 Text 保持为字符串 """
+        if self._raw_count and self.raw_rows[row] is not None:
+            self.ensure_converted(row)
+        value = self.columns[name][row]
+        return None if value == EVENT_COLUMNS[name][1] else value
+
+    def set(self, row: int, name: str, value) -> None:
+        """ 写入一个已经转换为列类型的值，None 表示清空 """
+        if self._raw_count and self.raw_rows[row] is not None:
+            self.ensure_converted(row)
+        if name in _TIME_COLUMNS:
+            self._unindex(row)
+        self.columns[name][row] = EVENT_COLUMNS[name][1] if value is None else value
+        self.clean_versions[row] = -1
+        self.lines[row] = None
+
+    def mark_dirty(self, row: int | None = None) -> None:
+        """ 将一行记为已修改，row 为 None 时记全部行，直接修改列或 event_types 后调用 """
+        if row is None:
+            self.clean_versions = array('q', [-1]) * len(self)
+            self.lines = [None] * len(self)
+        else:
+            self.clean_versions[row] = -1
+            self.lines[row] = None
+
+    def is_dirty(self, row: int) -> bool:
+        """ 一行在上次 mark_clean 之后是否修改过，包括其中 Text 的修改 """
+        clean_version = self.clean_versions[row]
+        if clean_version < 0:
+            return True
+        text = self.columns['Text'][row]
+        return isinstance(text, Text) and text._version != clean_version
+
+    def dirty_rows(self) -> list[int]:
+        """ 全部修改过的行号 """
+        return [row for row in range(len(self)) if self.is_dirty(row)]
+
+    def mark_clean(self) -> None:
+        """ 将全部行记为未修改，如保存之后调用 """
+        texts = self.columns['Text']
+        self.clean_versions = array('q', [text._version if isinstance(text, Text) else 0
+                                          for text in texts])
+
+    def _convert_raw(self, row: int) -> Errors:
+        values = {}
+        err = self._raw_format.parse_row(self.raw_rows[row], values)
+        self.raw_rows[row] = None
+        self._raw_count -= 1
+        for name, value in values.items():
+            self.columns[name][row] = value
+        return err
+
+    def ensure_converted(self, row: int | None = None) -> None:
+        """
+        转换一行或者全部行（row 为 None）的原始文本，直接读写列之前调用
+
+        转换失败时抛出 AssParseError
+        """
+        if not self._raw_count:
+            return
+        if row is not None:
+            if self.raw_rows[row] is not None:
+                err = self._convert_raw(row)
+                if err:
+                    raise AssParseError(err[0])
+            return
+        err = self.validate(check_codes=False)  # 无法识别的覆写代码不影响列值，留到解析 Text 时报告
+        if err:
+            raise AssParseError(err[0])
+
+    def validate(self, check_codes: bool = True) -> Errors:
+        """
+        转换全部未转换的行，返回转换中产生的错误，错误的 row 字段为所在的行号
+
+        check_codes 为 True 时同时完整解析一遍尚未解析的 Text，检查其中的覆写代码及参数，见 check_text
+        """
+        err = Errors()
+        for row, values_str in enumerate(self.raw_rows if self._raw_count else ()):
+            if values_str is not None:
+                row_err = self._convert_raw(row)
+                for record in row_err:
+                    record.fields['row'] = row
+                err += row_err
+        if check_codes:
+            for row, text in enumerate(self.columns['Text']):
+                row_err = check_text(text, Errors(), full=True)
+                for record in row_err:
+                    record.fields['row'] = row
+                err += row_err
+        return err
+
+    def invalidate_times(self) -> None:
+        """ 直接修改时间列或者行号发生变化后调用，使依赖时间的缓存失效 """
+        self._interval_index = None
+        self._unindexed.clear()
+
+    def _unindex(self, row: int) -> None:
+        """
+        一行的时间发生变化或者追加了新行，索引中该行的记录不再可靠，之后查询时逐个检查这些行。
+        这样的行超过索引大小的平方根量级时才丢弃索引，逐行追加、修改与查询交替进行时不必每次重建
+        """
+        index = self._interval_index
+        if index is None:
+            return
+        unindexed = self._unindexed
+        unindexed.add(row)
+        if len(unindexed) > 4 * math.isqrt(len(index)) + 64:
+            self.invalidate_times()
+
+    def interval_index(self) -> IntervalIndex:
+        """
+        返回 Start/End 的区间索引，尚未建立或者已经失效时重新建立，未指定时间的行不参与索引
+
+        索引中不包含 _unindexed 中各行的最新时间，查询应使用 overlapping
+        """
+        if self._interval_index is None:
+            self.ensure_converted()
+            starts, ends = self.columns['Start'], self.columns['End']
+            rows = [row for row in range(len(self))
+                    if starts[row] != _NULL_TIME and ends[row] != _NULL_TIME]
+            self._interval_index = IntervalIndex(starts, ends, rows)
+            self._unindexed.clear()
+        return self._interval_index
+
+    def overlapping(self, start: int, end: int) -> list[int]:
+        """ 查找时间与 [start, end) 相交的行，返回的行号未排序 """
+        rows = self.interval_index().overlapping(start, end)
+        unindexed = self._unindexed
+        if not unindexed:
+            return rows
+        self.ensure_converted()
+        starts, ends = self.columns['Start'], self.columns['End']
+        rows = [row for row in rows if row not in unindexed]
+        rows.extend(row for row in unindexed if starts[row] != _NULL_TIME and ends[row] != _NULL_TIME
+                    and starts[row] < end and ends[row] > start)
+        return rows
+
+    def view(self, row: int, view_type: type):
+        """ 返回指向某一行的视图，存活的视图会被复用 """
+        view = self._views.get(row)
+        if view is None:
+            view = view_type.__new__(view_type)
+            self.bind(view, row)
+        return view
+
+    def bind(self, view, row: int) -> None:
+        """ 令视图指向本存储的某一行，原先指向该行的视图会脱离 """
+        if self._views.get(row) is not view:
+            self.detach_view(row)
+        object.__setattr__(view, '_store', self)
+        object.__setattr__(view, '_row', row)
+        self._views[row] = view
+
+    def detach_view(self, row: int) -> None:
+        """ 若某一行存在存活的视图，将该行复制到视图独立的存储中，使其不再受本存储变化的影响 """
+        view = self._views.pop(row, None)
+        if view is None:
+            return
+        store = EventStore(standalone=True)
+        store.bind(view, store.append_row(self.event_types[row], self.row_values(row),
+                                          self.is_dirty(row)))
+
+    def dump_line(self, row: int, event_attrs: list[str], err: Errors, key=None) -> str:
+        """
+        与 dump_row 相同，开启 cache_lines 时复用未修改的行
+
+        参数：
+            key: 标识 Format 的对象，与上次不同时清空缓存
+        """
+        if not self.cache_lines:
+            return self.dump_row(row, event_attrs, err)
+        if key is not self._lines_key:
+            self.lines = [None] * len(self)
+            self._lines_key = key
+        text = self.columns['Text'][row]
+        version = text._version if isinstance(text, Text) else 0
+        cached = self.lines[row]
+        if cached is not None and cached[1] == version:
+            return cached[0]
+        error_count = len(err)
+        line = self.dump_row(row, event_attrs, err)
+        if len(err) == error_count:  # 有错误的行不缓存，每次输出都会报告
+            self.lines[row] = (line, version)
+        return line
+
+    def dump_row(self, row: int, event_attrs: list[str], err: Errors) -> str:
+        """ 按照 Format 行中的属性顺序输出一行，错误追加到 err 中 """
+        if self._raw_count and self.raw_rows[row] is not None:
+            if event_attrs == self._raw_format.event_attrs:  # 未转换的行按原样输出
+                return self.event_types[row].value + ':' + self.raw_rows[row]
+            self.ensure_converted(row)
+        event_values = []
+        for event_attr in event_attrs:
+            value = self.columns[event_attr][row]
+            if value == EVENT_COLUMNS[event_attr][1]:
+                err.error('Event `{field}` not specified. ', 'missing_field', field=event_attr)
+            else:
+                event_values.append(_COLUMN_DUMPERS.get(event_attr, str)(value))
+        return self.event_types[row].value + ':' + ','.join(event_values)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_views']  # 视图只在当前进程内有意义
+        state['_interval_index'] = None
+        state['_unindexed'] = set()
+        # Text 会以字符串的形式重新创建，版本号从 0 开始；输出缓存不传递
+        state['clean_versions'] = array('q', [-1 if self.is_dirty(row) else 0 for row in range(len(self))])
+        state['lines'] = [None] * len(self)
+        state['_lines_key'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__dict__.setdefault('_unindexed', set())
+        self._views = weakref.WeakValueDictionary()
+
+    def _normalize_index(self, index: int, insert: bool = False) -> int:
+        length = len(self)
+        if index < 0:
+            index += length
+        if insert:
+            return min(max(index, 0), length)
+        if not 0 <= index < length:
+            raise IndexError('event index out of range')
+        return index
+
+    def _shift_views(self, start: int, offset: int) -> None:
+        self._remap_views({row: row + offset for row in list(self._views.keys()) if row >= start})
+
+    def _remap_views(self, mapper: dict[int, int]) -> None:
+        views = {row: self._views.get(row) for row in list(self._views.keys())}
+        self._views = weakref.WeakValueDictionary()
+        for row, view in views.items():
+            if view is None:
+                continue
+            if row in mapper:
+                row = mapper[row]
+                object.__setattr__(view, '_row', row)
+            self._views[row] = view
+
+
+__all__ = (
+    'EventStore',
+    'EVENT_COLUMNS',
+    'COLUMN_CONVERTERS',
+    'check_text',
+)
@@ -1,13 +1,41 @@
+import copy
 import sys
 import inspect
+import itertools
 import re
+from operator import attrgetter
+from typing import Callable
 
 from easy_ass.ass_types import AssColor
+from .drawing import parse_path, dump_path, path_bbox, apply_affine, is_path, COMMANDS
 
 
-class TextBase:
+class _TagLayout(type):
+    """
+    覆写代码类的元类
+
+    只继承自覆写代码类的子类在定义时按 _arg_mapper 生成 __slots__：每个参数一个位置，另加 _parent，
+    实例不带 __dict__ 与参数字典，参数直接作为属性读写。
+    同时继承内置类型的 Text、Str 以及自行声明 __slots__ 的类不受影响
+    """
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        if '__slots__' not in namespace and bases and all(isinstance(base, _TagLayout) for base in bases):
+            arg_mapper = namespace.get('_arg_mapper', bases[0]._arg_mapper)
+            inherited = {slot for base in bases for klass in base.__mro__
+                         for slot in klass.__dict__.get('__slots__', ())}
+            slots = ('_parent',) + (tuple(arg_mapper) if arg_mapper is not ... else ())
+            namespace['__slots__'] = tuple(slot for slot in slots if slot not in inherited)
+            namespace['_slotted'] = True
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+class TextBase(metaclass=_TagLayout):
+    __slots__ = ()
     _prefix = ''
     _with_bracket = True
+    _parent = None  # 所在的 Text，修改参数时通知它更新版本号
+    _arg_names: tuple[str, ...] = ()  # _arg_mapper 中的参数名，定义子类时生成
     _arg_mapper: dict[str, dict] = ...
     """
     _arg_mapper 字典定义函数参数
@@ -19,46 +47,70 @@ class TextBase:
     """
 
     def __init__(self, *args, **kwargs):
-        self._arg_values: dict = {arg_name: None for arg_name in self._arg_mapper} \
-            if self._arg_mapper is not ... else {}  # 参数值存储
+        for arg_name in self._arg_names:
+            _set_attr(self, arg_name, None)
 
         if 'raw_str' in kwargs:  # 指定源字符串
             self.parse(kwargs.get('raw_str', ''))
-        elif self._arg_mapper is not ...:  # 正常传参
-            if len(args) > len(self._arg_mapper):
+        elif self._arg_names:  # 正常传参
+            if len(args) > len(self._arg_names):
                 raise TypeError('`{}()` takes at most {} arguments. '.
-                                format(self.__class__.__name__, len(self._arg_mapper)))
-            args = {name: value for name, value in zip(self._arg_mapper, args)}
+                                format(self.__class__.__name__, len(self._arg_names)))
+            args = {name: value for name, value in zip(self._arg_names, args)}
             args.update(kwargs)
             self._handle_args(args)
 
     def _handle_args(self, args: dict[str, any]) -> None:
         for arg_name, arg_value in args.items():  # 填充已经填写的参数
-            if arg_name not in self._arg_mapper:
+            if arg_name not in self._arg_names:
                 raise TypeError(arg_name)
             if arg_value is None:
                 continue
-            self._arg_values[arg_name] = \
-                self._arg_mapper[arg_name][1](arg_value)
+            _set_attr(self, arg_name, self._arg_mapper[arg_name][1](arg_value))
 
-        if self._arg_mapper is ...:
-            return
-        for arg_name, arg_info in self._arg_mapper.items():  # 查找是否存在未赋值的必填参数
-            if self._arg_values.get(arg_name, None) is None and not arg_info[0]:
+        for arg_name in self._arg_names:  # 查找是否存在未赋值的必填参数
+            if getattr(self, arg_name) is None and not self._arg_mapper[arg_name][0]:
                 raise TypeError('In `{}()`, `{}` must be specified. '.
                                 format(self.__class__.__name__, arg_name))
 
     def parse(self, ass_str: str):
-        if self._arg_mapper is ...:
+        if not self._arg_names:
             return
         args_str = ass_str[len(self._prefix):].strip('() ')
         arg_values = args_str.split(',')
-        args = {name: value for name, value in zip(self._arg_mapper, arg_values)}
+        args = {name: value for name, value in zip(self._arg_names, arg_values)}
         self._handle_args(args)
+        self._touch()
+
+    def _touch(self) -> None:
+        """ 内容发生变化，通知所在的 Text """
+        parent = self._parent
+        if parent is not None:
+            parent._touch()
+
+    def _set_args(self, **arg_values) -> None:
+        """ 直接修改参数而不通知所在的 Text，批量修改后由调用方 touch 一次 """
+        for arg_name, arg_value in arg_values.items():
+            _set_attr(self, arg_name, arg_value)
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        定义子类时按其前缀与参数生成专用的 __init__、parse 与 dump，构造与输出时不再查表、判断括号与参数个数。
+        自行实现这些方法的子类（如 Text、Str、Clip.parse）不受影响
+        """
+        super().__init_subclass__(**kwargs)
+        cls._arg_names = tuple(cls._arg_mapper) if cls._arg_mapper is not ... else ()
+        if cls.__dict__.get('_slotted'):
+            if _is_default(cls.parse, TextBase.parse):
+                cls.parse = _make_parser(cls)
+            if _is_default(cls.__init__, TextBase.__init__):
+                cls.__init__ = _make_init(cls)
+        if _is_default(cls.dump, TextBase.dump):
+            cls.dump = _make_dumper(cls)
 
     def dump(self):
         arg_values = [str(value)
-                      for value in self._arg_values.values()
+                      for value in map(self.__getattribute__, self._arg_names)
                       if value is not None]
         args_str = ','.join(arg_values)
         if self._with_bracket:
@@ -69,16 +121,23 @@ class TextBase:
     def __str__(self):
         return self.dump()
 
-    def __getattr__(self, key):
-        if key in self._arg_values:
-            return self._arg_values[key]
-        raise AttributeError(key)
+    def __reduce__(self):
+        return self.__class__._restore, (tuple(getattr(self, arg_name) for arg_name in self._arg_names),)
+
+    @classmethod
+    def _restore(cls, arg_values: tuple | dict) -> 'TextBase':
+        code = cls.__new__(cls)
+        if isinstance(arg_values, dict):  # 旧版本序列化的参数字典
+            arg_values = [arg_values.get(arg_name) for arg_name in cls._arg_names]
+        _set_attr(code, '_parent', None)
+        for arg_name, arg_value in zip(cls._arg_names, arg_values):
+            _set_attr(code, arg_name, arg_value)
+        return code
 
     def __setattr__(self, key, value):
-        if key in self.__dict__.get('_arg_values', {}):
-            self.__dict__['_arg_values'][key] = value
-            return
-        super().__setattr__(key, value)
+        _set_attr(self, key, value)
+        if key in self._arg_names:
+            self._touch()
 
     def __add__(self, other):
         if not (isinstance(other, TextBase) or isinstance(other, str)):
@@ -89,60 +148,291 @@ class TextBase:
         return TextBase.__add__(other, self)
 
 
+_set_attr = object.__setattr__  # 不经过 TextBase.__setattr__，不会通知所在的 Text
+
+
+def _is_default(method, base_method) -> bool:
+    """ method 是基类的默认实现或者为父类生成的方法，需要为子类重新生成 """
+    return method is base_method or getattr(method, '_generated', False)
+
+
+def _generated(cls: type, name: str, method: Callable) -> Callable:
+    method._generated = True
+    method.__name__ = name
+    method.__qualname__ = cls.__qualname__ + '.' + name
+    return method
+
+
+def _make_init(cls: type) -> Callable:
+    """
+    生成 cls 专用的构造函数，参数的设置函数与转换函数预先按位置排好，
+    构造时不再创建参数字典，也不再按名称逐个查找
+    """
+    class_name = cls.__name__
+    arg_names = cls._arg_names
+    count = len(arg_names)
+    set_parent = cls._parent.__set__
+    setters = tuple(getattr(cls, arg_name).__set__ for arg_name in arg_names)
+    fields = tuple(zip(setters, (cls._arg_mapper[arg_name][1] for arg_name in arg_names)))
+    required = tuple((index, arg_name) for index, arg_name in enumerate(arg_names)
+                     if not cls._arg_mapper[arg_name][0])
+    indexes = {arg_name: index for index, arg_name in enumerate(arg_names)}
+    handle_args = None if cls._handle_args is TextBase._handle_args else cls._handle_args
+
+    if not arg_names:
+        def __init__(self, *args, **kwargs):
+            set_parent(self, None)
+        return _generated(cls, '__init__', __init__)
+
+    def __init__(self, *args, **kwargs):
+        set_parent(self, None)
+        if 'raw_str' in kwargs:  # 指定源字符串
+            for setter in setters:
+                setter(self, None)
+            self.parse(kwargs['raw_str'])  # 每次查找，instrument 替换的 parse 同样生效
+            return
+        if len(args) > count:
+            raise TypeError('`{}()` takes at most {} arguments. '.format(class_name, count))
+        values = list(args)
+        if len(values) < count:
+            values.extend([None] * (count - len(values)))
+        for arg_name, arg_value in kwargs.items():
+            index = indexes.get(arg_name)
+            if index is None:
+                raise TypeError(arg_name)
+            values[index] = arg_value
+        if handle_args is not None:  # 子类自定义了参数处理
+            for setter in setters:
+                setter(self, None)
+            handle_args(self, dict(zip(arg_names, values)))
+            return
+        for (setter, converter), value in zip(fields, values):
+            setter(self, None if value is None else converter(value))
+        for index, arg_name in required:
+            if values[index] is None:
+                raise TypeError('In `{}()`, `{}` must be specified. '.format(class_name, arg_name))
+    return _generated(cls, '__init__', __init__)
+
+
+def _make_parser(cls: type) -> Callable:
+    """ 生成 cls 专用的 parse，按位置直接转换并设置各参数 """
+    class_name = cls.__name__
+    prefix_length = len(cls._prefix)
+    count = len(cls._arg_names)
+    fields = tuple((getattr(cls, arg_name).__set__, cls._arg_mapper[arg_name][1]) for arg_name in cls._arg_names)
+    required = tuple((index, arg_name) for index, arg_name in enumerate(cls._arg_names)
+                     if not cls._arg_mapper[arg_name][0])
+
+    if not count:
+        def parse(self, ass_str: str):
+            return
+        return _generated(cls, 'parse', parse)
+
+    def parse(self, ass_str: str):
+        arg_values = ass_str[prefix_length:].strip('() ').split(',')
+        for (setter, converter), value in zip(fields, arg_values):
+            setter(self, converter(value))
+        if len(arg_values) < count:  # 缺少的参数保持原值，检查其中的必填参数
+            for index, arg_name in required:
+                if index >= len(arg_values) and getattr(self, arg_name) is None:
+                    raise TypeError('In `{}()`, `{}` must be specified. '.format(class_name, arg_name))
+        self._touch()
+    return _generated(cls, 'parse', parse)
+
+
+def _make_dumper(cls: type) -> Callable[[TextBase], str]:
+    """ 生成 cls 专用的 dump：常见的单个参数、无括号的代码只需一次拼接，其余一次 join """
+    prefix = cls._prefix
+    arg_names = cls._arg_names
+    get_values = attrgetter(*arg_names) if len(arg_names) > 1 else lambda self: ()
+    if cls._with_bracket and len(arg_names) == 1:
+        head = prefix + '('
+        get_value = attrgetter(arg_names[0])
+
+        def dump(self) -> str:
+            value = get_value(self)
+            return head + ')' if value is None else head + str(value) + ')'
+    elif cls._with_bracket:
+        head = prefix + '('
+
+        def dump(self) -> str:
+            return head + ','.join([str(value) for value in get_values(self) if value is not None]) + ')'
+    elif not arg_names:
+        def dump(self) -> str:
+            return prefix
+    elif len(arg_names) == 1:
+        get_value = attrgetter(arg_names[0])
+
+        def dump(self) -> str:
+            value = get_value(self)
+            return prefix if value is None else prefix + str(value)
+    else:
+        def dump(self) -> str:
+            return prefix + ','.join([str(value) for value in get_values(self) if value is not None])
+    return _generated(cls, 'dump', dump)
+
+
 class Text(TextBase, list):
+    """
+    覆写代码与文本组成的列表
+
+    列表的增删改以及其中覆写代码的参数修改都会更新版本号 _version，
+    EventStore 据此判断缓存的行是否需要重新输出。
+    """
     __match_code_part = re.compile(r'{[^}]*?}')
+    _version = 0  # 0 表示创建后未修改
 
     def __init__(self, *args):
         super().__init__()
         for arg in args:
             if isinstance(arg, Text):
-                self.extend(arg)
+                self._extend(arg)
             elif isinstance(arg, TextBase):
-                self.append(arg)
+                self._extend((arg,))
             elif isinstance(arg, str):
-                self.parse(arg)
+                self._parse(arg)
             else:
                 raise TypeError(arg)
 
     def parse(self, ass_str: str):
+        self._parse(ass_str)
+        self._touch()
+
+    def _parse(self, ass_str: str):
+        append = super().append
         matches = self.__match_code_part.finditer(ass_str)
         curr_pos = 0
+        drawing = False  # 绘图模式下的文本为绘图指令
         # 匹配 { } 花括号区域
         for match in matches:
             if match.start() != curr_pos:
-                self.append(Str(raw_str=match.string[curr_pos: match.start()]))
+                append(_text_part(match.string[curr_pos: match.start()], drawing, self))
             codes = match.string[match.start()+1: match.end()-1].split('\\')  # 切割各组代码
             for code in codes:
                 if len(code) == 0:
                     continue
-                for code_name, proc_type in _codes_mapper.items():
-                    if code.startswith(code_name):
-                        tar_type = proc_type
-                        break
-                else:
+                code_match = _match_code_prefix(code)
+                if code_match is None:
                     raise TypeError('Unknown code `{}`'.format(code))
-                self.append(tar_type(raw_str=code))
+                code = _codes_mapper[code_match.group()](raw_str=code)
+                _set_attr(code, '_parent', self)
+                append(code)
+                if isinstance(code, (Draw, DrawBegin, DrawEnd)):
+                    drawing = code.level > 0
             curr_pos = match.end()
         # 末端字符串
         if curr_pos != len(ass_str):
-            self.append(Str(raw_str=ass_str[curr_pos:]))
+            append(_text_part(ass_str[curr_pos:], drawing, self))
+
+    @classmethod
+    def find_unknown_code(cls, ass_str: str) -> str | None:
+        """
+        只检查 ass 字符串中的覆写代码是否都能识别，不创建任何对象，用于延迟解析的文本在加载时报告错误
+
+        返回值：
+            第一个无法识别的代码，全部可以识别时返回 None
+        """
+        match = _search_unknown_code(ass_str)
+        return None if match is None else match.group(1)
+
+    def _touch(self) -> None:
+        self.__dict__['_version'] = next(_text_versions)  # 全局递增，不同时刻的版本号不会重复
+        super()._touch()
+
+    def _adopt(self, item):
+        """
+        令 item 属于本 Text，修改其参数时通知本 Text。
+        已经属于另一个 Text 的覆写代码会被复制，两者各自修改、各自通知，如 Text(event.Text) 得到的是副本
+        """
+        if isinstance(item, TextBase) and not isinstance(item, Str):  # Str 不可变，不需要复制
+            parent = item._parent
+            if parent is not None and parent is not self:
+                item = copy.deepcopy(item)
+            _set_attr(item, '_parent', self)
+        return item
+
+    def _extend(self, items) -> list:
+        items = [self._adopt(item) for item in items]
+        super().extend(items)
+        return items
+
+    def append(self, item) -> None:
+        self._extend((item,))
+        self._touch()
+
+    def extend(self, items) -> None:
+        self._extend(items)
+        self._touch()
+
+    def insert(self, index, item) -> None:
+        super().insert(index, self._adopt(item))
+        self._touch()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            super().__setitem__(index, [self._adopt(item) for item in value])
+        else:
+            super().__setitem__(index, self._adopt(value))
+        self._touch()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._touch()
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __imul__(self, other):
+        super().__imul__(other)
+        self._touch()
+        return self
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        self._touch()
+        return item
+
+    def remove(self, value) -> None:
+        super().remove(value)
+        self._touch()
+
+    def clear(self) -> None:
+        super().clear()
+        self._touch()
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self._touch()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._touch()
 
     def dump(self) -> str:
-        ret: str = ''
-        for index, item in enumerate(self):
-            if isinstance(item, Str):
-                if index != 0 and not isinstance(self[index - 1], Str):  # 闭大括号
-                    ret += '}'
+        parts = []
+        append = parts.append
+        in_code = False  # 上一项是否为覆写代码，据此决定开闭大括号
+        for item in self:
+            if isinstance(item, _TEXT_PARTS):
+                if in_code:
+                    append('}')
+                    in_code = False
             else:
-                if index == 0 or isinstance(self[index - 1], Str):  # 开大括号
-                    ret += '{'
-                ret += '\\'
-            ret += item.dump()
-        return ret
+                append('\\' if in_code else '{\\')
+                in_code = True
+            append(item.dump())
+        if in_code:  # 以覆写代码结尾时闭合大括号
+            append('}')
+        return ''.join(parts)
 
     def __str__(self) -> str:
         return self.dump()
 
+    def __reduce__(self):
+        # 以 ass 字符串的形式传递，比逐个序列化覆写代码对象更紧凑
+        return Text, (self.dump(),)
+
 
 class Str(TextBase, str):
     """
@@ -156,6 +446,9 @@ class Str(TextBase, str):
         ' ': r'\h',
         '\n': r'\N',
     }
+    # 单个字符的替换表与全部替换的正则，输出时一次扫描完成转义
+    __escape_table = str.maketrans({key: value for key, value in __escape_mapper.items() if len(key) == 1})
+    __match_escaped = re.compile('|'.join(map(re.escape, __escape_mapper))).sub
 
     def __new__(cls, *args, **kwargs):
         if 'raw_str' in kwargs:  # 对 ass原始字符串进行反转义
@@ -166,9 +459,10 @@ class Str(TextBase, str):
 
     @staticmethod
     def __escape(raw_str: str) -> str:
-        for from_str, to_str in Str.__escape_mapper.items():
-            raw_str = raw_str.replace(from_str, to_str)
-        return raw_str
+        # 一次扫描完成全部替换，不含反斜杠时只需处理空格与换行
+        if '\\' not in raw_str:
+            return raw_str.translate(Str.__escape_table)
+        return Str.__match_escaped(lambda match: Str.__escape_mapper[match.group()], raw_str)
 
     @staticmethod
     def __unescape(raw_str: str) -> str:
@@ -182,6 +476,106 @@ class Str(TextBase, str):
     def __str__(self):
         return str.__str__(self)
 
+    def __reduce__(self):
+        return Str, (str.__str__(self),)
+
+
+class DrawingPath(TextBase):
+    """
+    绘图指令
+
+    绘图模式（Draw 等级大于 0）下的文本以及矢量 Clip 的路径。
+    数据保存在紧凑的数组中，见 easy_ass.events.drawing；直接修改数组后需调用 touch
+
+    属性:
+     - ops: 每条指令的操作码，为 COMMANDS 中的下标
+     - counts: 每条指令带有的点数
+     - coords: 全部点的坐标，按 x0, y0, x1, y1, ... 依次排列
+    """
+    __slots__ = ('_parent', 'ops', 'counts', 'coords')
+
+    def __init__(self, path: str = '', **kwargs):
+        _set_attr(self, '_parent', None)
+        self.parse(kwargs.get('raw_str', path))
+
+    def parse(self, ass_str: str):
+        ops, counts, coords = parse_path(ass_str)
+        self._set_args(ops=ops, counts=counts, coords=coords)
+        self._touch()
+
+    def touch(self) -> None:
+        """ 直接修改数组后调用，通知所在的 Text 内容已经变化 """
+        self._touch()
+
+    def dump(self) -> str:
+        return dump_path(self.ops, self.counts, self.coords)
+
+    def bbox(self) -> tuple[float, float, float, float] | None:
+        """ 全部点（包括曲线控制点）的外接矩形 (min_x, min_y, max_x, max_y)，没有点时返回 None """
+        return path_bbox(self.coords)
+
+    def transform(self, matrix: tuple[float, ...], precision: int | None = 3) -> None:
+        """
+        对全部坐标进行仿射变换，矩阵见 easy_ass.events.transform
+
+        参数：
+            matrix: 变换矩阵 (a, b, c, d, e, f)，坐标为路径自身的坐标
+            precision: 结果保留的小数位数，None 表示不取整
+        """
+        apply_affine(self.coords, matrix, precision=precision)
+        self._touch()
+
+    def iter_commands(self):
+        """ 逐条输出 (指令字母, 该指令的坐标数组) """
+        offset = 0
+        coords = self.coords
+        for opcode, count in zip(self.ops, self.counts):
+            end = offset + count * 2
+            yield COMMANDS[opcode], coords[offset:end]
+            offset = end
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DrawingPath):
+            return NotImplemented
+        return self.ops == other.ops and self.counts == other.counts and self.coords == other.coords
+
+    __hash__ = TextBase.__hash__
+
+    def __repr__(self) -> str:
+        return '{}({!r})'.format(self.__class__.__name__, self.dump())
+
+    def __reduce__(self):
+        return DrawingPath, (self.dump(),)
+
+
+def _text_part(raw_str: str, drawing: bool, parent: Text) -> Str | DrawingPath:
+    if not drawing or not is_path(raw_str):
+        return Str(raw_str=raw_str)
+    path = DrawingPath(raw_str)
+    if not path.ops:  # 没有一条完整的指令，保留原文
+        return Str(raw_str=raw_str)
+    _set_attr(path, '_parent', parent)
+    return path
+
+
+_TEXT_PARTS = (Str, DrawingPath)  # 花括号之外的部分
+
+
+def _number(value) -> int | float:
+    """ 坐标等数值，整数保持为 int，输出时不带小数部分 """
+    if isinstance(value, str):
+        value = float(value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _path(value) -> DrawingPath:
+    return value if isinstance(value, DrawingPath) else DrawingPath(value)
+
 
 class Bold(TextBase):
     """
@@ -304,7 +698,7 @@ class ShadowY(Shadow):
     参数:
      - depth: 阴影深度
     """
-    _prefix = 'xshad'
+    _prefix = 'yshad'
 
 
 class FontName(TextBase):
@@ -670,10 +1064,10 @@ class Move(TextBase):
     _prefix = 'move'
     _with_bracket = True
     _arg_mapper = {
-        'x1': (False, int),
-        'x2': (False, int),
-        'y1': (False, int),
-        'y2': (False, int),
+        'x1': (False, _number),
+        'x2': (False, _number),
+        'y1': (False, _number),
+        'y2': (False, _number),
         't1': (True, int),
         't2': (True, int),
     }
@@ -690,8 +1084,8 @@ class Pos(TextBase):
     _prefix = 'pos'
     _with_bracket = True
     _arg_mapper = {
-        'x': (False, int),
-        'y': (False, int),
+        'x': (False, _number),
+        'y': (False, _number),
     }
 
 
@@ -708,8 +1102,8 @@ class Org(TextBase):
     _prefix = 'org'
     _with_bracket = True
     _arg_mapper = {
-        'x': (False, int),
-        'y': (False, int),
+        'x': (False, _number),
+        'y': (False, _number),
     }
 
 
@@ -757,18 +1151,62 @@ class FadeEx(TextBase):
 
 class Clip(TextBase):
     """
-    淡入和淡出
+    裁剪，只显示区域内的部分
+
+    矩形裁剪使用 x1、y1、x2、y2，矢量裁剪使用 path 以及可选的 scale
 
     参数:
-     - t1: 淡入时间，单位毫秒
-     - t2: 淡出时间，单位毫秒
+     - x1: 矩形左上角x，单位 px
+     - y1: 矩形左上角y，单位 px
+     - x2: 矩形右下角x，单位 px
+     - y2: 矩形右下角y，单位 px
+     - scale: 矢量裁剪的绘图等级，可选
+     - path: 矢量裁剪的绘图指令
     """
     _prefix = 'clip'
     _with_bracket = True
     _arg_mapper = {
-        't1': (False, str),
+        'x1': (True, _number),
+        'y1': (True, _number),
+        'x2': (True, _number),
+        'y2': (True, _number),
+        'scale': (True, int),
+        'path': (True, _path),
     }
 
+    def parse(self, ass_str: str):
+        args_str = ass_str[len(self._prefix):].strip('() ')
+        arg_values = args_str.split(',')
+        if len(arg_values) == 4:
+            args = dict(zip(('x1', 'y1', 'x2', 'y2'), arg_values))
+        elif len(arg_values) == 2:
+            args = {'scale': arg_values[0], 'path': arg_values[1]}
+        else:
+            args = {'path': args_str}
+        self._handle_args(args)
+        self._touch()
+
+    def _handle_args(self, args: dict[str, any]) -> None:
+        super()._handle_args(args)
+        self._link_path()
+
+    @classmethod
+    def _restore(cls, arg_values: tuple | dict) -> 'Clip':
+        clip = super()._restore(arg_values)
+        clip._link_path()
+        return clip
+
+    def _link_path(self) -> None:
+        if self.path is not None:
+            _set_attr(self.path, '_parent', self)  # 修改路径时经由 Clip 通知所在的 Text
+
+
+class InverseClip(Clip):
+    """
+    反向裁剪，只显示区域外的部分，参数与 Clip 相同
+    """
+    _prefix = 'iclip'
+
 
 class Draw(TextBase):
     """
@@ -785,6 +1223,13 @@ class Draw(TextBase):
         't1': (False, str),
     }
 
+    @property
+    def level(self) -> int:
+        try:
+            return int(self.t1)
+        except ValueError:
+            return 0
+
 
 class DrawBegin(TextBase):
     """
@@ -797,6 +1242,7 @@ class DrawBegin(TextBase):
     """
     _prefix = 'p1'
     _with_bracket = False
+    level = 1
 
 
 class DrawEnd(TextBase):
@@ -808,8 +1254,9 @@ class DrawEnd(TextBase):
     参数:
      - level: 绘图等级
     """
-    _prefix = 'p1'
+    _prefix = 'p0'
     _with_bracket = False
+    level = 0
 
 
 # 注册全部 code
@@ -824,3 +1271,14 @@ for _, cls in inspect.getmembers(sys.modules[__name__], inspect.isclass):
 _codes.sort(key=lambda pair: len(pair[0]), reverse=True)
 _codes_mapper: dict[str, type] = {_code[0]: _code[1] for _code in _codes}
 del _codes
+# 按前缀长度从长到短组成的单个正则，一次匹配即可取得最长的前缀；
+# 不带参数的代码（p1、p0）必须完整匹配，\\p10 等回退到带等级参数的 Draw
+_match_code_prefix = re.compile('|'.join(
+    re.escape(_prefix) + ('' if _cls._arg_names else r'(?=\s*(?:[\\}]|$))')
+    for _prefix, _cls in _codes_mapper.items())).match
+# 紧跟在 { 或 \\ 之后、不以任何前缀开头的非空代码，与 Text._parse 的切割方式一致；
+# 之后先遇到 } 而不是 { 时视为位于花括号内，一次扫描整个字符串
+_search_unknown_code = re.compile(r'[{\\](?!%s|[\\}])([^\\}]*)(?=[^{}]*})'
+                                  % _match_code_prefix.__self__.pattern).search
+
+_text_versions = itertools.count(1)  # Text 的版本号来源
@@ -0,0 +1,163 @@
+"""
+覆写代码中坐标的仿射变换
+
+矩阵为 (a, b, c, d, e, f)，即 x' = a*x + b*y + c，y' = d*x + e*y + f，坐标系与 ass 一致，y 轴向下。
+translate、scale、rotate 生成常用的矩阵，compose 按顺序组合多个矩阵。
+
+transform_tags 先把全部文本中 Pos、Move、Org、Clip 的坐标收集到一个 array('d') 中，
+经 easy_ass.events.drawing.apply_affine 一次变换（安装了 numpy 时整块计算）后再写回，不会为每个点创建对象。
+每个文本可以使用各自的矩阵，如运动追踪时每一帧一个事件、一个矩阵。
+
+用法：
+    from easy_ass.events import transform
+
+    matrix = transform.compose(transform.scale(1.5), transform.translate(100, 0))
+    ass.events.transform(matrix)
+"""
+import math
+import numbers
+from array import array
+from typing import Iterable, Sequence
+
+from .drawing import apply_affine
+from .text import Text, DrawingPath, Pos, Move, Org, Clip, Draw, DrawBegin, DrawEnd
+
+IDENTITY = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+
+
+def translate(dx: float, dy: float) -> tuple[float, ...]:
+    """ 平移 """
+    return 1.0, 0.0, float(dx), 0.0, 1.0, float(dy)
+
+
+def scale(sx: float, sy: float | None = None, origin: tuple[float, float] = (0, 0)) -> tuple[float, ...]:
+    """ 以 origin 为中心缩放，sy 默认与 sx 相同 """
+    if sy is None:
+        sy = sx
+    ox, oy = origin
+    return float(sx), 0.0, ox - sx * ox, 0.0, float(sy), oy - sy * oy
+
+
+def rotate(angle: float, origin: tuple[float, float] = (0, 0)) -> tuple[float, ...]:
+    """ 以 origin 为中心旋转，单位为度，正数与 frz 一样在屏幕上逆时针旋转 """
+    radians = math.radians(angle)
+    cos, sin = math.cos(radians), math.sin(radians)
+    ox, oy = origin
+    return cos, sin, ox - cos * ox - sin * oy, -sin, cos, oy + sin * ox - cos * oy
+
+
+def compose(*matrices: tuple[float, ...]) -> tuple[float, ...]:
+    """ 组合多个矩阵，按参数顺序依次应用 """
+    a, b, c, d, e, f = IDENTITY
+    for a2, b2, c2, d2, e2, f2 in matrices:
+        a, b, c, d, e, f = (a2 * a + b2 * d, a2 * b + b2 * e, a2 * c + b2 * f + c2,
+                            d2 * a + e2 * d, d2 * b + e2 * e, d2 * c + e2 * f + f2)
+    return a, b, c, d, e, f
+
+
+def transform_tags(texts: Iterable[Text], matrix: Sequence[float] | Sequence[Sequence[float]],
+                   shapes: bool = False, precision: int | None = 3) -> None:
+    """
+    变换文本中覆写代码的坐标：Pos、Move、Org、矩形与矢量 Clip
+
+    矩形 Clip 在只有缩放、平移时变换两个角，有旋转或倾斜时转为同样形状的矢量 Clip；
+    矢量 Clip 按照其 scale 换算坐标
+
+    参数：
+        texts: Text 对象
+        matrix: 全部文本共用的矩阵，或者与 texts 一一对应的矩阵列表
+        shapes: 是否同时变换绘图模式下的图形，图形的坐标相对于 Pos，只应用矩阵的缩放、旋转部分
+        precision: 结果保留的小数位数，None 表示不取整
+    """
+    texts = list(texts)
+    if len(matrix) > 0 and isinstance(matrix[0], numbers.Real):  # 兼容 numpy 数组
+        matrices = [tuple(matrix)] * len(texts)
+    else:
+        matrices = [tuple(item) for item in matrix]
+        if len(matrices) != len(texts):
+            raise ValueError('Expect {} matrices, got {}. '.format(len(texts), len(matrices)))
+
+    coords = array('d')
+    segment_matrices: list[tuple[float, ...]] = []
+    counts: list[int] = []
+    targets: list[tuple] = []  # (文本, 对象, 类型)，顺序与坐标一致
+
+    def add(segment_matrix, values, count, text, item, kind):
+        coords.extend(values)
+        segment_matrices.append(segment_matrix)
+        counts.append(count)
+        targets.append((text, item, kind))
+
+    for text, text_matrix in zip(texts, matrices):
+        a, b, c, d, e, f = text_matrix
+        axis_aligned = b == 0 and d == 0
+        level = 0
+        for item in text:
+            item_type = type(item)
+            if item_type is Pos or item_type is Org:
+                add(text_matrix, (item.x, item.y), 1, text, item, 'point')
+            elif item_type is Move:  # x1, x2 为开始位置，y1, y2 为结束位置
+                add(text_matrix, (item.x1, item.x2, item.y1, item.y2), 2, text, item, 'move')
+            elif isinstance(item, Clip):
+                path = item.path
+                if path is not None:
+                    unit = 2 ** (item.scale - 1) if item.scale and item.scale > 1 else 1  # 路径坐标的缩小倍数
+                    add((a, b, c * unit, d, e, f * unit), path.coords, len(path.coords) // 2, text, path, 'path')
+                elif item.x1 is not None:
+                    x1, y1, x2, y2 = item.x1, item.y1, item.x2, item.y2
+                    if axis_aligned:
+                        add(text_matrix, (x1, y1, x2, y2), 2, text, item, 'rect')
+                    else:
+                        add(text_matrix, (x1, y1, x2, y1, x2, y2, x1, y2), 4, text, item, 'rect_path')
+            elif isinstance(item, (Draw, DrawBegin, DrawEnd)):
+                level = item.level
+            elif shapes and item_type is DrawingPath and level > 0:
+                add((a, b, 0.0, d, e, 0.0), item.coords, len(item.coords) // 2, text, item, 'path')
+
+    if not coords:
+        return
+    apply_affine(coords, segment_matrices, counts, precision)
+
+    touched = set()
+    offset = 0
+    for (text, item, kind), count in zip(targets, counts):
+        end = offset + count * 2
+        values = coords[offset:end]
+        offset = end
+        if kind == 'path':
+            item.coords[:] = values
+            item._touch()
+            continue
+        if kind == 'point':
+            x, y = _numbers(values)
+            item._set_args(x=x, y=y)
+        elif kind == 'move':
+            x1, x2, y1, y2 = _numbers(values)
+            item._set_args(x1=x1, x2=x2, y1=y1, y2=y2)
+        elif kind == 'rect':
+            x1, y1, x2, y2 = _numbers(values)
+            item._set_args(x1=min(x1, x2), y1=min(y1, y2), x2=max(x1, x2), y2=max(y1, y2))
+        else:  # 旋转后的矩形转为矢量路径
+            path = DrawingPath()
+            path.ops.extend((0, 2))  # m 一个点，l 三个点
+            path.counts.extend((1, 3))
+            path.coords.extend(values)
+            item._set_args(x1=None, y1=None, x2=None, y2=None, scale=None, path=path)
+            item._link_path()
+        if id(text) not in touched:
+            touched.add(id(text))
+            text._touch()
+
+
+def _numbers(values: array) -> list[int | float]:
+    return [int(value) if value.is_integer() else value for value in values]
+
+
+__all__ = (
+    'IDENTITY',
+    'translate',
+    'scale',
+    'rotate',
+    'compose',
+    'transform_tags',
+)
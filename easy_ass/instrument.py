@@ -0,0 +1,246 @@
+"""
+分阶段计时
+
+启用后把解析、输出路径上的方法替换为计时的包装，记录各阶段的调用次数与累计耗时；
+关闭后恢复原来的方法，未启用时没有任何额外开销。
+
+阶段之间可以嵌套，如 Ass.parse_line 中调用 Events.parse，Events.parse 中又调用 EventFormat.parse_row。
+total 为包含子阶段的耗时，self 为去掉子阶段后自身的耗时，
+Ass.parse_line 的 self 即为部分分派的耗时。
+
+用法：
+    from easy_ass import instrument
+
+    with instrument.profile():
+        ass.load('test.ass')
+        ass.save('out.ass')
+    print(instrument.report())
+
+    # 或者注册回调，每个阶段结束时调用 callback(阶段名, 耗时秒数)
+    instrument.add_callback(callback)
+    instrument.enable()
+"""
+import functools
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Iterator
+
+from .easy_ass import Ass
+from .scriptinfo import ScriptInfo
+from .styles import Styles, StyleFormat, StyleItem
+from .events import Events, EventFormat, EventStore
+from .events.text import TextBase, Text
+
+
+def _per_class(prefix: str) -> Callable[[object], str]:
+    """ 按照实际的类区分阶段，如 Text.parse.Pos """
+    return lambda self: prefix + type(self).__name__
+
+
+# (类, 方法名, 阶段名 / 由 self 得到阶段名的函数, 是否为生成器)
+PHASES = (
+    (Ass, 'parse_line', 'Ass.parse_line', False),
+    (Ass, 'dump_to', 'Ass.dump_to', False),
+    (ScriptInfo, 'parse', 'ScriptInfo.parse', False),
+    (ScriptInfo, 'iter_dump', 'ScriptInfo.dump', True),
+    (Styles, 'parse', 'Styles.parse', False),
+    (Styles, 'iter_dump', 'Styles.dump', True),
+    (StyleFormat, 'parse', 'StyleFormat.parse', False),
+    (StyleFormat, 'parse_row', 'StyleFormat.parse_row', False),
+    (StyleItem, 'dump', 'StyleItem.dump', False),
+    (Events, 'parse', 'Events.parse', False),
+    (Events, 'iter_dump', 'Events.dump', True),
+    (EventFormat, 'parse', 'EventFormat.parse', False),
+    (EventFormat, 'parse_row', 'EventFormat.parse_row', False),
+    (EventStore, 'append_row', 'EventStore.append_row', False),
+    (EventStore, 'dump_row', 'EventStore.dump_row', False),
+    (Text, '_parse', 'Text.parse', False),
+    (Text, 'dump', 'Text.dump', False),
+    # 按类区分的阶段同时替换各子类自己的方法，如各覆写代码类生成的 parse、dump，见 _targets
+    (TextBase, 'parse', _per_class('Text.parse.'), False),
+    (TextBase, 'dump', _per_class('Text.dump.'), False),
+)
+
+_stats: dict[str, list] = {}  # 阶段名: [次数, 总耗时, 自身耗时]
+_callbacks: list[Callable[[str, float], None]] = []
+_originals: dict[tuple[type, str], Callable] = {}
+_local = threading.local()  # 每个线程单独的阶段栈
+
+
+def _stack() -> list[float]:
+    """ 当前线程正在进行的各阶段中子阶段的累计耗时 """
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _record(name: str, elapsed: float, child: float) -> None:
+    stat = _stats.get(name)
+    if stat is None:
+        stat = _stats[name] = [0, 0.0, 0.0]
+    stat[0] += 1
+    stat[1] += elapsed
+    stat[2] += elapsed - child
+    for callback in _callbacks:
+        callback(name, elapsed)
+
+
+def _timed(func: Callable, phase: str | Callable[[object], str]) -> Callable:
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        stack = _stack()
+        stack.append(0.0)
+        begin = perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            elapsed = perf_counter() - begin
+            child = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            _record(phase if isinstance(phase, str) else phase(self), elapsed, child)
+    return wrapper
+
+
+def _timed_generator(func: Callable, phase: str) -> Callable:
+    # 只统计生成器内部的耗时，消费者处理每一行的时间不计入；整个生成器记为一次调用
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        iterator = func(self, *args, **kwargs)
+        elapsed = child = 0.0
+        try:
+            while True:
+                stack = _stack()
+                stack.append(0.0)
+                begin = perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    spent = perf_counter() - begin
+                    elapsed += spent
+                    child += stack.pop()
+                    if stack:
+                        stack[-1] += spent
+                yield item
+        finally:
+            _record(phase, elapsed, child)
+    return wrapper
+
+
+def _targets(cls: type, attribute: str, phase: str | Callable[[object], str]) -> Iterator[type]:
+    """
+    需要替换方法的类
+
+    阶段名固定时只有 cls 本身；按类区分时还包括自己定义了该方法的各级子类，
+    PHASES 中单独列出的类（如 Text.dump）除外
+    """
+    if isinstance(phase, str):
+        yield cls
+        return
+    listed = {klass for klass, name, _, _ in PHASES if name == attribute and klass is not cls}
+    pending, seen = [cls], set()
+    while pending:
+        klass = pending.pop()
+        if klass in seen:
+            continue
+        seen.add(klass)
+        if attribute in klass.__dict__ and klass not in listed:
+            yield klass
+        pending.extend(klass.__subclasses__())
+
+
+def enable() -> None:
+    """ 开始记录，已经启用时不做任何事 """
+    if _originals:
+        return
+    for cls, attribute, phase, is_generator in PHASES:
+        for klass in _targets(cls, attribute, phase):
+            func = klass.__dict__[attribute]
+            _originals[klass, attribute] = func
+            setattr(klass, attribute, (_timed_generator if is_generator else _timed)(func, phase))
+
+
+def disable() -> None:
+    """ 停止记录并恢复原来的方法，已经记录的数据保留 """
+    for (cls, attribute), func in _originals.items():
+        setattr(cls, attribute, func)
+    _originals.clear()
+
+
+def is_enabled() -> bool:
+    return bool(_originals)
+
+
+def reset() -> None:
+    """ 清空已经记录的数据 """
+    _stats.clear()
+
+
+def add_callback(callback: Callable[[str, float], None]) -> None:
+    """ 注册回调，启用期间每个阶段结束时以 (阶段名, 耗时秒数) 调用 """
+    _callbacks.append(callback)
+
+
+def remove_callback(callback: Callable[[str, float], None]) -> None:
+    _callbacks.remove(callback)
+
+
+def stats() -> dict[str, dict[str, float]]:
+    """
+    各阶段的统计数据
+
+    返回值：
+        {阶段名: {'count': 次数, 'total': 包含子阶段的耗时, 'self': 自身耗时}}，按自身耗时从大到小排列
+    """
+    items = sorted(_stats.items(), key=lambda item: item[1][2], reverse=True)
+    return {name: {'count': count, 'total': total, 'self': self_time}
+            for name, (count, total, self_time) in items}
+
+
+def report() -> str:
+    """ 以表格形式输出统计数据 """
+    lines = ['{:<32}{:>10}{:>12}{:>12}{:>12}'.format('phase', 'count', 'total (ms)', 'self (ms)', 'us/call')]
+    for name, stat in stats().items():
+        lines.append('{:<32}{:>10}{:>12.2f}{:>12.2f}{:>12.2f}'.format(
+            name, stat['count'], stat['total'] * 1e3, stat['self'] * 1e3, stat['total'] / stat['count'] * 1e6))
+    return '\n'.join(lines)
+
+
+@contextmanager
+def profile(clear: bool = True) -> Iterator[dict[str, dict[str, float]]]:
+    """
+    在 with 语句块中启用记录，结束后恢复
+
+    参数：
+        clear: 开始前是否清空之前的数据
+    返回值：
+        with 语句块结束后更新为 stats() 结果的字典
+    """
+    if clear:
+        reset()
+    was_enabled = is_enabled()
+    result: dict[str, dict[str, float]] = {}
+    enable()
+    try:
+        yield result
+    finally:
+        if not was_enabled:
+            disable()
+        result.update(stats())
+
+
+__all__ = (
+    'enable',
+    'disable',
+    'is_enabled',
+    'reset',
+    'add_callback',
+    'remove_callback',
+    'stats',
+    'report',
+    'profile',
+)
@@ -0,0 +1,107 @@
+import mmap
+import re
+from typing import Iterator
+
+from .scriptinfo import SCRIPT_INFO_PART_TITLE
+from .styles import STYLES_PART_TITLE
+from .events import EVENTS_PART_TITLE
+
+# 与 Ass.parse_line 的判断顺序一致：去掉行首空白后以 [ 开头，再按小写比较标题
+SECTION_TITLES = (
+    (EVENTS_PART_TITLE.lower().encode(), 'events'),
+    (STYLES_PART_TITLE.lower().encode(), 'styles'),
+    (SCRIPT_INFO_PART_TITLE.lower().encode(), 'script_info'),
+)
+_match_header = re.compile(rb'^(?:\xef\xbb\xbf)?[ \t\f\v]*\[([^\r\n]*)', re.MULTILINE)
+
+
+class MappedSections:
+    """
+    内存映射的 ass 文件，按需查找各部分的字节范围
+
+    只在需要时向后扫描部分标题，读取 [Script Info] 只会访问文件开头很少的一部分。
+    同一部分出现多次时会得到多个范围。
+    无法识别的部分记为 raw，其范围包含标题行，raw_after 记录各个 raw 范围之前的已知部分。
+    按 \n 分行，第一个换行只有 \r 的文件（旧式 Mac 换行）抛出 ValueError，由调用方改为流式解析
+    """
+
+    def __init__(self, path: str, encoding: str = 'utf-8-sig'):
+        self.encoding = encoding
+        with open(path, 'rb') as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        newline = self._map.find(b'\n')
+        carriage = self._map.find(b'\r', 0, newline if newline >= 0 else len(self._map))
+        if carriage >= 0 and carriage + 1 != newline:
+            self._map.close()
+            raise ValueError('Line endings of `{}` are `\\r` only. '.format(path))
+        self.ranges: dict[str, list[tuple[int, int]]] = {name: [] for _, name in SECTION_TITLES}
+        self.ranges['raw'] = []
+        self.raw_after: dict[int, str] = {}  # raw 范围的开始: 之前的已知部分
+        self._last_known: str = 'script_info'
+        self._current: tuple[str, int] = ('script_info', 0)  # 第一个标题之前的内容属于 Script Info
+        self._scan_pos: int = 0
+        self._line_numbers: dict[int, int] = {}  # 偏移: 行号，只在出现错误时计算
+        self.done: bool = False
+
+    @property
+    def current_section(self) -> str:
+        """ 当前扫描位置所在的部分 """
+        return self._current[0]
+
+    def scan(self) -> tuple[str, int, int] | None:
+        """
+        向后扫描到下一个部分标题
+
+        返回值：
+            刚刚结束的部分的 (名称, 开始, 结束)，扫描到文件末尾后返回 None
+        """
+        if self.done:
+            return None
+        while True:
+            match = _match_header.search(self._map, self._scan_pos)
+            if match is None:
+                self.done = True
+                return self._close(len(self._map), None)
+            self._scan_pos = match.end()
+            title = match.group(1).lower()
+            for section_title, name in SECTION_TITLES:
+                if title.startswith(section_title):
+                    return self._close(match.start(), (name, match.end()))
+            return self._close(match.start(), ('raw', match.start()))  # 未知部分连同标题行一起保存
+
+    def _close(self, end: int, next_section: tuple[str, int] | None) -> tuple[str, int, int]:
+        name, start = self._current
+        self.ranges[name].append((start, end))
+        if name == 'raw':
+            self.raw_after[start] = self._last_known
+        else:
+            self._last_known = name
+        if next_section is not None:
+            self._current = next_section
+        return name, start, end
+
+    def iter_lines(self, start: int, end: int) -> Iterator[str]:
+        """ 逐行解码一个字节范围，去除行尾换行 """
+        data, encoding = self._map, self.encoding
+        pos = start
+        while pos < end:
+            line_end = data.find(b'\n', pos, end)
+            if line_end < 0:
+                line_end = end
+            yield data[pos:line_end].decode(encoding).rstrip('\r')
+            pos = line_end + 1
+
+    def line_number(self, offset: int) -> int:
+        """ 偏移所在的行号，从 1 开始 """
+        line = self._line_numbers.get(offset)
+        if line is None:
+            line = self._line_numbers[offset] = self._map[:offset].count(b'\n') + 1
+        return line
+
+    def close(self) -> None:
+        self._map.close()
+
+
+__all__ = (
+    'MappedSections',
+)
@@ -0,0 +1,80 @@
+import itertools
+from typing import Iterator
+
+from .errors import Errors
+
+
+class RawSection:
+    """
+    无法识别的部分，如 [Fonts]、[Graphics]、[Aegisub Project Garbage]
+
+    不做任何解析，按原样保存标题与各行，输出时原样写回
+
+    属性：
+        header: 标题行，如 `[Fonts]`
+        lines: 各行内容，包括其中的空行；末尾的空行不输出，部分之间的空行由 Ass 输出
+        after: 该部分之前的已知部分，script_info / styles / events，输出时紧跟在其后
+    """
+
+    def __init__(self, header: str, after: str = 'events'):
+        self.header: str = header
+        self.lines: list[str] = []
+        self.after: str = after
+
+    @property
+    def title(self) -> str:
+        """ 去掉方括号的标题 """
+        return self.header.strip()[1:].rstrip(']')
+
+    def parse(self, ass_str: str) -> Errors:
+        self.lines.append(ass_str)
+        return Errors()
+
+    def dump(self) -> (list[str], Errors):
+        errors: Errors = Errors()
+        dump_lines: list[str] = list(self.iter_dump(errors))
+        return dump_lines, errors
+
+    def iter_dump(self, errors: Errors) -> Iterator[str]:
+        """
+        逐行输出，错误追加到 errors 中
+        """
+        yield self.header
+        lines = self.lines
+        end = len(lines)
+        while end and not lines[end - 1]:
+            end -= 1
+        yield from itertools.islice(lines, end)
+
+    def __repr__(self) -> str:
+        return '{}({!r}, {} lines)'.format(self.__class__.__name__, self.header, len(self.lines))
+
+
+def place_raw_lines(raw_lines: list[str], positions: list[int],
+                    count: int) -> tuple[list[str], list[tuple[int, list[str]]]]:
+    """
+    按解析时记录的位置，把部分中原样保存的行（注释、无法识别的行）放回各行数据之间
+
+    参数：
+        raw_lines: 原样保存的行
+        positions: 与 raw_lines 一一对应，为该行之后第一行数据的下标，-1 表示位于 Format 行之前；
+                   缺少的位置视为 0，超出 count 的位置视为 count
+        count: 当前数据的行数
+    返回值：
+        (Format 行之前的行, [(位置, 输出在该下标的数据之前的行), ...])，位置从小到大排列
+    """
+    head: list[str] = []
+    groups: dict[int, list[str]] = {}
+    for index, line in enumerate(raw_lines):
+        position = positions[index] if index < len(positions) else 0
+        if position < 0:
+            head.append(line)
+        else:
+            groups.setdefault(min(position, count), []).append(line)
+    return head, sorted(groups.items())
+
+
+__all__ = (
+    'RawSection',
+    'place_raw_lines',
+)
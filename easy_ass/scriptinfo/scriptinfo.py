@@ -1,3 +1,5 @@
+from typing import Iterator
+
 from easy_ass.errors import Errors
 from easy_ass.base import AssAttr
 
@@ -10,37 +12,64 @@ class ScriptInfo:
             'ScriptType': 'V4.00+',
             'Title': '<untitled>'
         })
+        self.raw_lines: list[str] = []  # 注释与未知属性的行，原样输出
+        self._raw_head: int | None = None  # 出现在第一个已知属性之前的行数，这些行输出在属性之前
 
     def parse(self, ass_str: str) -> Errors:
         err = Errors()
-        str_part = ass_str.split(':')
-        if len(str_part) != 2:
-            return err.error(f'Fail to parse `{ass_str}` as script info. ')
-        attribute = str_part[0].strip()
-        value = str_part[1].strip()
-        if attribute not in self.script_info_attrs:
-            return err.error(f'Unknown script info attribute `{attribute}`. ')
+        if ass_str.startswith(';'):  # 注释
+            self.raw_lines.append(ass_str)
+            return err
+        attribute, sep, value = ass_str.partition(':')
+        if not sep:
+            return err.error('Fail to parse `{value}` as script info. ', 'bad_line', value=ass_str)
+        attribute = attribute.strip()
+        value = value.strip()
+        if attribute not in self.script_info_attrs:  # 如 YCbCr Matrix 等扩展属性
+            self.raw_lines.append(ass_str)
+            return err
+        if self._raw_head is None:
+            self._raw_head = len(self.raw_lines)
         try:
             attribute_type = SCRIPT_INFO_ATTR_DEF[attribute]
             self.script_info_attrs[attribute] = attribute_type(value)
         except Exception as exception:
-            return err.error(f'Could not parse `{value}` as `{attribute}`. '
-                             f'Exception: {exception}. ')
+            return err.error('Could not parse `{value}` as `{field}`. Exception: {exception}. ',
+                             'bad_value', field=attribute, value=value, exception=exception)
         return err
 
     def dump(self) -> (list[str], Errors):
         errors: Errors = Errors()
-        dump_lines: list[str] = [
-            '[{}]'.format(SCRIPT_INFO_PART_TITLE)
-        ]
+        dump_lines: list[str] = list(self.iter_dump(errors))
+        return dump_lines, errors
+
+    def iter_dump(self, errors: Errors) -> Iterator[str]:
+        """
+        逐行输出，错误追加到 errors 中
+        """
+        yield '[{}]'.format(SCRIPT_INFO_PART_TITLE)
+        raw_head = len(self.raw_lines) if self._raw_head is None else self._raw_head
+        yield from self.raw_lines[:raw_head]
         for key, value in self.script_info_attrs.items():
             if value is not None:
-                dump_lines.append('{}: {}'.format(key, value))
-        return dump_lines, errors
+                yield '{}: {}'.format(key, value)
+        yield from self.raw_lines[raw_head:]
 
     def __str__(self):
         return '\n'.join(self.dump()[0])
 
+    def __reduce__(self):
+        return self._restore, (self.script_info_attrs, self.raw_lines, self._raw_head)
+
+    @classmethod
+    def _restore(cls, script_info_attrs: dict, raw_lines: list[str] = (),
+                 raw_head: int | None = None) -> 'ScriptInfo':
+        script_info = cls.__new__(cls)
+        script_info.__dict__['script_info_attrs'] = script_info_attrs
+        script_info.__dict__['raw_lines'] = list(raw_lines)
+        script_info.__dict__['_raw_head'] = raw_head
+        return script_info
+
     def __getattr__(self, key):
         if key in self.script_info_attrs:
             return self.script_info_attrs[key]
@@ -1,59 +1,298 @@
-from easy_ass.errors import Errors
+import weakref
+from typing import Iterable, Iterator
+
+from easy_ass.errors import Errors, AssParseError
 from easy_ass.base import AssAttr
 from easy_ass.ass_types import AssColor
+from easy_ass.raw import place_raw_lines
 
 
 class Styles(list):
+    """
+    样式列表
+
+    用法与 list 一致，另外维护样式名的索引，find、resolve 按名称查找样式不需要遍历。
+    列表增删、排序以及其中的样式改名后索引失效，下一次查找时重建
+    """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._own(self)
         self.style_format: StyleFormat = StyleFormat()
+        self.raw_lines: list[str] = []  # 注释与无法识别的行，原样输出
+        self._raw_positions: list[int] = []  # 各原样行之后第一个样式的下标，-1 表示在 Format 行之前
+        self.trusted: bool = False  # 信任模式，解析时不转换各字段，第一次读写时才转换
+        self._index: tuple | None = None  # (名称索引, 忽略大小写的名称索引, 默认样式)
 
     def parse(self, ass_str: str) -> Errors:
         err = Errors()
-        ass_line = ass_str.split(':', 1)
-        if len(ass_line) != 2:
-            return err.error(f'Fail to parse `{ass_str}` as Styles. ')
-        title = ass_line[0].strip()
+        if ass_str.startswith(';'):  # 注释
+            self._add_raw_line(ass_str)
+            return err
+        title, sep, values_str = ass_str.partition(':')
+        if not sep:
+            return err.error('Fail to parse `{value}` as Styles. ', 'bad_line', value=ass_str)
+        title = title.strip()
         if title == FORMAT_LINE_TITLE:
             self.style_format = StyleFormat()
             err += self.style_format.parse(ass_str)
         elif title == STYLE_LINE_TITLE:
             if self.style_format is ...:
-                return err.error(f'`Format` line is missing. ')
-            style_item = StyleItem()
-            style_item.parse(ass_str, self.style_format)
+                return err.error('`Format` line is missing. ', 'missing_format')
+            if self.trusted:
+                self.append(StyleItem._from_raw(values_str, self.style_format))
+                return err
+            style_attrs = dict.fromkeys(STYLE_ATTR_DEF)
+            err += self.style_format.parse_row(values_str, style_attrs)
+            style_item = StyleItem(**style_attrs)
+            style_item.__dict__['_dirty'] = False  # 解析得到的样式记为未修改
             self.append(style_item)
+        else:
+            self._add_raw_line(ass_str)
         return err
 
+    def _add_raw_line(self, ass_str: str) -> None:
+        self.raw_lines.append(ass_str)
+        self._raw_positions.append(len(self) if self.style_format.style_attrs else -1)
+
     def dump(self) -> (list[str], Errors):
         errors = Errors()
-        dump_lines: list[str] = ['[{}]'.format(STYLES_PART_TITLE)]
+        dump_lines: list[str] = list(self.iter_dump(errors))
+        return dump_lines, errors
 
+    def iter_dump(self, errors: Errors) -> Iterator[str]:
+        """
+        逐行输出，错误追加到 errors 中
+        """
+        yield '[{}]'.format(STYLES_PART_TITLE)
+        raw_head, raw_groups = place_raw_lines(self.raw_lines, self._raw_positions, len(self))
+        yield from raw_head
         format_lines, format_errors = self.style_format.dump()
-        dump_lines += format_lines
+        yield from format_lines
         errors += format_errors
+        start = 0
+        for position, raw_lines in raw_groups + [(len(self), ())]:
+            for item in self[start:position]:
+                item_line, item_error = item.dump(self.style_format)
+                yield from item_line
+                errors += item_error
+            yield from raw_lines  # 原样行写回原来的位置
+            start = position
+
+    def find(self, name: str) -> 'StyleItem | None':
+        """ 按名称精确查找样式，忽略首尾的空白，重名时返回最后一个，不存在时返回 None """
+        return self._lookup()[0].get(name.strip())
+
+    def resolve(self, name: str | None) -> 'StyleItem | None':
+        """
+        按照渲染器的规则查找事件使用的样式
+
+        去掉名称首尾的空白以及开头的 *，依次尝试精确匹配、忽略大小写匹配，都找不到时使用名为 Default 的样式，
+        没有 Default 时使用第一个样式；重名时以最后一个为准
+
+        参数：
+            name: 样式名称，如事件的 Style 属性
+        返回值：
+            样式，列表为空时返回 None
+        """
+        exact, folded, default = self._lookup()
+        name = (name or '').strip().lstrip('*')
+        style_item = exact.get(name)
+        if style_item is None:
+            style_item = folded.get(name.casefold(), default)
+        return style_item
+
+    def _lookup(self) -> tuple:
+        index = self._index
+        if index is not None:
+            return index
+        exact: dict[str, StyleItem] = {}
+        folded: dict[str, StyleItem] = {}
+        for style_item in self:
+            if '_raw' in style_item.__dict__:  # 建立索引不因个别字段的错误而中断
+                style_item._convert_raw()
+            name = style_item.style_attrs['Name']
+            if name is not None:
+                name = name.strip()
+                exact[name] = folded[name.casefold()] = style_item
+        default = folded.get('default', self[0] if self else None)
+        index = self._index = (exact, folded, default)
+        return index
+
+    def _own(self, style_items: Iterable['StyleItem']) -> list['StyleItem']:
+        """ 记录样式所在的 Styles，样式改名时只使这些 Styles 的索引失效 """
+        style_items = list(style_items)
+        for style_item in style_items:
+            owners = style_item.__dict__.setdefault('_owners', [])  # Styles 不可哈希，保存弱引用的列表
+            if not any(owner() is self for owner in owners):
+                owners[:] = [owner for owner in owners if owner() is not None]
+                owners.append(weakref.ref(self))
+        return style_items
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_index'] = None
+        return state
+
+    # 修改列表的操作都使索引失效
+    def append(self, style_item: 'StyleItem') -> None:
+        self._index = None
+        self._own((style_item,))
+        super().append(style_item)
+
+    def extend(self, style_items: Iterable['StyleItem']) -> None:
+        self._index = None
+        super().extend(self._own(style_items))
+
+    def insert(self, index: int, style_item: 'StyleItem') -> None:
+        self._index = None
+        self._own((style_item,))
+        super().insert(index, style_item)
+
+    def remove(self, style_item: 'StyleItem') -> None:
+        self._index = None
+        super().remove(style_item)
+
+    def pop(self, index: int = -1) -> 'StyleItem':
+        self._index = None
+        return super().pop(index)
+
+    def clear(self) -> None:
+        self._index = None
+        super().clear()
+
+    def sort(self, *args, **kwargs) -> None:
+        self._index = None
+        super().sort(*args, **kwargs)
+
+    def reverse(self) -> None:
+        self._index = None
+        super().reverse()
+
+    def __setitem__(self, index, value) -> None:
+        self._index = None
+        super().__setitem__(index, self._own(value) if isinstance(index, slice) else self._own((value,))[0])
+
+    def __delitem__(self, index) -> None:
+        self._index = None
+        super().__delitem__(index)
+
+    def __iadd__(self, style_items: Iterable['StyleItem']) -> 'Styles':
+        self._index = None
+        return super().__iadd__(self._own(style_items))
+
+    def __imul__(self, count: int) -> 'Styles':
+        self._index = None
+        return super().__imul__(count)
+
+    def validate(self) -> Errors:
+        """
+        转换并检查信任模式下尚未转换的全部样式
+
+        返回值：
+            转换中产生的错误，错误的 row 字段为样式的下标
+        """
+        err = Errors()
+        for index, item in enumerate(self):
+            if '_raw' in item.__dict__:
+                item_err = item._convert_raw()
+                for record in item_err:
+                    record.fields['row'] = index
+                err += item_err
+        return err
+
+    def rescale(self, sx: float, sy: float, scale_borders: bool = True) -> None:
+        """
+        按分辨率之比缩放全部样式的尺寸，规则见 easy_ass.events.rescale
+
+        参数：
+            sx: 横向比例
+            sy: 纵向比例
+            scale_borders: 是否缩放边框与阴影，即 ScaledBorderAndShadow 是否为 Yes
+        """
+        aspect = sx / sy
         for item in self:
-            item_line, item_error = item.dump(self.style_format)
-            dump_lines += item_line
-            errors += item_error
-        return dump_lines, errors
+            factors = {'Fontsize': sy, 'Spacing': sx, 'MarginL': sx, 'MarginR': sx, 'MarginV': sy}
+            if scale_borders:
+                factors.update(Outline=sy, Shadow=sy)
+            if aspect != 1:
+                factors['ScaleX'] = aspect
+            for key, factor in factors.items():
+                value = getattr(item, key)  # 信任模式下的样式在此转换
+                if value is not None and factor != 1:
+                    value *= factor
+                    setattr(item, key, round(value) if STYLE_ATTR_DEF[key] is int else round(value, 3))
+
+    def dirty_rows(self) -> list[int]:
+        """ 列出上次 mark_clean 之后修改过的样式的下标，新创建的样式也记为已修改 """
+        return [index for index, item in enumerate(self) if item._dirty]
+
+    def mark_clean(self) -> None:
+        """ 将全部样式记为未修改，如保存之后调用 """
+        for item in self:
+            item.__dict__['_dirty'] = False
 
 
 class StyleFormat:
     def __init__(self):
         self.style_attrs: list[str] = []
+        self._row_converters: tuple[tuple[str, type], ...] | None = None
 
     def parse(self, ass_str: str) -> Errors:
         err = Errors()
         ass_line = ass_str.split(':', 1)
         if len(ass_line) != 2 or ass_line[0].strip() != FORMAT_LINE_TITLE:
-            return err.error(f'Fail to parse `{ass_str}` as style format. ')
+            return err.error('Fail to parse `{value}` as style format. ', 'bad_line', value=ass_str)
         style_attrs = ass_line[1].split(',')
         for style_attr in style_attrs:
             style_attr = style_attr.strip()
             if style_attr not in STYLE_ATTR_DEF:
-                return err.error(f'Unknown style attribute `{style_attr}`. ')
+                return err.error('Unknown style attribute `{field}`. ', 'unknown_field', field=style_attr)
             self.style_attrs.append(style_attr)
+        self.compile()
+        return err
+
+    def __getstate__(self):
+        return {'style_attrs': self.style_attrs, '_row_converters': None}  # 行解析器在使用时重新生成
+
+    def compile(self) -> None:
+        """
+        按照当前的列顺序生成行解析器
+
+        预先生成 (属性名, 转换函数) 元组，每行数据只需切割一次，再按顺序依次转换。
+        直接修改 style_attrs 后需重新调用
+        """
+        self._row_converters = tuple((style_attr, STYLE_ATTR_DEF[style_attr])
+                                     for style_attr in self.style_attrs)
+
+    def compiled(self) -> tuple[tuple[str, type], ...]:
+        """ 返回当前的行解析器，尚未生成时先生成；重新 compile 后得到新的对象，可用于判断 Format 是否变化 """
+        if self._row_converters is None:
+            self.compile()
+        return self._row_converters
+
+    def parse_row(self, values_str: str, style_attrs: dict) -> Errors:
+        """
+        解析一行样式的属性值部分，即 `Style:` 之后的内容
+
+        参数：
+            values_str: 逗号分隔的属性值
+            style_attrs: 解析结果写入的属性字典
+        返回值：
+            解析过程中产生的错误
+        """
+        err = Errors()
+        if self._row_converters is None:
+            self.compile()
+        style_values = values_str.split(',')
+        if len(style_values) != len(self._row_converters):
+            return err.error('`Styles` line does not match `Format` line! ', 'field_count', value=values_str)
+        for (style_attr, converter), style_value in zip(self._row_converters, style_values):
+            try:
+                style_attrs[style_attr] = converter(style_value)
+            except Exception as exception:
+                err.error('Could not parse `{value}` as `{field}`. Exception: {exception}. ',
+                          'bad_value', field=style_attr, value=style_value, exception=exception)
         return err
 
     def dump(self) -> (list[str], Errors):
@@ -62,53 +301,172 @@ class StyleFormat:
 
 
 class StyleItem:
+    """
+    样式
+
+    修改属性后记为已修改，直接修改 style_attrs 或调用颜色的 parse 原地修改同样会记录；
+    输出的行会被缓存，未修改且 Format 不变时直接复用。
+    信任模式解析的样式只保存原始文本，第一次读写属性时才转换，转换失败时抛出 AssParseError
+    """
+    _dirty = True
+    _line = None  # 缓存的 (行解析器, 输出行)
+    _state = None  # 缓存的基础渲染状态，见 easy_ass.events.render
+
     def __init__(self, **kwargs):
-        self.style_attrs = {attr_name: None for attr_name in STYLE_ATTR_DEF.keys()}
+        style_attrs = dict.fromkeys(STYLE_ATTR_DEF)
         for key, value in kwargs.items():  # 支持构造时传初始值
-            if key in self.style_attrs:
-                self.style_attrs[key] = value
+            if key in style_attrs:
+                style_attrs[key] = value
+        self.__dict__['style_attrs'] = _StyleAttrs(self, style_attrs)
+
+    @classmethod
+    def _from_raw(cls, values_str: str, style_format: StyleFormat) -> 'StyleItem':
+        style_item = cls.__new__(cls)
+        style_item.__dict__.update(_raw=(values_str, style_format), _dirty=False)
+        return style_item
+
+    def _convert_raw(self) -> Errors:
+        values_str, style_format = self.__dict__.pop('_raw')
+        style_attrs = dict.fromkeys(STYLE_ATTR_DEF)
+        err = style_format.parse_row(values_str, style_attrs)
+        self.__dict__['style_attrs'] = _StyleAttrs(self, style_attrs)  # 转换不算修改
+        return err
+
+    def _ensure_converted(self) -> None:
+        if '_raw' in self.__dict__:
+            err = self._convert_raw()
+            if err:
+                raise AssParseError(err[0])
 
     def parse(self, ass_str: str, style_format: StyleFormat) -> Errors:
         err = Errors()
-        ass_line = ass_str.split(':', 1)
-        if len(ass_line) != 2 or ass_line[0].strip() != STYLE_LINE_TITLE:
-            return err.error(f'Fail to parse `{ass_str}` as style values. ')
-        style_values = ass_line[1].split(',')
-        if len(style_values) != len(style_format.style_attrs):
-            return err.error(f'`Styles` line does not match `Format` line! ')
-        for index, style_attr in enumerate(style_format.style_attrs):
-            try:
-                self.style_attrs[style_attr] = \
-                    STYLE_ATTR_DEF[style_attr](style_values[index])
-            except Exception as exception:
-                err.error(f'Could not parse `{style_values[index]}` '
-                          f'as `{style_attr}`. Exception: {exception}. ')
-        return err
+        title, sep, values_str = ass_str.partition(':')
+        if not sep or title.strip() != STYLE_LINE_TITLE:
+            return err.error('Fail to parse `{value}` as style values. ', 'bad_line', value=ass_str)
+        self._touch()
+        self._renamed()
+        return style_format.parse_row(values_str, self.style_attrs)
+
+    def _renamed(self) -> None:
+        """ 名称可能发生变化，使包含该样式的 Styles 的名称索引失效 """
+        for owner in self.__dict__.get('_owners', ()):
+            styles = owner()
+            if styles is not None:
+                styles._index = None
+
+    def _touch(self) -> None:
+        self.__dict__['_dirty'] = True
+        self.__dict__['_line'] = None
+        self.__dict__['_state'] = None
 
     def dump(self, style_format: StyleFormat) -> (list[str], Errors):
         err = Errors()
+        key = style_format.compiled()
+        if self._line is not None and self._line[0] is key:
+            return [self._line[1]], err
+        raw = self.__dict__.get('_raw')
+        if raw is not None:
+            if style_format.style_attrs == raw[1].style_attrs:  # 未转换的样式按原样输出
+                return [STYLE_LINE_TITLE + ':' + raw[0]], err
+            self._ensure_converted()
         style_values = []
         for style_attr in style_format.style_attrs:
             if self.style_attrs[style_attr] is None:
-                err.error(f'Style `{style_attr}` not specified. ')
+                err.error('Style `{field}` not specified. ', 'missing_field', field=style_attr)
             style_values.append(str(self.style_attrs[style_attr]))
 
         styles_line = STYLE_LINE_TITLE + ':' + ','.join(style_values)
+        if not err:  # 有错误的行不缓存，每次输出都会报告
+            self.__dict__['_line'] = (key, styles_line)
         return [styles_line], err
 
+    def __reduce__(self):
+        if '_raw' in self.__dict__:  # 转换失败的字段与校验模式一样保留为 None
+            self._convert_raw()
+        return self._restore, (tuple(self.style_attrs.values()), self._dirty)
+
+    @classmethod
+    def _restore(cls, style_values: tuple, dirty: bool = True) -> 'StyleItem':
+        style_item = cls.__new__(cls)
+        style_item.__dict__['style_attrs'] = _StyleAttrs(style_item, zip(STYLE_ATTR_DEF, style_values))
+        style_item.__dict__['_dirty'] = dirty
+        return style_item
+
     def __getattr__(self, attribute):
-        if attribute in self.style_attrs:
-            return self.style_attrs[attribute]
+        if '_raw' in self.__dict__:
+            self._ensure_converted()
+            return getattr(self, attribute)
+        style_attrs = self.__dict__.get('style_attrs', {})
+        if attribute in style_attrs:
+            return style_attrs[attribute]
         raise AttributeError(attribute)
 
     def __setattr__(self, key, value):
+        self._ensure_converted()
         style_attrs = self.__dict__.get('style_attrs', {})
         if key in style_attrs:
             style_attrs[key] = STYLE_ATTR_DEF[key](value)
+        elif key == 'style_attrs':  # 整体替换属性字典
+            self.__dict__[key] = _StyleAttrs(self, value)
+            self._touch()
+            self._renamed()
         else:
             super().__setattr__(key, value)
 
 
+class _StyleAttrs(dict):
+    """
+    样式的属性字典
+
+    写入时使所属样式记为已修改，颜色绑定到所属样式，见 _StyleColor
+    """
+    __slots__ = ('_item',)
+
+    def __init__(self, item: StyleItem, values=()):
+        super().__init__(values)
+        self._item = item
+        for key, value in self.items():
+            if isinstance(value, AssColor):
+                dict.__setitem__(self, key, _StyleColor.bind(value, item))
+
+    def __setitem__(self, key, value):
+        if isinstance(value, AssColor):
+            value = _StyleColor.bind(value, self._item)
+        super().__setitem__(key, value)
+        self._item._touch()
+        if key == 'Name':
+            self._item._renamed()
+
+    def update(self, *args, **kwargs) -> None:
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+
+class _StyleColor(AssColor):
+    """
+    样式中的颜色
+
+    每个样式持有自己的颜色对象，调用 parse 原地修改时使所属样式记为已修改
+    """
+
+    @classmethod
+    def bind(cls, color: AssColor, item: StyleItem) -> '_StyleColor':
+        if type(color) is cls and color._item is item:
+            return color
+        bound = cls(int(color))
+        bound._item = item
+        return bound
+
+    def parse(self, raw_str: str) -> None:
+        super().parse(raw_str)
+        self._item._touch()
+
+
 class Bold(AssAttr):
     _attr_type = int
     enable = -1
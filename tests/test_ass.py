@@ -0,0 +1,122 @@
+import io
+
+import pytest
+
+from easy_ass import Ass, AssParseError
+
+STYLE_FORMAT = ('Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, '
+                'Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, '
+                'Alignment, MarginL, MarginR, MarginV, Encoding')
+STYLE_VALUES = ',Arial,20,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,2,2,10,10,10,1'
+
+
+def test_style_comments_keep_their_position():
+    ass = Ass()
+    ass.parse('\n'.join(('[V4+ Styles]', '; head', STYLE_FORMAT, 'Style: Default' + STYLE_VALUES,
+                         '; between', 'Style: Alt' + STYLE_VALUES)))
+    lines = ass.styles.dump()[0]
+    assert [line[:9] for line in lines[1:]] == ['; head', 'Format:Na', 'Style: De', '; between', 'Style: Al']
+
+
+def test_raw_section_keeps_blank_lines(tmp_path):
+    script = ('[Script Info]\nTitle: x\n\n[Events]\nFormat: Layer, Start, End, Text\n\n'
+              '[Fonts]\nfontname: a.ttf\nABCD\n\nEFGH\n\n[Graphics]\nx\n')
+    path = tmp_path / 'fonts.ass'
+    path.write_text(script, encoding='utf-8')
+    for ass in (Ass(), Ass.open(str(path))):
+        if not ass.raw_sections:
+            ass.parse(script)
+        assert ass.raw_sections[0].lines == ['fontname: a.ttf', 'ABCD', '', 'EFGH', '']
+        lines = ass.dump()[0]
+        assert lines[lines.index('[Fonts]'):] == ['[Fonts]', 'fontname: a.ttf', 'ABCD', '', 'EFGH', '',
+                                                  '[Graphics]', 'x']
+
+
+TRUSTED_SCRIPT = '\n'.join((
+    '[Script Info]', 'Title: trusted', '',
+    '[V4+ Styles]', STYLE_FORMAT, 'Style: Default' + STYLE_VALUES, '',
+    '[Events]',
+    'Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text',
+    'Dialogue: 0,0:00:00.00,0:00:01.00,Default,,0,0,0,,{\\pos(1,2)}first',
+    'Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,second',
+))
+
+
+def test_trusted_round_trip():
+    ass = Ass()
+    assert not ass.parse(TRUSTED_SCRIPT, validate=False)
+    lines, errors = ass.dump()
+    assert not errors
+    assert [line for line in lines if line.startswith(('Style', 'Dialogue'))] == \
+        [line for line in TRUSTED_SCRIPT.split('\n') if line.startswith(('Style', 'Dialogue'))]
+    ass.events[1].Text = 'changed'
+    ass.styles[0].Fontsize = 30
+    lines = ass.dump()[0]
+    assert lines[-2] == 'Dialogue: 0,0:00:00.00,0:00:01.00,Default,,0,0,0,,{\\pos(1,2)}first'
+    assert lines[-1] == 'Dialogue:0,00:00:01.00,00:00:02.00,Default,,0,0,0,,changed'
+    assert ass.styles.dump()[0][-1].startswith('Style: Default,Arial,30,')
+    validated = Ass()
+    validated.parse(TRUSTED_SCRIPT)
+    assert ass.events[:1] == validated.events[:1]
+
+
+def test_trusted_errors_raised_on_access():
+    ass = Ass()
+    script = TRUSTED_SCRIPT.replace('0:00:01.00,0:00:02.00', 'xx,0:00:02.00').replace(',Arial,20,', ',Arial,big,')
+    assert not ass.parse(script, validate=False)
+    with pytest.raises(AssParseError) as info:
+        ass.events[1].Start
+    assert info.value.record['field'] == 'Start'
+    with pytest.raises(AssParseError):
+        ass.styles[0].Fontsize
+    assert ass.events[0].Start.milliseconds == 0
+    ass = Ass()
+    ass.parse(script, validate=False)
+    assert [(record.code, record['field'], record['row']) for record in ass.validate()] == \
+        [('bad_value', 'Fontsize', 0), ('bad_value', 'Start', 1)]
+
+
+def test_parse_stream_matches_parse(tmp_path):
+    expected = Ass()
+    expected.parse(TRUSTED_SCRIPT)
+    expected_lines = expected.dump()[0]
+    crlf = '\ufeff' + TRUSTED_SCRIPT.replace('\n', '\r\n') + '\r\n'
+    path = tmp_path / 'crlf.ass'
+    path.write_bytes(crlf.encode('utf-8'))
+    from_lines, from_file = Ass(), Ass()
+    assert not from_lines.parse_stream(io.StringIO(crlf, newline=''))
+    assert not from_file.load(str(path))
+    assert from_lines.dump()[0] == from_file.dump()[0] == expected_lines
+    assert from_file.script_info.Title == 'trusted'
+    errors = Ass().parse_stream(TRUSTED_SCRIPT.replace('Layer, ', 'Layer, Bad, ').split('\n'))
+    assert [record.line for record in errors][:1] == [9]
+
+
+@pytest.mark.parametrize('buffer_size', [1, 64, 1 << 16])
+def test_dump_to_matches_dump(tmp_path, buffer_size):
+    ass = Ass()
+    ass.parse(TRUSTED_SCRIPT + '\n\n[Fonts]\nfontname: a.ttf\nABCD')
+    expected = '\n'.join(ass.dump()[0])
+    assert '\n'.join(ass.iter_dump()) == expected
+    buffer = io.StringIO()
+    assert not ass.dump_to(buffer, buffer_size)
+    assert buffer.getvalue() == expected
+    path = tmp_path / 'out.ass'
+    ass.save(str(path), buffer_size=buffer_size)
+    assert path.read_text(encoding='utf-8') == expected
+    reloaded = Ass()
+    reloaded.load(str(path))
+    assert '\n'.join(reloaded.dump()[0]) == expected
+
+
+@pytest.mark.parametrize('newline', ['\n', '\r\n', '\r'])
+def test_open_any_line_ending(tmp_path, newline):
+    path = tmp_path / 'script.ass'
+    path.write_bytes(TRUSTED_SCRIPT.replace('\n', newline).encode('utf-8'))
+    expected = Ass()
+    expected.parse(TRUSTED_SCRIPT)
+    ass = Ass.open(str(path))
+    assert (ass._mapped is None) == (newline == '\r')
+    assert ass.script_info.Title == 'trusted'
+    assert len(ass.styles) == 1 and len(ass.events) == 2
+    assert ass.dump()[0] == expected.dump()[0]
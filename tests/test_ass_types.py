@@ -0,0 +1,23 @@
+import pytest
+
+from easy_ass.ass_types import AssTime
+
+
+@pytest.mark.parametrize('value, milliseconds, dumped', [
+    ('-0:00:01.50', -1500, '-00:00:01.50'),
+    ('-0:00:01.5', -1500, '-00:00:01.50'),
+    ('-1:02:03.04', -3723040, '-01:02:03.04'),
+    ('0:75:90.00', 4590000, '01:16:30.00'),
+    ('0:00:75.5', 75500, '00:01:15.50'),
+    ('123:00:00.00', 442800000, '123:00:00.00'),
+])
+def test_parse_dump_round_trip(value, milliseconds, dumped):
+    assert AssTime.parse_ms(value) == milliseconds
+    assert AssTime.dump_ms(milliseconds) == dumped
+    assert AssTime.parse_ms(dumped) == milliseconds
+    assert AssTime(value) == AssTime(dumped)
+
+
+def test_bad_time_raises():
+    with pytest.raises(ValueError):
+        AssTime.parse_ms('-')
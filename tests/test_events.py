@@ -0,0 +1,118 @@
+import pytest
+
+from easy_ass import Ass, AssParseError, EventItem
+from easy_ass.events.text import Text
+
+SCRIPT = '\n'.join((
+    '[Events]',
+    'Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text',
+    'Dialogue: 0,0:00:00.00,0:00:01.00,Default,,0,0,0,,{\\pos(100,200)}first',
+    'Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,second',
+))
+
+
+def test_unknown_code_reported_at_load():
+    ass = Ass()
+    err = ass.parse(SCRIPT + '\nDialogue: 0,0:00:02.00,0:00:03.00,Default,,0,0,0,,{\\zz1}third')
+    assert [(record.code, record.line, record['value']) for record in err] == [('unknown_code', 5, 'zz1')]
+    assert len(ass.events) == 3
+
+
+def test_unknown_code_reported_by_validate():
+    ass = Ass()
+    assert not ass.parse(SCRIPT + '\nDialogue: 0,0:00:02.00,0:00:03.00,Default,,0,0,0,,{\\zz1}third',
+                         validate=False)
+    assert [(record.code, record['row']) for record in ass.validate()] == [('unknown_code', 2)]
+
+
+def _events():
+    ass = Ass()
+    ass.parse(SCRIPT)
+    return ass.events
+
+
+def test_slice_add_and_equality():
+    events = _events()
+    part = events[1:]
+    assert type(part) is type(events) and len(part) == 1
+    assert part == events[1:] == list(events)[1:]
+    assert events != part
+    assert len(events + events) == 4 and len(list(events) + events) == 4
+    events += part
+    assert len(events) == 3 and events[2:] == part
+
+
+def test_time_parse_writes_back():
+    events = _events()
+    events.mark_clean()
+    events[1].Start.parse('0:00:01.50')
+    assert events[1].Start.milliseconds == 1500
+    assert events.dirty_rows() == [1]
+
+
+def test_overlapping_after_append_and_retime():
+    events = _events()
+    assert events.active_at(0.5) == [events[0]]
+    events.append(EventItem(Start=0.2, End=0.8, Text='third'))
+    events[1].Start = 0.4
+    assert [event.Text.dump() for event in events.active_at(0.5)] == ['{\\pos(100,200)}first', 'second', 'third']
+    events[2].End = 0.3
+    assert events.active_at(0.5) == [events[0], events[1]]
+
+
+def test_text_copied_from_another_event():
+    ass = Ass()
+    ass.parse(SCRIPT)
+    events = ass.events
+    events.cache_lines = True
+    events[1].Text = Text(events[0].Text)
+    ass.dump()
+    events.mark_clean()
+    events[0].Text[0].x = 777
+    assert events.dirty_rows() == [0]
+    lines = ass.dump()[0]
+    assert lines[-2].endswith(',{\\pos(777,200)}first')
+    assert lines[-1].endswith(',{\\pos(100,200)}first')
+
+
+def test_comments_keep_their_position():
+    ass = Ass()
+    ass.parse(SCRIPT.replace('\nDialogue: 0,0:00:01', '\n; between\nDialogue: 0,0:00:01') + '\n; last')
+    lines = ass.events.dump()[0]
+    assert [line[:10] for line in lines[2:]] == ['Dialogue:0', '; between', 'Dialogue:0', '; last']
+
+
+def test_bad_code_arguments():
+    ass = Ass()
+    assert not ass.parse(SCRIPT + '\nDialogue: 0,0:00:02.00,0:00:03.00,Default,,0,0,0,,{\\blur2}a'
+                                  '\nDialogue: 0,0:00:03.00,0:00:04.00,Default,,0,0,0,,{\\pos(a,b)}b')
+    assert [(record.code, record['row']) for record in ass.validate()] == [('bad_value', 2), ('bad_value', 3)]
+    for row in (2, 3):
+        with pytest.raises(AssParseError) as info:
+            ass.events[row].Text
+        assert info.value.record['field'] == 'Text' and info.value.record['row'] == row
+    assert ass.events[0].Text.dump() == '{\\pos(100,200)}first'
+
+
+def test_transform_accepts_numpy_matrices():
+    numpy = pytest.importorskip('numpy')
+    events = _events()
+    events.transform(numpy.array([2, 0, 0, 0, 2, 0.]))
+    assert events[0].Text.dump() == '{\\pos(200,400)}first'
+    events.transform(numpy.array([[1, 0, 5, 0, 1, 0.], [1, 0, 0, 0, 1, 7.]]))
+    assert events[0].Text.dump() == '{\\pos(205,400)}first'
+
+
+def test_event_attrs_write_through():
+    events = _events()
+    events.mark_clean()
+    attrs = events[1].event_attrs
+    assert attrs['Text'] == 'second' and attrs['Layer'] == 0
+    attrs['Text'] = 'changed'
+    attrs['Layer'] = '2'
+    assert events[1].Text.dump() == 'changed' and events[1].Layer == 2
+    assert events.dirty_rows() == [1]
+    with pytest.raises(KeyError):
+        attrs['Unknown'] = 1
+    with pytest.raises(TypeError):
+        del attrs['Text']
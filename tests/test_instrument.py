@@ -0,0 +1,13 @@
+from easy_ass import instrument
+from easy_ass.events.text import Text, Pos
+
+
+def test_report_lists_tag_classes():
+    original_parse, original_dump = Pos.parse, Pos.dump
+    with instrument.profile() as stats:
+        Text('{\\pos(1,2)\\fs20}a').dump()
+    for phase in ('Text.parse', 'Text.dump', 'Text.parse.Pos', 'Text.parse.FontSize',
+                  'Text.dump.Pos', 'Text.dump.FontSize', 'Text.dump.Str'):
+        assert phase in stats
+    assert 'Text.dump.Pos' in instrument.report()
+    assert (Pos.parse, Pos.dump) == (original_parse, original_dump)
@@ -0,0 +1,35 @@
+from easy_ass import Styles, StyleItem
+from easy_ass.events.render import base_state, iter_effective
+
+
+def _styles():
+    return Styles([StyleItem(Name='Default', Fontsize=20, Bold=0, Alignment=2, Outline=2.0, Shadow=1),
+                   StyleItem(Name='Alt', Fontsize=40, Bold=-1, Alignment=7, Outline=0.0, Shadow=0)])
+
+
+def test_override_cascade():
+    styles = _styles()
+    text = '{\\an8\\fs+5}a{\\an1\\fs-2\\b1}b{\\rAlt}c{\\r}d{\\fs30\\bord3}e{\\fs0}f{\\rMissing}g'
+    runs = [(str(item), state.Fontsize, state.Bold, state.Alignment, state.OutlineX)
+            for item, state in iter_effective(text, styles[0], styles)]
+    assert runs == [
+        ('a', 30, 0, 8, 2.0),  # fs+5 放大到 1.5 倍
+        ('b', 24, -1, 8, 2.0),  # fs-2 在当前大小上缩小，第一个 an 生效
+        ('c', 40, -1, 8, 0.0),  # \rAlt 恢复为 Alt 样式，Alignment 不变
+        ('d', 20, 0, 8, 2.0),  # \r 恢复为事件的样式
+        ('e', 30, 0, 8, 3.0),
+        ('f', 20, 0, 8, 3.0),  # fs0 恢复样式的字号
+        ('g', 20, 0, 8, 2.0),  # 找不到的样式回到事件的样式
+    ]
+
+
+def test_base_state_cached_until_style_changes():
+    styles = _styles()
+    state = base_state(styles[0])
+    assert base_state(styles[0]) is state
+    (_, first), = iter_effective('x', styles[0], styles)
+    assert first is state
+    styles[0].Fontsize = 25
+    assert base_state(styles[0]) is not state and base_state(styles[0]).Fontsize == 25
+    styles[0].style_attrs['Bold'] = -1
+    assert base_state(styles[0]).Bold == -1
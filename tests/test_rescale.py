@@ -0,0 +1,11 @@
+from easy_ass.events.rescale import rescale_text
+from easy_ass.events.text import Text
+
+
+def test_parsed_and_unparsed_text_agree():
+    sx, sy = 1280 / 384, 720 / 288
+    for source in ('{\\fs-2}a{\\fs+3}b{\\fs20\\fsp-1}c', '{\\pos(10,20)\\bord2\\fscx100}d',
+                   '{\\p1}m 0 0 l 10 10{\\p0}e'):
+        unparsed = rescale_text(source, sx, sy, True)
+        assert unparsed == rescale_text(Text(source), sx, sy, True).dump()
+    assert rescale_text('{\\fs-2}a{\\fs+3}b', sx, sy, True) == '{\\fs-2}a{\\fs+3}b'
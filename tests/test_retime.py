@@ -0,0 +1,87 @@
+from array import array
+
+import pytest
+
+from easy_ass import Ass
+from easy_ass.events import retime
+from easy_ass.events.text import Text
+
+SCRIPT = '\n'.join((
+    '[Events]',
+    'Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text',
+    'Dialogue: 0,0:00:01.00,0:00:03.00,Default,,0,0,0,,{\\move(0,0,10,10,100,500)\\fad(200,300)}a',
+    'Dialogue: 0,0:00:02.00,0:00:04.00,Default,,0,0,0,,{\\fade(255,0,255,100,200,1800,1900)}b',
+    'Dialogue: 0,0:00:00.50,0:00:01.50,Default,,0,0,0,,{\\move(0,0,10,10)}c',
+))
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(retime, 'numpy', None)
+    return request.param
+
+
+def _events(parsed: bool):
+    ass = Ass()
+    ass.parse(SCRIPT)
+    if parsed:
+        for event in ass.events:
+            event.Text  # 首次访问时解析
+    return ass.events
+
+
+def _times(events):
+    return [(event.Start.milliseconds, event.End.milliseconds) for event in events]
+
+
+def _texts(events):
+    return [event.Text.dump() for event in events]
+
+
+@pytest.mark.parametrize('parsed', [False, True])
+def test_scale_rewrites_timed_tags(backend, parsed):
+    events = _events(parsed)
+    events.scale(2)
+    assert _times(events) == [(2000, 6000), (4000, 8000), (1000, 3000)]
+    assert _texts(events) == ['{\\move(0,0,10,10,200,1000)\\fad(400,600)}a',
+                              '{\\fade(255,0,255,200,400,3600,3800)}b',
+                              '{\\move(0,0,10,10)}c']
+
+
+@pytest.mark.parametrize('parsed', [False, True])
+def test_shift_clamps_at_zero(backend, parsed):
+    events = _events(parsed)
+    events.shift(-1.5)
+    assert _times(events) == [(0, 1500), (500, 2500), (0, 0)]
+    assert _texts(events)[0] == '{\\move(0,0,10,10,100,500)\\fad(200,300)}a'
+    events.shift('0:00:01.00')
+    assert _times(events) == [(1000, 2500), (1500, 3500), (1000, 1000)]
+
+
+@pytest.mark.parametrize('vectorized', [False, True])
+def test_map_time_and_framerate(backend, vectorized):
+    events = _events(False)
+    events.map_time(lambda time: time * 3 + 10, vectorized=vectorized)
+    assert _times(events) == [(3010, 9010), (6010, 12010), (1510, 4510)]
+    assert _texts(events)[0] == '{\\move(0,0,10,10,300,1500)\\fad(600,900)}a'
+    events = _events(True)
+    events.convert_framerate(25, 50)
+    assert _times(events) == [(500, 1500), (1000, 2000), (250, 750)]
+    assert _texts(events)[1] == '{\\fade(255,0,255,50,100,900,950)}b'
+
+
+def test_map_column_skips_null(backend):
+    null = -2 ** 63
+    column = array('q', [1000, null, 200])
+    retime.map_column(column, null, lambda time: time - 500, lambda times: times - 500)
+    assert list(column) == [500, null, 0]
+
+
+def test_retime_text_parsed_and_unparsed_agree():
+    source = '{\\move(0,0,10,10,100,500)\\fade(255,0,255,100,200,1800,1900)}x{\\fad(200,300)}y'
+    unparsed = retime.retime_text(source, 1000, 3000, lambda time: time * 1.5)
+    assert unparsed == retime.retime_text(Text(source), 1000, 3000, lambda time: time * 1.5).dump()
+    assert unparsed == '{\\move(0,0,10,10,150,750)\\fade(255,0,255,150,300,2700,2850)}x{\\fad(300,450)}y'
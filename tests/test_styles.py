@@ -0,0 +1,27 @@
+from easy_ass import Styles, StyleItem
+from easy_ass.ass_types import AssColor
+
+
+def test_rename_only_invalidates_owning_styles():
+    first, other = Styles([StyleItem(Name='A')]), Styles([StyleItem(Name='B')])
+    assert first.find('A') is first[0] and other.find('B') is other[0]
+    index = other._index
+    first[0].Name = 'Z'
+    assert first.find('Z') is first[0] and first.find('A') is None
+    assert other._index is index
+
+
+def test_in_place_edits_mark_dirty():
+    styles = Styles([StyleItem(Name='A', Fontname='Arial', Fontsize=20, PrimaryColour=AssColor('&H00FFFFFF'))])
+    styles.style_format.parse('Format: Name, Fontname, Fontsize, PrimaryColour')
+    assert styles.dump()[0][-1] == 'Style:A,Arial,20,&HFFFFFF'
+    styles.mark_clean()
+    styles[0].PrimaryColour.parse('&H0000FF00')
+    assert styles.dirty_rows() == [0]
+    assert styles.dump()[0][-1] == 'Style:A,Arial,20,&H00FF00'
+    styles.mark_clean()
+    styles[0].style_attrs['Fontsize'] = 30
+    assert styles.dirty_rows() == [0]
+    assert styles.dump()[0][-1] == 'Style:A,Arial,30,&H00FF00'
+    styles[0].style_attrs['Name'] = 'B'
+    assert styles.find('B') is styles[0]
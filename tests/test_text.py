@@ -0,0 +1,14 @@
+from easy_ass.events.text import Text, Str, Draw, DrawBegin, DrawingPath
+
+
+def test_draw_level_kept():
+    text = Text('{\\p10}m 0 0 l 10 10{\\p0}')
+    assert type(text[0]) is Draw and text[0].level == 10
+    assert type(text[1]) is DrawingPath
+    assert text.dump() == '{\\p10}m 0 0 l 10 10{\\p0}'
+
+
+def test_text_in_drawing_mode_kept():
+    text = Text('{\\p1}Hello{\\p0}')
+    assert type(text[0]) is DrawBegin and text[1] == Str('Hello')
+    assert text.dump() == '{\\p1}Hello{\\p0}'